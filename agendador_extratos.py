@@ -0,0 +1,99 @@
+"""
+Agendador concorrente de fundos e contas para a busca de extratos
+Executa vários fundos ao mesmo tempo e, dentro de cada fundo, várias contas,
+respeitando três limites:
+- max_fundos: fundos processados simultaneamente
+- max_contas_por_fundo: contas simultâneas dentro de um mesmo fundo
+- max_contas_total: contas simultâneas somando todos os fundos (limite global)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Limites padrão de concorrência
+MAX_FUNDOS = 4
+MAX_CONTAS_POR_FUNDO = 2
+MAX_CONTAS_TOTAL = 6
+
+
+class AgendadorExtratos:
+    """
+    Agenda o processamento de fundos e contas em paralelo
+
+    Uso:
+        agendador = AgendadorExtratos(max_fundos=4)
+        resultados = agendador.executar(fundos, processar_fundo)
+
+    processar_fundo(fundo_id, executar_contas) é chamado em uma thread por
+    fundo; executar_contas(funcao, itens) roda funcao(item) para cada conta
+    respeitando os limites por fundo e global, e devolve os resultados na
+    ordem dos itens.
+    """
+
+    def __init__(self, max_fundos=MAX_FUNDOS, max_contas_por_fundo=MAX_CONTAS_POR_FUNDO,
+                 max_contas_total=MAX_CONTAS_TOTAL):
+        self.max_fundos = max(1, max_fundos)
+        self.max_contas_por_fundo = max(1, max_contas_por_fundo)
+        self.max_contas_total = max(1, max_contas_total)
+
+    def _executor_de_contas(self, executor_global):
+        """Cria a função executar_contas de um fundo (com seu próprio semáforo)"""
+        semaforo_fundo = threading.BoundedSemaphore(self.max_contas_por_fundo)
+
+        def executar_contas(funcao, itens):
+            futuros = []
+            for item in itens:
+                # Bloqueia enquanto o fundo já tem max_contas_por_fundo contas em andamento
+                semaforo_fundo.acquire()
+                try:
+                    futuro = executor_global.submit(funcao, item)
+                except Exception:
+                    semaforo_fundo.release()
+                    raise
+                futuro.add_done_callback(lambda _f: semaforo_fundo.release())
+                futuros.append(futuro)
+            # Esperar todas as contas antes de propagar uma exceção: nenhuma
+            # conta do fundo continua rodando depois que o fundo termina
+            wait(futuros)
+            return [futuro.result() for futuro in futuros]
+
+        return executar_contas
+
+    def executar(self, fundos, processar_fundo):
+        """
+        Processa todos os fundos e retorna os resultados na ordem de entrada
+
+        Args:
+            fundos: Lista de IDs de fundos
+            processar_fundo: Função (fundo_id, executar_contas) -> resultado
+
+        Returns:
+            Lista de tuplas (fundo_id, resultado, erro, tempo_segundos);
+            erro é a exceção levantada por processar_fundo (ou None)
+        """
+        resultados = [None] * len(fundos)
+
+        with ThreadPoolExecutor(max_workers=self.max_contas_total,
+                                thread_name_prefix="conta") as executor_contas:
+
+            def tarefa_fundo(indice, fundo_id):
+                inicio = time.perf_counter()
+                resultado = erro = None
+                try:
+                    resultado = processar_fundo(fundo_id, self._executor_de_contas(executor_contas))
+                except Exception as e:
+                    erro = e
+                resultados[indice] = (fundo_id, resultado, erro, time.perf_counter() - inicio)
+
+            with ThreadPoolExecutor(max_workers=self.max_fundos,
+                                    thread_name_prefix="fundo") as executor_fundos:
+                for futuro in [executor_fundos.submit(tarefa_fundo, i, f) for i, f in enumerate(fundos)]:
+                    futuro.result()
+
+        return resultados
+
+
+def executar_sequencial(funcao, itens):
+    """Equivalente sequencial de executar_contas (modo sem paralelismo)"""
+    return [funcao(item) for item in itens]
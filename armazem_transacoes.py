@@ -0,0 +1,251 @@
+"""
+Armazém local (SQLite) de transações com sincronização incremental
+Guarda as transações por fundo/agência/conta/data e registra quais intervalos
+de dias já foram buscados por completo. Uma nova busca só consulta a API para
+os dias que ainda faltam e mescla o resultado com o que já está salvo.
+
+Regras:
+- Apenas dias anteriores à janela de revisão são marcados como completos: o
+  dia corrente e os DIAS_REVISAO dias anteriores (SANTANDER_DIAS_REVISAO,
+  padrão 5) ainda podem receber lançamentos tardios e estornos, então são
+  sempre buscados de novo
+- Ao salvar um intervalo, os dias desse intervalo são substituídos por inteiro,
+  preservando a ordem em que a API retornou as transações de cada dia
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Local padrão do banco (mesma pasta usada pelo cache de tokens)
+CAMINHO_PADRAO = Path(__file__).parent / "config" / "transacoes.db"
+
+# Dias antes de hoje que nunca são considerados completos (lançamentos retroativos e estornos)
+DIAS_REVISAO = int(os.environ.get("SANTANDER_DIAS_REVISAO", 5))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transacoes (
+    fundo_id TEXT NOT NULL,
+    agencia TEXT NOT NULL,
+    conta TEXT NOT NULL,
+    data TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (fundo_id, agencia, conta, data, seq)
+);
+CREATE TABLE IF NOT EXISTS intervalos_completos (
+    fundo_id TEXT NOT NULL,
+    agencia TEXT NOT NULL,
+    conta TEXT NOT NULL,
+    data_inicio TEXT NOT NULL,
+    data_fim TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_intervalos_conta
+    ON intervalos_completos (fundo_id, agencia, conta);
+"""
+
+
+def _como_data(valor):
+    """Converte datetime/date/str ISO para date"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor)[:10])
+
+
+def data_da_transacao(trans):
+    """
+    Extrai a data (date) de uma transação da API
+
+    A API retorna DD/MM/YYYY; YYYY-MM-DD é aceito como fallback.
+    Retorna None para datas inválidas.
+    """
+    data = trans.get('transactionDate', '') or ''
+    if len(data) >= 10:
+        for formato in ('%d/%m/%Y', '%Y-%m-%d'):
+            try:
+                return datetime.strptime(data[:10], formato).date()
+            except ValueError:
+                continue
+    return None
+
+
+def _chave_conta(fundo_id, branch_code, account_number):
+    return (str(fundo_id), str(branch_code).zfill(4), str(account_number).zfill(12))
+
+
+class ArmazemTransacoes:
+    """
+    Armazém SQLite de transações com controle de intervalos completos
+
+    Args:
+        caminho: Arquivo do banco (padrão: config/transacoes.db)
+        dias_revisao: Dias antes de hoje sempre buscados de novo (padrão: DIAS_REVISAO)
+    """
+
+    def __init__(self, caminho=None, dias_revisao=None):
+        self.caminho = Path(caminho) if caminho else CAMINHO_PADRAO
+        self.dias_revisao = DIAS_REVISAO if dias_revisao is None else max(int(dias_revisao), 0)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        # Escritas serializadas no processo; o SQLite cuida de outros processos
+        self._lock = threading.Lock()
+        with self._conectar() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _conectar(self):
+        # Uma conexão por operação: seguro para uso a partir de várias threads
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:  # commit ao final (ou rollback em caso de erro)
+                yield conn
+        finally:
+            conn.close()
+
+    def _intervalos(self, conn, chave):
+        linhas = conn.execute(
+            "SELECT data_inicio, data_fim FROM intervalos_completos "
+            "WHERE fundo_id = ? AND agencia = ? AND conta = ? ORDER BY data_inicio",
+            chave
+        ).fetchall()
+        return [(date.fromisoformat(ini), date.fromisoformat(fim)) for ini, fim in linhas]
+
+    def _ultimo_dia_completo(self, hoje=None):
+        """Último dia que pode ser tratado como completo (antes da janela de revisão)"""
+        return (hoje or date.today()) - timedelta(days=self.dias_revisao + 1)
+
+    def intervalos_faltantes(self, fundo_id, branch_code, account_number, data_inicial, data_final, hoje=None):
+        """
+        Calcula os intervalos de dias que ainda precisam ser buscados na API
+
+        Args:
+            fundo_id, branch_code, account_number: Identificação da conta
+            data_inicial, data_final: Período solicitado (date ou datetime)
+            hoje: Data de referência (padrão: date.today())
+
+        Returns:
+            Lista de tuplas (date_inicio, date_fim), em ordem cronológica.
+            O dia corrente e a janela de revisão nunca contam como completos
+            (mesmo que marcados por uma versão anterior), então sempre
+            aparecem aqui quando fazem parte do período.
+        """
+        inicio = _como_data(data_inicial)
+        fim = _como_data(data_final)
+        chave = _chave_conta(fundo_id, branch_code, account_number)
+        ultimo_completo = self._ultimo_dia_completo(hoje)
+
+        with self._conectar() as conn:
+            completos = [(ini, min(f, ultimo_completo)) for ini, f in self._intervalos(conn, chave)
+                         if ini <= ultimo_completo]
+
+        faltantes = []
+        cursor = inicio
+        for ini_ok, fim_ok in completos:
+            if fim_ok < cursor:
+                continue
+            if ini_ok > fim:
+                break
+            if ini_ok > cursor:
+                faltantes.append((cursor, min(ini_ok - timedelta(days=1), fim)))
+            cursor = max(cursor, fim_ok + timedelta(days=1))
+            if cursor > fim:
+                break
+        if cursor <= fim:
+            faltantes.append((cursor, fim))
+        return faltantes
+
+    def salvar(self, fundo_id, branch_code, account_number, data_inicial, data_final, transacoes, hoje=None):
+        """
+        Substitui as transações do intervalo e o marca como completo
+
+        Apenas os dias anteriores à janela de revisão (hoje e os
+        dias_revisao dias anteriores) são registrados como completos.
+
+        Args:
+            fundo_id, branch_code, account_number: Identificação da conta
+            data_inicial, data_final: Intervalo buscado por completo na API
+            transacoes: Lista de transações retornadas pela API para o intervalo
+            hoje: Data de referência (padrão: date.today())
+        """
+        inicio = _como_data(data_inicial)
+        fim = _como_data(data_final)
+        chave = _chave_conta(fundo_id, branch_code, account_number)
+
+        # Numerar transações por dia preservando a ordem da API
+        linhas = []
+        contador_por_dia = {}
+        for trans in transacoes:
+            dia = data_da_transacao(trans)
+            if dia is None:
+                dia = inicio
+            elif not inicio <= dia <= fim:
+                continue  # Fora do intervalo: pertence a outra busca
+            seq = contador_por_dia.get(dia, 0)
+            contador_por_dia[dia] = seq + 1
+            linhas.append(chave + (dia.isoformat(), seq, json.dumps(trans, ensure_ascii=False)))
+
+        with self._lock, self._conectar() as conn:
+            conn.execute(
+                "DELETE FROM transacoes WHERE fundo_id = ? AND agencia = ? AND conta = ? "
+                "AND data BETWEEN ? AND ?",
+                chave + (inicio.isoformat(), fim.isoformat())
+            )
+            conn.executemany("INSERT INTO transacoes VALUES (?, ?, ?, ?, ?, ?)", linhas)
+
+            fim_completo = min(fim, self._ultimo_dia_completo(hoje))
+            if fim_completo >= inicio:
+                self._marcar_completo(conn, chave, inicio, fim_completo)
+
+    def _marcar_completo(self, conn, chave, inicio, fim):
+        """Adiciona o intervalo e funde intervalos sobrepostos ou adjacentes"""
+        intervalos = self._intervalos(conn, chave) + [(inicio, fim)]
+        intervalos.sort()
+        fundidos = [intervalos[0]]
+        for ini, f in intervalos[1:]:
+            ult_ini, ult_fim = fundidos[-1]
+            if ini <= ult_fim + timedelta(days=1):
+                fundidos[-1] = (ult_ini, max(ult_fim, f))
+            else:
+                fundidos.append((ini, f))
+
+        conn.execute(
+            "DELETE FROM intervalos_completos WHERE fundo_id = ? AND agencia = ? AND conta = ?",
+            chave
+        )
+        conn.executemany(
+            "INSERT INTO intervalos_completos VALUES (?, ?, ?, ?, ?)",
+            [chave + (ini.isoformat(), f.isoformat()) for ini, f in fundidos]
+        )
+
+    def carregar(self, fundo_id, branch_code, account_number, data_inicial, data_final):
+        """
+        Retorna as transações armazenadas no período, em ordem cronológica
+
+        Returns:
+            Lista de transações (dicionários no formato da API)
+        """
+        chave = _chave_conta(fundo_id, branch_code, account_number)
+        with self._conectar() as conn:
+            linhas = conn.execute(
+                "SELECT payload FROM transacoes WHERE fundo_id = ? AND agencia = ? AND conta = ? "
+                "AND data BETWEEN ? AND ? ORDER BY data, seq",
+                chave + (_como_data(data_inicial).isoformat(), _como_data(data_final).isoformat())
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in linhas]
+
+    def invalidar(self, fundo_id, branch_code=None, account_number=None):
+        """Remove transações e intervalos de um fundo (ou de uma conta específica)"""
+        with self._lock, self._conectar() as conn:
+            if branch_code is None or account_number is None:
+                filtro, params = "fundo_id = ?", (str(fundo_id),)
+            else:
+                filtro = "fundo_id = ? AND agencia = ? AND conta = ?"
+                params = _chave_conta(fundo_id, branch_code, account_number)
+            conn.execute(f"DELETE FROM transacoes WHERE {filtro}", params)
+            conn.execute(f"DELETE FROM intervalos_completos WHERE {filtro}", params)
@@ -0,0 +1,426 @@
+"""
+Benchmark de vazão da busca de extratos contra o servidor mock
+Sobe o servidor_mock_santander.py em segundo plano, cadastra fundos fictícios
+e mede, com latência, página e volume configuráveis:
+- buscar_transacoes (sequencial x paralelo): páginas/s e transações/s
+- main() (sequencial x paralelo): tempo de ponta a ponta por fundo e total
+- cliente assíncrono (cliente_async_santander, se httpx estiver instalado):
+  todos os fundos, contas e páginas em um único loop, sem exportação
+- tempo de importação (partida a frio) de buscar_extratos_bancarios e
+  config_credentials em processos novos, contra ALVO_IMPORTACAO, e quais
+  backends pesados (ReportLab, openpyxl, numpy...) o import carregou
+
+Os certificados de cliente (e os do servidor, com --mtls) são gerados em uma
+pasta temporária via openssl. Nenhuma credencial real é usada.
+
+Uso:
+    python benchmark_extratos.py --fundos 3 --contas 2 --transacoes 5000 --latencia 0.05
+    python benchmark_extratos.py --mtls --pdf --json resultados.json
+    python benchmark_extratos.py --so-importacao     # só o tempo de import (sai com 1 acima do alvo)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from servidor_mock_santander import ConfiguracaoMock, ServidorMockSantander
+
+# Tempo de importação (partida a frio)
+MODULOS_IMPORTACAO = ("buscar_extratos_bancarios", "config_credentials")
+MODULOS_PESADOS = ("reportlab", "openpyxl", "numpy", "pandas", "streamlit")
+ALVO_IMPORTACAO = 0.25  # Segundos (mediana) por módulo
+
+_SCRIPT_IMPORTACAO = """
+import sys, time
+inicio = time.perf_counter()
+import {modulo}
+tempo = time.perf_counter() - inicio
+print(tempo, ",".join(m for m in {pesados!r} if m in sys.modules))
+"""
+
+
+def _openssl(*args):
+    subprocess.run(["openssl", *args], check=True, capture_output=True)
+
+
+def _gerar_certificados(pasta, mtls=False):
+    """
+    Gera uma CA de teste e os certificados assinados por ela
+
+    Returns:
+        Dicionário com ca, cliente_cert, cliente_key e (com mtls)
+        servidor_cert e servidor_key
+    """
+    pasta = Path(pasta)
+    certificados = {'ca': str(pasta / "ca.pem")}
+    _openssl("req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2",
+             "-keyout", str(pasta / "ca.key"), "-out", certificados['ca'], "-subj", "/CN=Mock Santander CA")
+
+    nomes = [("cliente", "/CN=benchmark-extratos", "extendedKeyUsage=clientAuth")]
+    if mtls:
+        nomes.append(("servidor", "/CN=localhost",
+                      "subjectAltName=DNS:localhost,IP:127.0.0.1\nextendedKeyUsage=serverAuth"))
+
+    for nome, assunto, extensoes in nomes:
+        cert, key, csr = (str(pasta / f"{nome}{ext}") for ext in (".pem", ".key", ".csr"))
+        extfile = pasta / f"{nome}.ext"
+        extfile.write_text(extensoes + "\n")
+        _openssl("req", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", csr, "-subj", assunto)
+        _openssl("x509", "-req", "-in", csr, "-CA", certificados['ca'], "-CAkey", str(pasta / "ca.key"),
+                 "-CAcreateserial", "-days", "2", "-out", cert, "-extfile", str(extfile))
+        certificados[f"{nome}_cert"] = cert
+        certificados[f"{nome}_key"] = key
+
+    return certificados
+
+
+def _importar_extratos():
+    """
+    Importa buscar_extratos_bancarios mesmo sem credenciais locais
+
+    Sem credenciais (nem secrets do Streamlit nem credenciais_bancos.py), o
+    primeiro acesso a SANTANDER_FUNDOS falha; nesse caso é registrado um
+    credenciais_bancos vazio, já que o benchmark só usa fundos fictícios.
+    """
+    import buscar_extratos_bancarios
+    try:
+        len(buscar_extratos_bancarios.SANTANDER_FUNDOS)
+    except Exception:
+        sys.modules["credenciais_bancos"] = types.SimpleNamespace(SANTANDER_FUNDOS={})
+    return buscar_extratos_bancarios
+
+
+def _cadastrar_fundos(extratos, quantidade, certificados):
+    """Registra BENCH01..BENCHnn em SANTANDER_FUNDOS e retorna os IDs"""
+    fundos = []
+    for i in range(1, quantidade + 1):
+        fundo_id = f"BENCH{i:02d}"
+        extratos.SANTANDER_FUNDOS[fundo_id] = {
+            'nome': f"FUNDO BENCHMARK {i:02d}",
+            'cnpj': f"{i:014d}",
+            'client_id': f"benchmark-client-{i:02d}",
+            'client_secret': "segredo-benchmark",
+            'cert_path': certificados['cliente_cert'],
+            'key_path': certificados['cliente_key'],
+        }
+        fundos.append(fundo_id)
+    return fundos
+
+
+def _transacoes_do_periodo(servidor, extratos, fundos, data_inicial, data_final):
+    """Total de transações que a API mock devolve para os fundos no período"""
+    total = 0
+    for fundo_id in fundos:
+        client_id = extratos.SANTANDER_FUNDOS[fundo_id]['client_id']
+        for conta in servidor.dados.contas(client_id):
+            account_id = f"{conta['branchCode'].zfill(4)}.{conta['number'].zfill(12)}"
+            total += len(servidor.dados.transacoes(account_id, data_inicial.date(), data_final.date()))
+    return total
+
+
+def _taxas(tempo, paginas, transacoes):
+    return {
+        'tempo': tempo,
+        'paginas': paginas,
+        'transacoes': transacoes,
+        'paginas_por_s': paginas / tempo if tempo else 0.0,
+        'transacoes_por_s': transacoes / tempo if tempo else 0.0,
+    }
+
+
+def medir_buscar_transacoes(extratos, servidor, fundo_id, data_inicial, data_final, limite, workers, repeticoes,
+                            janela=None):
+    """
+    Mede buscar_transacoes em uma conta, nos modos sequencial, paralelo e
+    (se janela for informada) paralelo com o período dividido em janelas
+
+    Returns:
+        Dicionário modo -> métricas (mediana das repetições)
+    """
+    cliente = extratos.SantanderExtratosBancarios(fundo_id)
+    conta = cliente.listar_contas()[0]
+    resultados = {}
+
+    modos = [('sequencial', False, None), ('paralelo', True, None)]
+    if janela:
+        modos.append(('janelas', True, janela))
+
+    for modo, paralelo, janela_modo in modos:
+        medicoes = []
+        for _ in range(repeticoes):
+            servidor.estatisticas.zerar()
+            inicio = time.perf_counter()
+            transacoes = cliente.buscar_transacoes(conta['branchCode'], conta['number'], data_inicial, data_final,
+                                                   limite=limite, paralelo=paralelo, max_workers=workers,
+                                                   janela=janela_modo)
+            tempo = time.perf_counter() - inicio
+            medicoes.append(_taxas(tempo, servidor.estatisticas.requisicoes('statements'), len(transacoes)))
+        resultados[modo] = sorted(medicoes, key=lambda m: m['tempo'])[len(medicoes) // 2]
+        resultados[modo]['tempos'] = [m['tempo'] for m in medicoes]
+    return resultados
+
+
+def medir_main(extratos, servidor, fundos, data_inicial, data_final, gerar_pdf, pasta, formato_colunar=None):
+    """
+    Mede main() nos modos sequencial e paralelo
+
+    Com formato_colunar, mede também a leitura de todos os extratos gerados:
+    arquivos colunares (carregar_extratos_colunares) x .xlsx (pd.read_excel,
+    se pandas estiver instalado).
+
+    Returns:
+        Dicionário modo -> métricas (tempo total, por fundo, páginas e transações)
+    """
+    transacoes = _transacoes_do_periodo(servidor, extratos, fundos, data_inicial, data_final)
+    resultados = {}
+
+    for modo, paralelo in (('sequencial', False), ('paralelo', True)):
+        pasta_saida = os.path.join(pasta, f"saida_{modo}")
+        os.makedirs(pasta_saida, exist_ok=True)
+        servidor.estatisticas.zerar()
+        resumo = extratos.main(fundos, data_inicial, data_final, pasta_saida=pasta_saida,
+                               gerar_pdf=gerar_pdf, paralelo=paralelo, formato_colunar=formato_colunar)
+        metricas = _taxas(resumo['tempo_total'], servidor.estatisticas.requisicoes('statements'), transacoes)
+        metricas['tempo_por_fundo'] = resumo['tempo_por_fundo']
+        metricas['fundos_com_erro'] = resumo['fundos_com_erro']
+        metricas['arquivos'] = len(resumo['artefatos'])
+        if formato_colunar:
+            metricas['leitura'] = _medir_leitura(resumo['artefatos'], formato_colunar)
+        resultados[modo] = metricas
+    return resultados
+
+
+def _medir_leitura(artefatos, formato_colunar):
+    """Tempo para carregar de volta todas as transações: arquivos colunares x Excel"""
+    from exportador_colunar import carregar_extratos_colunares
+
+    leitura = {}
+    colunares = [a['caminho'] for a in artefatos if a['formato'] == formato_colunar]
+    inicio = time.perf_counter()
+    tabela = carregar_extratos_colunares(colunares)
+    leitura['colunar'] = {'tempo': time.perf_counter() - inicio, 'linhas': tabela.num_rows}
+
+    try:
+        import pandas as pd
+    except ImportError:
+        return leitura
+    excels = [a['caminho'] for a in artefatos if a['formato'] == 'xlsx']
+    inicio = time.perf_counter()
+    linhas = sum(len(pd.read_excel(caminho, header=None)) for caminho in excels)
+    leitura['xlsx'] = {'tempo': time.perf_counter() - inicio, 'linhas': linhas}
+    return leitura
+
+
+def medir_async(extratos, servidor, fundos, data_inicial, data_final, limite, max_requisicoes):
+    """
+    Mede cliente_async_santander.buscar_extratos_async para todos os fundos
+
+    Returns:
+        Métricas (tempo, páginas, transações) ou None sem httpx
+    """
+    import cliente_async_santander
+    if not cliente_async_santander.HAS_HTTPX:
+        return None
+
+    servidor.estatisticas.zerar()
+    inicio = time.perf_counter()
+    resultados = cliente_async_santander.buscar_extratos_async(fundos, data_inicial, data_final, limite=limite,
+                                                               max_requisicoes=max_requisicoes)
+    tempo = time.perf_counter() - inicio
+    transacoes = sum(len(conta['transacoes']) for r in resultados.values() for conta in r['contas'])
+    metricas = _taxas(tempo, servidor.estatisticas.requisicoes('statements'), transacoes)
+    metricas['fundos_com_erro'] = [fundo_id for fundo_id, r in resultados.items() if r['erro']]
+    return metricas
+
+
+def medir_importacao(repeticoes, alvo=ALVO_IMPORTACAO, modulos=MODULOS_IMPORTACAO):
+    """
+    Mede o import de cada módulo em processos Python novos (partida a frio)
+
+    Returns:
+        Dicionário módulo -> mediana, máximo, alvo, ok e backends pesados
+        carregados pelo import
+    """
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    resultados = {}
+    for modulo in modulos:
+        tempos, pesados = [], set()
+        for _ in range(repeticoes):
+            saida = subprocess.run(
+                [sys.executable, "-c", _SCRIPT_IMPORTACAO.format(modulo=modulo, pesados=MODULOS_PESADOS)],
+                cwd=pasta, capture_output=True, text=True, check=True,
+            ).stdout.strip().splitlines()[-1]
+            tempo, _, carregados = saida.partition(" ")
+            tempos.append(float(tempo))
+            pesados.update(filter(None, carregados.split(",")))
+        mediana = sorted(tempos)[len(tempos) // 2]
+        resultados[modulo] = {
+            'mediana': mediana, 'maximo': max(tempos), 'alvo': alvo,
+            'ok': mediana <= alvo, 'pesados': sorted(pesados),
+        }
+    return resultados
+
+
+def _imprimir_importacao(importacao):
+    print("\n⏱️  Importação (partida a frio, processo novo)")
+    print("-"*80)
+    for modulo, m in importacao.items():
+        status = "✅" if m['ok'] else "❌"
+        pesados = f" | carrega: {', '.join(m['pesados'])}" if m['pesados'] else ""
+        print(f"   {status} {modulo}: {m['mediana'] * 1000:.0f} ms (máx. {m['maximo'] * 1000:.0f} ms, "
+              f"alvo {m['alvo'] * 1000:.0f} ms){pesados}")
+
+
+def _imprimir(resultados):
+    print("\n" + "="*80)
+    print("RESULTADOS DO BENCHMARK")
+    print("="*80)
+
+    print("\n📊 buscar_transacoes (1 conta)")
+    print("-"*80)
+    print(f"   {'Modo':<12}{'Tempo (s)':>12}{'Páginas':>10}{'Transações':>12}{'Páginas/s':>12}{'Transações/s':>15}")
+    for modo, m in resultados['buscar_transacoes'].items():
+        print(f"   {modo:<12}{m['tempo']:>12.3f}{m['paginas']:>10}{m['transacoes']:>12}"
+              f"{m['paginas_por_s']:>12.1f}{m['transacoes_por_s']:>15.0f}")
+
+    print("\n📊 main() (todos os fundos)")
+    print("-"*80)
+    for modo, m in resultados['main'].items():
+        print(f"   {modo}: {m['tempo']:.2f}s | {m['paginas']} páginas ({m['paginas_por_s']:.1f}/s) | "
+              f"{m['transacoes']} transações ({m['transacoes_por_s']:.0f}/s) | {m['arquivos']} arquivo(s)")
+        for fundo_id, tempo in m['tempo_por_fundo'].items():
+            print(f"      • {fundo_id}: {tempo:.2f}s")
+        for formato, leitura in m.get('leitura', {}).items():
+            print(f"      📖 leitura {formato}: {leitura['tempo'] * 1000:.0f} ms ({leitura['linhas']} linhas)")
+        if m['fundos_com_erro']:
+            print(f"      ❌ Fundos com erro: {', '.join(m['fundos_com_erro'])}")
+
+    m = resultados.get('async')
+    if m:
+        print("\n📊 cliente assíncrono (todos os fundos, sem exportação)")
+        print("-"*80)
+        print(f"   async: {m['tempo']:.2f}s | {m['paginas']} páginas ({m['paginas_por_s']:.1f}/s) | "
+              f"{m['transacoes']} transações ({m['transacoes_por_s']:.0f}/s)")
+        if m['fundos_com_erro']:
+            print(f"      ❌ Fundos com erro: {', '.join(m['fundos_com_erro'])}")
+
+    if resultados.get('limitadores'):
+        print("\n🚦 Limitadores de taxa (acumulado)")
+        print("-"*80)
+        for client_id, m in resultados['limitadores'].items():
+            print(f"   {client_id}: {m['requisicoes']} req | 429: {m['respostas_429']} | 5xx: {m['respostas_5xx']} | "
+                  f"exceções: {m['excecoes']} | novas tentativas: {m['novas_tentativas']} | "
+                  f"falhas definitivas: {m['falhas_definitivas']} | espera {m['tempo_espera']:.1f}s | "
+                  f"taxa {m['taxa_atual']:.1f}/{m['taxa_maxima']:.0f} req/s")
+
+    if resultados.get('importacao'):
+        _imprimir_importacao(resultados['importacao'])
+
+    print("\n" + "="*80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extratos contra o servidor mock")
+    parser.add_argument("--fundos", type=int, default=2, help="Fundos fictícios")
+    parser.add_argument("--contas", type=int, default=2, help="Contas por fundo")
+    parser.add_argument("--transacoes", type=int, default=5000, help="Transações por conta")
+    parser.add_argument("--dias", type=int, default=30, help="Dias do período consultado")
+    parser.add_argument("--latencia", type=float, default=0.05, help="Atraso fixo por requisição (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Atraso aleatório adicional máximo (s)")
+    parser.add_argument("--pagina-max", type=int, default=500, help="Máximo de transações por página no servidor")
+    parser.add_argument("--limite", type=int, default=1000, help="_limit pedido pelo cliente")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração de respostas 503")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--workers", type=int, default=4, help="Páginas simultâneas no modo paralelo")
+    parser.add_argument("--janela", default="semana",
+                        help="Janela do modo 'janelas' (semana, mes ou nº de dias; vazio = não medir)")
+    parser.add_argument("--taxa-maxima", type=float, default=None,
+                        help="Requisições/s por client_id no limitador (padrão: SANTANDER_TAXA_MAXIMA ou 50)")
+    parser.add_argument("--requisicoes-async",type=int, default=256,
+                        help="Requisições simultâneas do cliente assíncrono")
+    parser.add_argument("--repeticoes",type=int, default=3, help="Repetições de buscar_transacoes por modo")
+    parser.add_argument("--pdf", action="store_true", help="Gerar PDFs em main()")
+    parser.add_argument("--colunar", choices=("parquet", "arrow"),
+                        help="Gerar também o extrato colunar em main() e medir a leitura x Excel")
+    parser.add_argument("--mtls", action="store_true", help="Servidor HTTPS exigindo certificado do cliente")
+    parser.add_argument("--verbose", action="store_true", help="Manter os logs de buscar_extratos_bancarios")
+    parser.add_argument("--json", help="Salvar os resultados neste arquivo JSON")
+    parser.add_argument("--repeticoes-importacao", type=int, default=5,
+                        help="Processos novos por módulo na medição do import")
+    parser.add_argument("--alvo-importacao", type=float, default=ALVO_IMPORTACAO,
+                        help="Tempo máximo (s, mediana) de import por módulo")
+    parser.add_argument("--so-importacao", action="store_true",
+                        help="Medir apenas o tempo de import (código de saída 1 acima do alvo)")
+    args = parser.parse_args()
+
+    if args.so_importacao:
+        importacao = medir_importacao(args.repeticoes_importacao, args.alvo_importacao)
+        _imprimir_importacao(importacao)
+        sys.exit(0 if all(m['ok'] for m in importacao.values()) else 1)
+
+    with tempfile.TemporaryDirectory(prefix="benchmark_extratos_") as pasta:
+        certificados = _gerar_certificados(pasta, mtls=args.mtls)
+
+        config = ConfiguracaoMock(
+            latencia=args.latencia, jitter=args.jitter, tamanho_pagina_max=args.pagina_max,
+            taxa_erro=args.taxa_erro, taxa_429=args.taxa_429, num_contas=args.contas,
+            transacoes_por_conta=args.transacoes, dias=args.dias,
+            cert_path=certificados.get('servidor_cert'), key_path=certificados.get('servidor_key'),
+            ca_clientes=certificados['ca'] if args.mtls else None,
+        )
+
+        with ServidorMockSantander(config) as servidor:
+            os.environ["SANTANDER_API_BASE_URL"] = servidor.url_base
+            os.environ["SANTANDER_CACHE_CONTAS"] = os.path.join(pasta, "contas_santander.json")
+            extratos = _importar_extratos()
+            extratos.API_BASE_URL = servidor.url_base
+            extratos.VERBOSE = args.verbose
+            if args.taxa_maxima:
+                import limitador_taxa
+                limitador_taxa.TAXA_MAXIMA = args.taxa_maxima
+            if args.mtls:
+                import sessao_santander
+                sessao_santander.CA_BUNDLE_EXTRA = certificados['ca']
+
+            fundos = _cadastrar_fundos(extratos, args.fundos, certificados)
+            janela = int(args.janela) if args.janela.isdigit() else args.janela
+            data_final = datetime.now()
+            data_inicial = data_final - timedelta(days=args.dias - 1)
+
+            print(f"🌐 Servidor mock: {servidor.url_base} ({'mTLS' if args.mtls else 'HTTP'})")
+            print(f"🏦 {args.fundos} fundo(s) x {args.contas} conta(s) x {args.transacoes} transações | "
+                  f"latência {args.latencia}s + até {args.jitter}s | página máx. {args.pagina_max}")
+
+            resultados = {
+                'parametros': vars(args),
+                'buscar_transacoes': medir_buscar_transacoes(extratos, servidor, fundos[0], data_inicial,
+                                                             data_final, args.limite, args.workers,
+                                                             args.repeticoes, janela),
+                'main': medir_main(extratos, servidor, fundos, data_inicial, data_final, args.pdf, pasta,
+                                   args.colunar),
+                'async': medir_async(extratos, servidor, fundos, data_inicial, data_final, args.limite,
+                                     args.requisicoes_async),
+                'servidor': servidor.estatisticas.como_dict(),
+                'limitadores': extratos.estatisticas_limitadores(),
+                'importacao': medir_importacao(args.repeticoes_importacao, args.alvo_importacao),
+            }
+
+    _imprimir(resultados)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False, default=str)
+        print(f"💾 Resultados salvos em {args.json}")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
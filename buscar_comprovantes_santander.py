@@ -9,7 +9,9 @@ from datetime import datetime, date, timedelta
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import condicional para compatibilidade com Streamlit Cloud
 try:
@@ -26,6 +28,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Concorrência do pipeline de comprovantes (buscar_comprovantes_periodo)
+MAX_CONCORRENCIA_COMPROVANTES = 8   # Requisições simultâneas à API (solicitar/consultar status)
+MAX_DOWNLOADS_SIMULTANEOS = 4       # Downloads de PDF simultâneos
+VALIDADE_URL_DOWNLOAD = 300         # Segundos de validade da URL temporária do PDF
+MARGEM_URL_DOWNLOAD = 60            # Renova a URL antes do download se restar menos que isso
+
+
+class URLExpiradaError(Exception):
+    """URL temporária do PDF recusada pelo storage (403/404): precisa ser obtida de novo"""
+
 
 class SantanderComprovantes:
     """
@@ -43,6 +55,9 @@ class SantanderComprovantes:
         self.auth = santander_auth
         self.api_base = self.auth.base_urls[self.auth.ambiente]['api']
         
+        # Evita que várias threads renovem o token ao mesmo tempo
+        self._lock_token = threading.Lock()
+        
         # Diretório para salvar comprovantes (na pasta do projeto pipe)
         self.comprovantes_dir = Path(__file__).parent / "Comprovantes"
         self.comprovantes_dir.mkdir(exist_ok=True)
@@ -72,15 +87,16 @@ class SantanderComprovantes:
         """
         print(f"DEBUG _get_headers: Verificando validade do token...")
         # Garante que temos um token válido
-        if not self.auth._is_token_valid():
-            logger.info("Token expirado, obtendo novo token...")
-            print(f"DEBUG: Token inválido/expirado, chamando obter_token_acesso...")
-            self.auth.obter_token_acesso()
-            print(f"DEBUG: Token obtido com sucesso")
-        else:
-            print(f"DEBUG: Token ainda válido")
-        
-        token = self.auth.token_data['access_token']
+        with self._lock_token:
+            if not self.auth._is_token_valid():
+                logger.info("Token expirado, obtendo novo token...")
+                print(f"DEBUG: Token inválido/expirado, chamando obter_token_acesso...")
+                self.auth.obter_token_acesso()
+                print(f"DEBUG: Token obtido com sucesso")
+            else:
+                print(f"DEBUG: Token ainda válido")
+            
+            token = self.auth.token_data['access_token']
         
         return {
             "Authorization": f"Bearer {token}",
@@ -345,10 +361,10 @@ class SantanderComprovantes:
                     for key, value in response.headers.items():
                         logger.info(f"  {key}: {value}")
                     
-                    if response.status_code == 403:
-                        logger.error("❌ Acesso negado (403) - URL pode ter expirado")
+                    if response.status_code in (403, 404):
+                        logger.error(f"❌ Acesso negado ({response.status_code}) - URL pode ter expirado")
                         logger.error(f"Response: {response.text[:500]}")
-                        raise Exception("URL expirada ou sem permissão")
+                        raise URLExpiradaError("URL expirada ou sem permissão")
                     
                     response.raise_for_status()
                     
@@ -396,9 +412,9 @@ class SantanderComprovantes:
                                           headers=headers, allow_redirects=True)
                     logger.info(f"Status: {response.status_code}")
                     
-                    if response.status_code == 403:
-                        logger.error("❌ Acesso negado (403) - URL expirada")
-                        raise Exception("URL expirada")
+                    if response.status_code in (403, 404):
+                        logger.error(f"❌ Acesso negado ({response.status_code}) - URL expirada")
+                        raise URLExpiradaError("URL expirada")
                     
                     response.raise_for_status()
                     
@@ -572,6 +588,79 @@ class SantanderComprovantes:
             logger.error(f"Erro ao consultar comprovantes existentes: {type(e).__name__}: {e}")
             return None
     
+    def _renovar_url_download(self, payment_id: str, request_id: str = None) -> Optional[str]:
+        """
+        Obtém uma nova URL temporária para um PDF já gerado
+        
+        Args:
+            payment_id: ID do pagamento
+            request_id: Requisição de geração (None = a mais recente do pagamento)
+        
+        Returns:
+            Nova URL de download ou None se o PDF não estiver mais disponível
+        """
+        try:
+            if request_id:
+                result = self.consultar_status_pdf(payment_id, request_id)
+                if result.get('file', {}).get('statusInfo', {}).get('statusCode') == 'AVAILABLE':
+                    return result.get('file', {}).get('fileRepository', {}).get('location')
+                return None
+            existente = self.consultar_comprovantes_existentes(payment_id)
+            if existente and existente.get('disponivel'):
+                return existente.get('url_download')
+        except Exception as e:
+            logger.warning(f"⚠️ {payment_id}: erro ao renovar URL de download: {e}")
+        return None
+    
+    def _baixar_com_retry(self, url_download: str, payment_id: str, max_retries: int = 3,
+                          request_id: str = None) -> Optional[str]:
+        """
+        Baixa o PDF com até max_retries tentativas
+        
+        Se o storage recusar a URL (403/404, URL expirada), uma nova URL é
+        obtida na API antes da próxima tentativa.
+        
+        Returns:
+            Caminho do arquivo salvo ou None se falhou
+        """
+        for tentativa in range(1, max_retries + 1):
+            try:
+                logger.info(f"Tentativa de download {tentativa}/{max_retries}")
+                arquivo_salvo = self.baixar_pdf(url_download, payment_id)
+                logger.info(f"✅✅✅ Comprovante salvo com sucesso: {arquivo_salvo}")
+                return arquivo_salvo
+            except URLExpiradaError:
+                if tentativa >= max_retries:
+                    logger.error(f"❌ Falha após {max_retries} tentativas (URL expirada)")
+                    return None
+                logger.warning(f"⏱️ {payment_id}: URL expirada, solicitando uma nova...")
+                url_download = self._renovar_url_download(payment_id, request_id)
+                if not url_download:
+                    logger.error(f"❌ {payment_id}: não foi possível obter uma nova URL de download")
+                    return None
+            except requests.exceptions.Timeout:
+                if tentativa < max_retries:
+                    logger.warning(f"⏱️ Timeout na tentativa {tentativa}, tentando novamente em 1s...")
+                    time.sleep(1)
+                else:
+                    logger.error(f"❌ Falha após {max_retries} tentativas de timeout")
+                    return None
+            except requests.exceptions.RequestException as e:
+                logger.error(f"❌ Erro de requisição na tentativa {tentativa}: {e}")
+                if tentativa < max_retries:
+                    logger.info("Tentando novamente em 1s...")
+                    time.sleep(1)
+                else:
+                    logger.error(f"❌ Falha após {max_retries} tentativas")
+                    return None
+            except Exception as e:
+                logger.error(f"❌ Erro inesperado na tentativa {tentativa}: {type(e).__name__}: {e}")
+                if tentativa >= max_retries:
+                    return None
+                time.sleep(1)
+        
+        return None
+    
     def buscar_e_baixar_comprovante(self, payment_id: str, 
                                      aguardar: bool = True,
                                      max_retries: int = 3,
@@ -660,34 +749,7 @@ class SantanderComprovantes:
             logger.info(f"Etapa 3/3: Baixando PDF (max {max_retries} tentativas)...")
             logger.info("⚠️ IMPORTANTE: Baixando imediatamente pois URL expira em 5 minutos!")
             
-            for tentativa in range(1, max_retries + 1):
-                try:
-                    logger.info(f"Tentativa de download {tentativa}/{max_retries}")
-                    arquivo_salvo = self.baixar_pdf(url_download, payment_id)
-                    logger.info(f"✅✅✅ Comprovante salvo com sucesso: {arquivo_salvo}")
-                    return arquivo_salvo
-                except requests.exceptions.Timeout:
-                    if tentativa < max_retries:
-                        logger.warning(f"⏱️ Timeout na tentativa {tentativa}, tentando novamente em 1s...")
-                        time.sleep(1)
-                    else:
-                        logger.error(f"❌ Falha após {max_retries} tentativas de timeout")
-                        return None
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"❌ Erro de requisição na tentativa {tentativa}: {e}")
-                    if tentativa < max_retries:
-                        logger.info("Tentando novamente em 1s...")
-                        time.sleep(1)
-                    else:
-                        logger.error(f"❌ Falha após {max_retries} tentativas")
-                        return None
-                except Exception as e:
-                    logger.error(f"❌ Erro inesperado na tentativa {tentativa}: {type(e).__name__}: {e}")
-                    if tentativa >= max_retries:
-                        return None
-                    time.sleep(1)
-            
-            return None
+            return self._baixar_com_retry(url_download, payment_id, max_retries, request_id)
             
         except Exception as e:
             logger.error(f"❌ Erro no fluxo completo: {type(e).__name__}: {e}")
@@ -695,14 +757,184 @@ class SantanderComprovantes:
             logger.error(traceback.format_exc())
             return None
     
+    def _preparar_comprovante(self, payment_id: str):
+        """
+        Etapa 1 do pipeline: reaproveita um comprovante existente ou solicita a geração
+        
+        Returns:
+            Tupla (acao, valor):
+            ('baixar', url_download) - PDF já disponível
+            ('aguardar', request_id) - geração em andamento
+            ('erro', None)           - falha ao solicitar
+        """
+        try:
+            existente = self.consultar_comprovantes_existentes(payment_id)
+            
+            if existente and existente.get('disponivel'):
+                logger.info(f"✅ {payment_id}: comprovante já disponível")
+                return 'baixar', existente.get('url_download')
+            
+            if existente and existente.get('status') == 'REQUESTED' and existente.get('request_id'):
+                # Geração já solicitada anteriormente: acompanhar a mesma requisição
+                logger.info(f"⏳ {payment_id}: geração já em andamento ({existente.get('request_id')})")
+                return 'aguardar', existente.get('request_id')
+            
+            result = self.solicitar_geracao_pdf(payment_id)
+            request_id = result.get('request', {}).get('requestId')
+            if not request_id:
+                logger.error(f"❌ {payment_id}: não foi possível obter request_id")
+                logger.error(f"Response: {json.dumps(result, indent=2)}")
+                return 'erro', None
+            
+            return 'aguardar', request_id
+        
+        except Exception as e:
+            logger.error(f"❌ {payment_id}: erro ao solicitar comprovante: {type(e).__name__}: {e}")
+            return 'erro', None
+    
+    def _verificar_status(self, payment_id: str, request_id: str):
+        """
+        Etapa 2 do pipeline: consulta o status de uma geração
+        
+        Returns:
+            ('baixar', url_download), ('aguardar', None) ou ('erro', None)
+        """
+        try:
+            result = self.consultar_status_pdf(payment_id, request_id)
+        except Exception as e:
+            # Falha pontual: tentar de novo na próxima rodada
+            logger.warning(f"⚠️ {payment_id}: erro ao consultar status: {e}")
+            return 'aguardar', None
+        
+        status = result.get('file', {}).get('statusInfo', {}).get('statusCode')
+        
+        if status == 'AVAILABLE':
+            url = result.get('file', {}).get('fileRepository', {}).get('location')
+            if url:
+                return 'baixar', url
+            logger.error(f"❌ {payment_id}: status AVAILABLE mas URL não encontrada no response")
+            return 'erro', None
+        if status == 'FAILED':
+            logger.error(f"❌ {payment_id}: geração do PDF falhou no servidor")
+            return 'erro', None
+        if status != 'REQUESTED':
+            logger.warning(f"⚠️ {payment_id}: status inesperado: {status}")
+        return 'aguardar', None
+    
+    def baixar_comprovantes_concorrente(self, payment_ids: List[str],
+                                        max_concorrencia: int = MAX_CONCORRENCIA_COMPROVANTES,
+                                        max_downloads: int = MAX_DOWNLOADS_SIMULTANEOS,
+                                        max_tentativas: int = 15, intervalo: int = 1,
+                                        max_retries: int = 3) -> Dict[str, str]:
+        """
+        Baixa vários comprovantes em um pipeline com concorrência limitada
+        
+        Etapas:
+        1. Verifica comprovantes existentes e solicita a geração de TODOS de uma vez
+        2. Consulta o status de todos os pendentes em rodadas (uma a cada `intervalo`s)
+        3. Cada PDF é baixado assim que fica AVAILABLE (a URL expira em 5 minutos),
+           enquanto os demais continuam sendo consultados. Se o download esperou
+           na fila até perto da validade (ou o storage recusar a URL), uma nova
+           URL é obtida antes de baixar
+        
+        Args:
+            payment_ids: IDs dos pagamentos
+            max_concorrencia: Requisições simultâneas à API (etapas 1 e 2)
+            max_downloads: Downloads simultâneos (etapa 3)
+            max_tentativas: Consultas de status por comprovante antes de desistir
+            intervalo: Segundos entre rodadas de consulta
+            max_retries: Tentativas de download por comprovante
+        
+        Returns:
+            Dicionário com payment_id -> caminho do arquivo (ou "ERRO"), na ordem recebida
+        """
+        resultados = {}
+        pendentes = {}  # payment_id -> [request_id, consultas realizadas]
+        downloads = {}  # futuro -> payment_id
+        
+        def baixar(payment_id, url_download, request_id, obtida_em):
+            # A URL pode ter envelhecido na fila de downloads (limitada por max_downloads)
+            if time.monotonic() - obtida_em > VALIDADE_URL_DOWNLOAD - MARGEM_URL_DOWNLOAD:
+                logger.info(f"🔄 {payment_id}: URL perto de expirar, solicitando uma nova")
+                url_download = self._renovar_url_download(payment_id, request_id) or url_download
+            return self._baixar_com_retry(url_download, payment_id, max_retries, request_id)
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_concorrencia), thread_name_prefix="comprovante") as executor_api, \
+             ThreadPoolExecutor(max_workers=max(1, max_downloads), thread_name_prefix="download") as executor_downloads:
+            
+            def agendar_download(payment_id, url_download, request_id=None):
+                logger.info(f"📥 {payment_id}: PDF disponível, iniciando download")
+                futuro = executor_downloads.submit(baixar, payment_id, url_download, request_id, time.monotonic())
+                downloads[futuro] = payment_id
+            
+            # ETAPA 1: Solicitar todos
+            logger.info(f"Etapa 1/3: Solicitando {len(payment_ids)} comprovante(s)...")
+            futuros = {executor_api.submit(self._preparar_comprovante, pid): pid for pid in payment_ids}
+            for futuro in as_completed(futuros):
+                payment_id = futuros[futuro]
+                acao, valor = futuro.result()
+                if acao == 'baixar':
+                    agendar_download(payment_id, valor)
+                elif acao == 'aguardar':
+                    pendentes[payment_id] = [valor, 0]
+                else:
+                    resultados[payment_id] = "ERRO"
+            
+            # ETAPA 2: Consultar status de todos os pendentes, em rodadas
+            logger.info(f"Etapa 2/3: Aguardando {len(pendentes)} PDF(s) ficarem disponíveis...")
+            while pendentes:
+                inicio_rodada = time.monotonic()
+                futuros = {
+                    executor_api.submit(self._verificar_status, pid, request_id): pid
+                    for pid, (request_id, _) in pendentes.items()
+                }
+                for futuro in as_completed(futuros):
+                    payment_id = futuros[futuro]
+                    acao, valor = futuro.result()
+                    if acao == 'baixar':
+                        request_id = pendentes.pop(payment_id)[0]
+                        agendar_download(payment_id, valor, request_id)
+                    elif acao == 'erro':
+                        del pendentes[payment_id]
+                        resultados[payment_id] = "ERRO"
+                    else:
+                        pendentes[payment_id][1] += 1
+                        if pendentes[payment_id][1] >= max_tentativas:
+                            logger.error(f"❌ {payment_id}: PDF não ficou disponível em {max_tentativas * intervalo}s")
+                            del pendentes[payment_id]
+                            resultados[payment_id] = "ERRO"
+                
+                if pendentes:
+                    espera = intervalo - (time.monotonic() - inicio_rodada)
+                    if espera > 0:
+                        time.sleep(espera)
+            
+            # ETAPA 3: Aguardar os downloads em andamento
+            logger.info(f"Etapa 3/3: Concluindo {len(downloads)} download(s)...")
+            for futuro in as_completed(downloads):
+                payment_id = downloads[futuro]
+                try:
+                    arquivo = futuro.result()
+                except Exception as e:
+                    logger.error(f"❌ {payment_id}: erro no download: {type(e).__name__}: {e}")
+                    arquivo = None
+                resultados[payment_id] = arquivo if arquivo else "ERRO"
+        
+        return {pid: resultados.get(pid, "ERRO") for pid in payment_ids}
+    
     def buscar_comprovantes_periodo(self, dias: int = 30, 
-                                     auto_baixar: bool = True) -> Dict[str, str]:
+                                     auto_baixar: bool = True,
+                                     paralelo: bool = True,
+                                     max_concorrencia: int = MAX_CONCORRENCIA_COMPROVANTES) -> Dict[str, str]:
         """
         Busca e baixa todos os comprovantes dos últimos N dias
         
         Args:
             dias: Número de dias para buscar
             auto_baixar: Se True, baixa automaticamente todos os PDFs
+            paralelo: Se True, usa o pipeline concorrente (baixar_comprovantes_concorrente);
+                se False, processa um comprovante por vez
+            max_concorrencia: Requisições simultâneas à API no modo paralelo
         
         Returns:
             Dicionário com payment_id -> caminho do arquivo
@@ -730,7 +962,26 @@ class SantanderComprovantes:
         # Baixa cada comprovante (se solicitado)
         resultados = {}
         
-        if auto_baixar:
+        if auto_baixar and paralelo:
+            logger.info(f"\n🚀 Iniciando download de {len(receipts)} comprovante(s) "
+                        f"(pipeline concorrente, {max_concorrencia} simultâneos)...\n")
+            
+            payment_ids = []
+            for i, receipt in enumerate(receipts, 1):
+                payment_id = receipt.get('payment', {}).get('paymentId')
+                if not payment_id:
+                    logger.warning(f"Comprovante {i} sem payment_id")
+                    continue
+                payment_ids.append(payment_id)
+            
+            resultados = self.baixar_comprovantes_concorrente(payment_ids, max_concorrencia=max_concorrencia)
+            
+            sucesso = sum(1 for v in resultados.values() if v != "ERRO")
+            logger.info(f"✅ {sucesso}/{len(payment_ids)} comprovante(s) baixado(s) com sucesso")
+            if sucesso < len(payment_ids):
+                logger.error(f"❌ {len(payment_ids) - sucesso} comprovante(s) com erro")
+        
+        elif auto_baixar:
             logger.info(f"\n🚀 Iniciando download de {len(receipts)} comprovante(s)...\n")
             
             for i, receipt in enumerate(receipts, 1):
@@ -10,29 +10,75 @@ IMPORTANTE: Este script usa a API "Balance and Statement" do Santander que:
 - ⚠️  Requer credenciais específicas diferentes das de "Payment Receipts"
 """
 
-import requests
 import json
 import base64
+import logging
+import sys
 from datetime import datetime, timedelta
-import pandas as pd
 import os
 from pathlib import Path
 import uuid
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from sessao_santander import obter_sessao, estatisticas_sessoes
+from limitador_taxa import obter_limitador, executar_com_backoff, estatisticas_limitadores
+from cache_tokens import obter_cache_tokens
+from cache_contas import obter_cache_contas
+from formatacao_brl import formatar_brl, formatar_brl_lote, data_por_extenso, data_periodo_ibe
+from diario_execucao import abrir_diario_execucao
+from cache_paginas import obter_cache_paginas, janela_encerrada
+from armazem_transacoes import ArmazemTransacoes, data_da_transacao
+# exportador_excel (openpyxl), motor_extrato (numpy) e renderizador_pdf (ReportLab)
+# são importados sob demanda, na primeira exportação: o import deste módulo
+# (dashboard a cada rerun, scripts de linha de comando) fica leve
+from agendador_extratos import (
+    AgendadorExtratos, executar_sequencial,
+    MAX_FUNDOS, MAX_CONTAS_POR_FUNDO, MAX_CONTAS_TOTAL
+)
 
 # Controle de verbosidade (pode ser alterado externamente)
+# VERBOSE = False mantém apenas avisos e erros (WARNING ou acima)
 VERBOSE = True
 
+# Logger do módulo: mensagens puras no stdout (mesma saída do antigo print).
+# O nível vem de SANTANDER_LOG_NIVEL (padrão INFO); os dumps de payload são
+# DEBUG e só rodam com SANTANDER_LOG_NIVEL=DEBUG ou definir_nivel_log("DEBUG")
+logger = logging.getLogger("extratos_santander")
+if not logger.handlers:
+    _handler_log = logging.StreamHandler(sys.stdout)
+    _handler_log.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler_log)
+    logger.propagate = False
+logger.setLevel(os.environ.get("SANTANDER_LOG_NIVEL", "INFO").upper())
+
+
+def definir_nivel_log(nivel):
+    """Altera o nível do logger ("DEBUG", "INFO", logging.WARNING, ...)"""
+    logger.setLevel(nivel.upper() if isinstance(nivel, str) else nivel)
+
+
+def log_ativo(nivel=logging.INFO):
+    """True se uma mensagem do nível seria escrita (use antes de montar payloads caros)"""
+    return (VERBOSE or nivel >= logging.WARNING) and logger.isEnabledFor(nivel)
+
+
+def log(mensagem, *args, nivel=logging.INFO):
+    """
+    Registra uma mensagem no logger do módulo
+    
+    Formatação preguiçosa: com args, a mensagem usa %-placeholders e só é
+    montada se o nível estiver habilitado - log("Página %d: %d transações", p, n)
+    não custa nada com o log desligado (ao contrário de uma f-string).
+    """
+    if log_ativo(nivel):
+        logger.log(nivel, mensagem, *args)
+
 
-def log(mensagem):
-    """Print condicional baseado em VERBOSE"""
-    if VERBOSE:
-        print(mensagem)
+def log_debug(mensagem, *args):
+    """Mensagem DEBUG (dumps de payload/transações) - desligada por padrão"""
+    if log_ativo(logging.DEBUG):
+        logger.debug(mensagem, *args)
 
 
 # Tentar importar credenciais - suporta Streamlit Cloud e local
@@ -48,12 +94,287 @@ try:
 except ImportError:
     HAS_CREDENCIAIS = False
     SANTANDER_FUNDOS = {}
-    log("⚠️  Credenciais não disponíveis")
+    log("⚠️  Credenciais não disponíveis", nivel=logging.WARNING)
 
 # Configurações para extrato
 CERT_PATH = r"C:\Users\GustavoPrometti\Cert\santander_cert.pem"
 KEY_PATH = r"C:\Users\GustavoPrometti\Cert\santander_key.pem"
 BANK_ID = "90400888000142"  # CNPJ do Santander
+ESCOPO_EXTRATOS = "open_banking_balances_statement"
+
+# URL base da API (SANTANDER_API_BASE_URL permite apontar para um servidor local,
+# como o servidor_mock_santander.py)
+API_BASE_URL = os.environ.get("SANTANDER_API_BASE_URL", "https://trust-open.api.santander.com.br").rstrip("/")
+
+# Paginação de transações
+MAX_PAGINAS = 500         # Limite de segurança (500 páginas = ~500k transações)
+TENTATIVAS_REQUISICAO = 5 # Tentativas por requisição (429/5xx/timeout/conexão) antes de desistir
+TIMEOUT_REQUISICAO = 30   # Segundos por requisição
+WORKERS_PAGINAS = 4       # Páginas buscadas simultaneamente no modo paralelo
+
+# /accounts com lista anterior em cache (cache_contas): falhar rápido e usar o cache
+TENTATIVAS_CONTAS_COM_CACHE = 2
+TIMEOUT_CONTAS_COM_CACHE = 10
+
+# Divisão de períodos longos em janelas buscadas em paralelo
+JANELA_SEMANA = "semana"  # Segunda a domingo
+JANELA_MES = "mes"        # Mês civil
+WORKERS_JANELAS = 4       # Janelas buscadas simultaneamente
+TENTATIVAS_JANELA = 2     # Tentativas de uma janela incompleta antes de desistir
+
+class ExtratoIncompletoError(Exception):
+    """Busca de transações que não trouxe todas as páginas (transacoes = o que foi recebido)"""
+    
+    def __init__(self, mensagem, transacoes=None):
+        super().__init__(mensagem)
+        self.transacoes = transacoes or []
+
+
+def dividir_periodo(data_inicial, data_final, janela):
+    """
+    Divide um período em janelas consecutivas, sem sobreposição
+    
+    Args:
+        data_inicial: Início do período (datetime)
+        data_final: Fim do período (datetime, inclusive)
+        janela: JANELA_SEMANA (segunda a domingo), JANELA_MES (mês civil) ou
+            número de dias por janela
+    
+    Returns:
+        Lista de tuplas (inicio, fim) em ordem cronológica; a primeira e a
+        última janela são recortadas nos limites do período
+    """
+    if janela not in (JANELA_SEMANA, JANELA_MES) and (not isinstance(janela, int) or janela < 1):
+        raise ValueError(f"Janela inválida: {janela!r} (use '{JANELA_SEMANA}', '{JANELA_MES}' ou nº de dias)")
+    
+    janelas = []
+    inicio = data_inicial
+    while inicio.date() <= data_final.date():
+        if janela == JANELA_SEMANA:
+            fim = inicio + timedelta(days=6 - inicio.weekday())
+        elif janela == JANELA_MES:
+            proximo_mes = (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+            fim = proximo_mes - timedelta(days=1)
+        else:
+            fim = inicio + timedelta(days=janela - 1)
+        fim = min(fim, data_final)
+        janelas.append((inicio, fim))
+        inicio = fim + timedelta(days=1)
+    return janelas
+
+
+# ---------------------------------------------------------------------- #
+# Montagem de requisições e normalização de respostas
+# (compartilhadas com o cliente assíncrono em cliente_async_santander.py)
+# ---------------------------------------------------------------------- #
+def formatar_account_id(branch_code, account_number):
+    """account_id conforme API: AAAA.CCCCCCCCCCCC (4 dígitos agência + 12 dígitos conta)"""
+    return f"{str(branch_code).zfill(4)}.{str(account_number).zfill(12)}"
+
+
+def url_extrato(branch_code, account_number):
+    """Endpoint de statements da conta"""
+    account_id = formatar_account_id(branch_code, account_number)
+    return f"{API_BASE_URL}/bank_account_information/v1/banks/{BANK_ID}/statements/{account_id}"
+
+
+def _grupo_diario(fundo_id, url):
+    """Grupo das páginas de uma conta no diário de execução (um arquivo por fundo + conta)"""
+    return f"{fundo_id}|{url}"
+
+
+def cabecalhos_api(token, client_id):
+    """Headers das chamadas autenticadas (contas, saldos e extratos)"""
+    return {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+        "X-Application-Key": client_id
+    }
+
+
+def requisicao_token(client_id, client_secret):
+    """
+    Monta a requisição client_credentials do endpoint de token
+    
+    Returns:
+        Tupla (headers, data) com Basic Auth (padrão OAuth2) e o escopo de extratos
+    """
+    auth_b64 = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+    headers = {
+        "Authorization": f"Basic {auth_b64}",
+        "Content-Type": "application/x-www-form-urlencoded"
+    }
+    data = {
+        "grant_type": "client_credentials",
+        "scope": ESCOPO_EXTRATOS
+    }
+    return headers, data
+
+
+def interpretar_token(token_data):
+    """
+    Extrai o token da resposta 200 do endpoint de token
+    
+    Returns:
+        Tupla (access_token, expires_in) ou None se a resposta não trouxe token
+    """
+    token = token_data.get("access_token")
+    expires_in = token_data.get("expires_in", 900)
+    
+    log(f"✅ Token obtido com sucesso (válido por {expires_in}s)")
+    log(f"   Token: {token[:20] if token else 'NONE'}...")
+    
+    # Verificar se token tem o escopo necessário
+    scope_recebido = token_data.get("scope", "")
+    log(f"   📋 Escopo recebido: {scope_recebido}")
+    if "account" not in scope_recebido.lower():
+        log(f"   ⚠️ AVISO: Token pode não ter permissão para accounts!", nivel=logging.WARNING)
+    
+    return (token, expires_in) if token else None
+
+
+def extrair_contas(data):
+    """
+    Extrai a lista de contas da resposta de /accounts
+    
+    Aceita as estruturas conhecidas da API (data.accounts, data lista,
+    _content e accounts) e garante os campos branchCode e number.
+    """
+    contas = []
+    
+    # Estrutura 1: data.accounts (nova API)
+    if "data" in data and isinstance(data["data"], dict) and "accounts" in data["data"]:
+        contas = data["data"]["accounts"]
+        log("   ✅ Estrutura 1 (data.accounts): %d contas", len(contas))
+    
+    # Estrutura 2: data como lista direta
+    elif "data" in data and isinstance(data["data"], list):
+        contas = data["data"]
+        log("   ✅ Estrutura 2 (data lista): %d contas", len(contas))
+    
+    # Estrutura 3: _content (API antiga)
+    elif "_content" in data:
+        contas = data["_content"]
+        log("   ✅ Estrutura 3 (_content): %d contas", len(contas))
+    
+    # Estrutura 4: accounts direto
+    elif "accounts" in data:
+        contas = data["accounts"]
+        log("   ✅ Estrutura 4 (accounts direto): %d contas", len(contas))
+    
+    else:
+        log("   ❌ Estrutura desconhecida na resposta!", nivel=logging.ERROR)
+        log("   Keys disponíveis: %s", list(data.keys()))
+    
+    log("✅ %d conta(s) encontrada(s)", len(contas))
+    
+    # Debug: mostrar resposta completa se não encontrar contas
+    if len(contas) == 0:
+        log("   🔍 ATENÇÃO: Nenhuma conta retornada pela API!", nivel=logging.WARNING)
+        if log_ativo(logging.DEBUG):
+            log_debug("   Resposta completa: %s", json.dumps(data, indent=2))
+    
+    for conta in contas:
+        branch_code = conta.get('branchCode') or conta.get('agencyCode')
+        account_number = conta.get('number') or conta.get('accountNumber')
+        log("   • Agência: %s - Conta: %s", branch_code, account_number)
+    
+        # Garantir que temos os campos necessários
+        if not conta.get('branchCode') and conta.get('agencyCode'):
+            conta['branchCode'] = conta['agencyCode']
+        if not conta.get('number') and conta.get('accountNumber'):
+            conta['number'] = conta['accountNumber']
+    
+    return contas
+
+
+def total_paginas(data):
+    """totalPages informado em _pageable (0 se ausente)"""
+    pageable = data.get("_pageable") or {}
+    try:
+        return int(pageable.get("totalPages", 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def ha_mais_paginas(data, pagina, limite):
+    """
+    Indica se há página seguinte após `pagina`
+    
+    Continua se a página veio cheia (len == limite), se há link 'next'
+    ou se totalPages indica mais páginas.
+    """
+    transacoes_pagina = data.get("_content", [])
+    tem_mais_paginas = False
+    
+    if len(transacoes_pagina) >= limite:
+        tem_mais_paginas = True
+        log("   ➡️ Retornou %d registros (limite=%d), buscando próxima página...", len(transacoes_pagina), limite)
+    
+    links = data.get("_links", {})
+    if "next" in links:
+        tem_mais_paginas = True
+        log("   ➡️ Link 'next' presente, buscando próxima página...")
+    
+    total_pages_num = total_paginas(data)
+    if total_pages_num and pagina < total_pages_num:
+        tem_mais_paginas = True
+        log("   ➡️ Página %d < %d, buscando próxima página...", pagina, total_pages_num)
+    
+    return tem_mais_paginas
+
+
+def mesclar_janelas(janelas, resultados):
+    """
+    Junta as transações das janelas de um período em ordem cronológica
+    
+    Uma transação que a API devolva em mais de uma janela (limites
+    inclusivos) fica apenas na janela que contém a sua data; transações sem
+    data válida ou fora do período são mantidas uma única vez.
+    
+    Args:
+        janelas: Lista de (inicio, fim) de dividir_periodo
+        resultados: Lista de (transações, completo), na mesma ordem das janelas
+    
+    Returns:
+        Tupla (transações, completo); completo é False se alguma janela falhou
+    """
+    limites = [(inicio.date(), fim.date()) for inicio, fim in janelas]
+    
+    def janela_da_data(data):
+        for indice, (inicio, fim) in enumerate(limites):
+            if inicio <= data <= fim:
+                return indice
+        return None
+    
+    todas_transacoes = []
+    vistas_sem_janela = set()
+    duplicadas = 0
+    for indice, (transacoes, _completo) in enumerate(resultados):
+        for trans in transacoes:
+            data = data_da_transacao(trans)
+            dona = janela_da_data(data) if data else None
+            if dona is None:
+                chave = json.dumps(trans, sort_keys=True, default=str)
+                if chave in vistas_sem_janela:
+                    duplicadas += 1
+                    continue
+                vistas_sem_janela.add(chave)
+            elif dona != indice:
+                duplicadas += 1
+                continue
+            todas_transacoes.append(trans)
+    
+    completo = all(completo for _transacoes, completo in resultados)
+    if duplicadas:
+        log("   🔁 %s transação(ões) repetida(s) entre janelas descartada(s)", duplicadas)
+    if not completo:
+        falhas = [f"{inicio.strftime('%d/%m/%Y')}-{fim.strftime('%d/%m/%Y')}"
+                  for (inicio, fim), (_t, ok) in zip(janelas, resultados) if not ok]
+        log("❌ Janela(s) incompleta(s): %s", ', '.join(falhas), nivel=logging.ERROR)
+    
+    log("✅ Total de %d transação(ões) em %d janela(s)", len(todas_transacoes), len(janelas))
+    return todas_transacoes, completo
 
 
 class SantanderExtratosBancarios:
@@ -81,13 +402,13 @@ class SantanderExtratosBancarios:
         self.cnpj = creds["cnpj"]
         self.cert_path = creds.get("cert_path", CERT_PATH)
         self.key_path = creds.get("key_path", KEY_PATH)
-        self.token = None
-        self.token_expira = None
+        self.token = None  # Último token usado (o cache fica em cache_tokens)
+        self.diario = None  # DiarioExecucao: páginas já buscadas por uma execução interrompida
         
         # Debug: mostrar caminhos dos certificados
-        log(f"🔐 Certificados configurados:")
-        log(f"   cert_path: {self.cert_path}")
-        log(f"   key_path: {self.key_path}")
+        log("🔐 Certificados configurados:")
+        log("   cert_path: %s", self.cert_path)
+        log("   key_path: %s", self.key_path)
         
         # Contas conhecidas como fallback para erro 401 em /accounts
         self.contas_conhecidas = {
@@ -104,98 +425,165 @@ class SantanderExtratosBancarios:
         Usado como fallback quando /accounts retorna 401
         """
         return self.contas_conhecidas.get(self.fundo_nome, [])
+    
+    @property
+    def sessao(self):
+        """
+        Sessão mTLS compartilhada por todos os clientes com o mesmo certificado
+        Mantém conexões keep-alive e o contexto SSL entre chamadas e páginas
+        """
+        return obter_sessao(self.cert_path, self.key_path)
         
     def obter_token_acesso(self):
-        """Obtém token OAuth2 para autenticação"""
-        # Verificar se token ainda é válido
-        if self.token and self.token_expira and datetime.now() < self.token_expira:
-            return self.token
+        """
+        Obtém token OAuth2 para autenticação
+        
+        O token vem do cache compartilhado por (client_id, escopo): todos os
+        clientes do processo - e, com SANTANDER_CACHE_TOKENS, outros processos
+        e execuções - reutilizam o mesmo token até perto do vencimento.
+        """
+        self.token = obter_cache_tokens().obter(self.client_id, ESCOPO_EXTRATOS, self._emitir_token)
+        return self.token
+    
+    def invalidar_token(self):
+        """Descarta o token do cache compartilhado (ex.: após resposta 401)"""
+        obter_cache_tokens().invalidar(self.client_id, ESCOPO_EXTRATOS)
+        self.token = None
+    
+    def _requisitar(self, metodo, url, descricao, tentativas=TENTATIVAS_REQUISICAO,
+                    timeout=TIMEOUT_REQUISICAO, **kwargs):
+        """
+        Requisição pela sessão mTLS, limitada pela taxa do client_id
         
-        log(f"\n🔑 Obtendo token OAuth2 para fundo {self.fundo_id}...")
-        log(f"   Client ID: {self.client_id[:10]}...")
-        log(f"   CNPJ: {self.cnpj}")
+        429, 5xx, timeouts e falhas de conexão são repetidos com espera
+        exponencial e jitter (ou o Retry-After do banco), até `tentativas`
+        tentativas.
+                
+        Returns:
+            Response final (sucesso, erro não retentável ou o último 429/5xx)
         
-        # URL que funciona (testado localmente e no Streamlit Cloud)
-        url = "https://trust-open.api.santander.com.br/auth/oauth/v2/token"
-        log(f"   🔗 URL do token: {url}")
+        Raises:
+            A última exceção de rede, se todas as tentativas falharem
+        """
+        return executar_com_backoff(
+            obter_limitador(self.client_id),
+            lambda: self.sessao.request(metodo, url, timeout=timeout, **kwargs),
+            descricao,
+            tentativas=tentativas,
+            excecoes=(requests.exceptions.Timeout, requests.exceptions.ConnectionError),
+            log=log
+        )
+    
+    def _emitir_token(self):
+        """
+        Chama o endpoint de token
         
-        # Autenticação usando Basic Auth (padrão OAuth2)
-        auth_string = f"{self.client_id}:{self.client_secret}"
-        auth_b64 = base64.b64encode(auth_string.encode()).decode()
+        Returns:
+            Tupla (access_token, expires_in) ou None em caso de erro
+        """
+        log("\n🔑 Obtendo token OAuth2 para fundo %s...", self.fundo_id)
+        log("   Client ID: %s...", self.client_id[:10])
+        log("   CNPJ: %s", self.cnpj)
         
-        headers = {
-            "Authorization": f"Basic {auth_b64}",
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
+        # URL que funciona (testado localmente e no Streamlit Cloud)
+        url = f"{API_BASE_URL}/auth/oauth/v2/token"
+        log("   🔗 URL do token: %s", url)
         
-        data = {
-            "grant_type": "client_credentials",
-            "scope": "open_banking_balances_statement"
-        }
+        # Autenticação usando Basic Auth (padrão OAuth2)
+        headers, data = requisicao_token(self.client_id, self.client_secret)
         
-        log(f"   📊 Escopo solicitado: {data['scope']}")
+        log("   📊 Escopo solicitado: %s", data['scope'])
         
         try:
-            log(f"   🚀 Enviando requisição de token...")
-            response = requests.post(
-                url, 
-                headers=headers, 
-                data=data, 
-                cert=(self.cert_path, self.key_path),
-                timeout=30
-            )
+            log("   🚀 Enviando requisição de token...")
+            response = self._requisitar("POST", url, "Token", headers=headers, data=data)
             
             if response.status_code == 200:
-                token_data = response.json()
-                self.token = token_data.get("access_token")
-                expires_in = token_data.get("expires_in", 900)
-                self.token_expira = datetime.now() + timedelta(seconds=expires_in - 60)
-                
-                log(f"✅ Token obtido com sucesso (válido por {expires_in}s)")
-                log(f"   Token: {self.token[:20] if self.token else 'NONE'}...")
-                
-                # Verificar se token tem o escopo necessário
-                scope_recebido = token_data.get("scope", "")
-                log(f"   📋 Escopo recebido: {scope_recebido}")
-                if "account" not in scope_recebido.lower():
-                    log(f"   ⚠️ AVISO: Token pode não ter permissão para accounts!")
-                
-                return self.token
+                return interpretar_token(response.json())
             else:
-                log(f"❌ Erro ao obter token: {response.status_code}")
-                log(f"   Resposta: \n    {json.dumps(response.json(), indent=6) if response.content else 'Vazio'}")
+                log("❌ Erro ao obter token: %s", response.status_code, nivel=logging.ERROR)
+                log("   Resposta: %.500s", response.text or 'Vazio', nivel=logging.ERROR)
                 return None
                 
         except Exception as e:
-            log(f"❌ Exceção ao obter token: {e}")
+            log("❌ Exceção ao obter token: %s", e, nivel=logging.ERROR)
             import traceback
             traceback.print_exc()
             return None
     
-    def listar_contas(self):
-        """Lista todas as contas bancárias do fundo"""
+    def listar_contas(self, usar_cache=True):
+        """
+        Lista todas as contas bancárias do fundo
+        
+        Dentro da validade do cache_contas, as contas vêm do cache sem
+        consultar /accounts. Caso contrário a API é consultada (e atualiza o
+        cache); se ela falhar ou vier vazia, vale a última lista em cache,
+        mesmo vencida, e por fim as contas conhecidas.
+        
+        Args:
+            usar_cache: False força a consulta à API (o cache ainda serve de
+                fallback se ela falhar)
+        
+        Returns:
+            Lista de contas (vazia se nenhuma fonte tiver contas do fundo)
+        """
+        cache = obter_cache_contas()
+        if usar_cache:
+            contas = cache.obter(self.fundo_id, self.client_id)
+            if contas:
+                log("\n🏦 %d conta(s) do fundo %s em cache (sem consultar /accounts)", len(contas), self.fundo_id)
+                return contas
+        
+        # Com uma lista anterior guardada, /accounts lento ou falhando não segura a execução
+        if cache.idade(self.fundo_id) is not None:
+            contas = self._consultar_contas(TENTATIVAS_CONTAS_COM_CACHE, TIMEOUT_CONTAS_COM_CACHE)
+        else:
+            contas = self._consultar_contas()
+        if contas:
+            cache.gravar(self.fundo_id, self.client_id, contas)
+            return contas
+        
+        contas = cache.obter(self.fundo_id, self.client_id, aceitar_vencida=True)
+        if contas:
+            log("   ♻️ Usando %d conta(s) do cache (atualizadas há %.1fh)",
+                len(contas), cache.idade(self.fundo_id) / 3600, nivel=logging.WARNING)
+            return contas
+        
+        contas = self.obter_contas_conhecidas()
+        if contas:
+            log("   ✅ Usando %d conta(s) conhecida(s)", len(contas))
+            for conta in contas:
+                log("   • Agência: %s - Conta: %s", conta['branchCode'], conta['number'])
+            return contas
+        
+        log("   ❌ Nenhuma conta em cache ou conhecida para %s", self.fundo_nome, nivel=logging.ERROR)
+        return []
+    
+    def _consultar_contas(self, tentativas=TENTATIVAS_REQUISICAO, timeout=TIMEOUT_REQUISICAO):
+        """
+        Consulta /accounts na API
+        
+        Returns:
+            Lista de contas (pode ser vazia) ou None se a consulta falhou
+        """
         token = self.obter_token_acesso()
         if not token:
-            return []
+            return None
         
-        log(f"\n🏦 Listando contas bancárias do fundo {self.fundo_id}...")
+        log("\n🏦 Listando contas bancárias do fundo %s...", self.fundo_id)
         
         # Debug: verificar certificados
         from pathlib import Path
         cert_exists = Path(self.cert_path).exists()
         key_exists = Path(self.key_path).exists()
         if not cert_exists or not key_exists:
-            log(f"⚠️  Certificado existe: {cert_exists} ({self.cert_path})")
-            log(f"⚠️  Chave existe: {key_exists} ({self.key_path})")
+            log("⚠️  Certificado existe: %s (%s)", cert_exists, self.cert_path, nivel=logging.WARNING)
+            log("⚠️  Chave existe: %s (%s)", key_exists, self.key_path, nivel=logging.WARNING)
         
         # Endpoint correto para listar contas - inclui /banks/{BANK_ID}/ no path
-        url = f"https://trust-open.api.santander.com.br/bank_account_information/v1/banks/{BANK_ID}/accounts"
+        url = f"{API_BASE_URL}/bank_account_information/v1/banks/{BANK_ID}/accounts"
         
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "X-Application-Key": self.client_id
-        }
+        headers = cabecalhos_api(token, self.client_id)
         
         # Parâmetros corretos conforme collection
         params = {
@@ -204,117 +592,173 @@ class SantanderExtratosBancarios:
         }
         
         # Log detalhado para debug
-        log(f"   🔗 URL: {url}")
-        log(f"   🗂️ Headers: X-Application-Key={self.client_id[:10]}..., X-CNPJ={self.cnpj}")
-        log(f"   📊 Params: {params}")
+        log("   🔗 URL: %s", url)
+        log("   🗂️ Headers: X-Application-Key=%s..., X-CNPJ=%s", self.client_id[:10], self.cnpj)
+        log("   📊 Params: %s", params)
         
         try:
-            log(f"   🚀 Fazendo requisição para API...")
-            response = requests.get(
-                url,
-                headers=headers,
-                params=params,
-                cert=(self.cert_path, self.key_path),
-                timeout=30
-            )
+            log("   🚀 Fazendo requisição para API...")
+            response = self._requisitar("GET", url, "Listagem de contas", tentativas=tentativas,
+                                        timeout=timeout, headers=headers, params=params)
             
-            log(f"   📡 Resposta recebida - Status: {response.status_code}")
-            log(f"   📏 Tamanho da resposta: {len(response.text)} caracteres")
+            log("   📡 Resposta recebida - Status: %s", response.status_code)
+            log("   📏 Tamanho da resposta: %d caracteres", len(response.text))
             
             if response.status_code == 200:
                 data = response.json()
                 
-                # Log da resposta completa para debug
-                log(f"   📋 DEBUG - Resposta completa da API:")
-                log(f"   {json.dumps(data, indent=2)[:1000]}...")
-                
-                # Tentar diferentes estruturas de resposta
-                contas = []
-                
-                # Estrutura 1: data.accounts (nova API)
-                if "data" in data and isinstance(data["data"], dict) and "accounts" in data["data"]:
-                    contas = data["data"]["accounts"]
-                    log(f"   ✅ Estrutura 1 (data.accounts): {len(contas)} contas")
+                # Resposta completa apenas em DEBUG (json.dumps só roda se habilitado)
+                if log_ativo(logging.DEBUG):
+                    log_debug("   📋 Resposta completa da API:\n   %.1000s...", json.dumps(data, indent=2))
                 
-                # Estrutura 2: data como lista direta
-                elif "data" in data and isinstance(data["data"], list):
-                    contas = data["data"]
-                    log(f"   ✅ Estrutura 2 (data lista): {len(contas)} contas")
-                
-                # Estrutura 3: _content (API antiga)
-                elif "_content" in data:
-                    contas = data["_content"]
-                    log(f"   ✅ Estrutura 3 (_content): {len(contas)} contas")
-                
-                # Estrutura 4: accounts direto
-                elif "accounts" in data:
-                    contas = data["accounts"]
-                    log(f"   ✅ Estrutura 4 (accounts direto): {len(contas)} contas")
-                
-                else:
-                    log(f"   ❌ Estrutura desconhecida na resposta!")
-                    log(f"   Keys disponíveis: {list(data.keys())}")
-                
-                log(f"✅ {len(contas)} conta(s) encontrada(s)")
-                
-                # Debug: mostrar resposta completa se não encontrar contas
-                if len(contas) == 0:
-                    log(f"   🔍 ATENÇÃO: Nenhuma conta retornada pela API!")
-                    log(f"   Resposta completa: {json.dumps(data, indent=2)}")
-                
-                for conta in contas:
-                    branch_code = conta.get('branchCode') or conta.get('agencyCode')
-                    account_number = conta.get('number') or conta.get('accountNumber')
-                    log(f"   • Agência: {branch_code} - Conta: {account_number}")
-                    
-                    # Garantir que temos os campos necessários
-                    if not conta.get('branchCode') and conta.get('agencyCode'):
-                        conta['branchCode'] = conta['agencyCode']
-                    if not conta.get('number') and conta.get('accountNumber'):
-                        conta['number'] = conta['accountNumber']
+                contas = extrair_contas(data)
                 
                 return contas
             else:
-                log(f"❌ Erro ao listar contas: {response.status_code}")
-                log(f"   URL chamada: {url}")
-                log(f"   Headers enviados: {json.dumps({k: v[:20] + '...' if len(v) > 20 else v for k, v in headers.items()}, indent=2)}")
-                log(f"   Parâmetros: {params}")
-                log(f"   Resposta completa: {response.text}")
+                log("❌ Erro ao listar contas: %s", response.status_code, nivel=logging.ERROR)
+                log("   URL chamada: %s", url)
+                if log_ativo(logging.DEBUG):
+                    log_debug("   Headers enviados: %s", json.dumps({k: v[:20] + '...' if len(v) > 20 else v for k, v in headers.items()}, indent=2))
+                log("   Parâmetros: %s", params)
+                log("   Resposta: %.500s", response.text, nivel=logging.ERROR)
                 
-                # ✅ FALLBACK: Se erro 401, usar contas conhecidas
+                # 401: token recusado (o fallback para cache/contas conhecidas fica em listar_contas)
                 if response.status_code == 401:
-                    log(f"   🔄 Tentando fallback para contas conhecidas...")
-                    contas_conhecidas = self.obter_contas_conhecidas()
-                    if contas_conhecidas:
-                        log(f"   ✅ Usando {len(contas_conhecidas)} conta(s) conhecida(s)")
-                        for conta in contas_conhecidas:
-                            log(f"   • Agência: {conta['branchCode']} - Conta: {conta['number']}")
-                        return contas_conhecidas
-                    else:
-                        log(f"   ❌ Nenhuma conta conhecida configurada para {self.fundo_nome}")
-                
+                    self.invalidar_token()
+                                
                 # Tentar interpretar erro
                 try:
                     error_data = response.json()
                     if "errors" in error_data:
                         for error in error_data["errors"]:
-                            log(f"   🚨 Erro API: {error.get('title', 'N/A')} - {error.get('detail', 'N/A')}")
+                            log("   🚨 Erro API: %s - %s", error.get('title', 'N/A'), error.get('detail', 'N/A'), nivel=logging.ERROR)
                 except:
                     pass
                 
-                return []
+                return None
                 
         except Exception as e:
-            log(f"❌ Exceção ao listar contas: {e}")
-            log(f"   URL tentada: {url}")
-            log(f"   Certificados: cert={self.cert_path}, key={self.key_path}")
-            log(f"   Client ID: {self.client_id[:10]}...")
-            log(f"   CNPJ: {self.cnpj}")
+            log("❌ Exceção ao listar contas: %s", e, nivel=logging.ERROR)
+            log("   URL tentada: %s", url)
+            log("   Certificados: cert=%s, key=%s", self.cert_path, self.key_path)
+            log("   Client ID: %s...", self.client_id[:10])
+            log("   CNPJ: %s", self.cnpj)
             import traceback
             traceback.print_exc()
-            return []
+            return None
+    
+    def _buscar_pagina(self, url, headers, params_base, pagina, limite):
+        """
+        Busca UMA página de transações, com novas tentativas isoladas
+        
+        Uma falha transitória (5xx, 429, timeout) refaz apenas esta página,
+        sem reiniciar a busca inteira (ver _requisitar).
+        
+        Args:
+            url: URL do endpoint de statements da conta
+            headers: Headers da requisição (com token)
+            params_base: Parâmetros comuns (initialDate, finalDate)
+            pagina: Número da página (_offset)
+            limite: Transações por página (_limit)
+        
+        Returns:
+            Dicionário com a resposta da API ou None se a página falhou
+        """
+        params = dict(params_base)
+        params["_limit"] = str(limite)
+        params["_offset"] = str(pagina)  # Offset como número de página
+        
+        # Execução retomada: páginas concluídas antes da interrupção vêm do diário
+        # (só de janelas já encerradas: o dia corrente é sempre buscado de novo)
+        chave_diario = None
+        grupo_diario = _grupo_diario(self.fundo_id, url)
+        if self.diario is not None and janela_encerrada(params_base.get("finalDate")):
+            chave_diario = "|".join([self.fundo_id, url, params_base.get("initialDate", ""),
+                                     params_base.get("finalDate", ""), str(limite), str(pagina)])
+            data = self.diario.pagina(grupo_diario, chave_diario)
+            if data is not None:
+                log("   ♻️  Página %d retomada do diário de execução", pagina)
+                return data
+        
+        # Cache opcional em disco (SANTANDER_CACHE_PAGINAS), só para janelas já encerradas
+        cache = obter_cache_paginas()
+        chave_cache = None
+        if cache is not None and cache.cacheavel(params_base.get("finalDate")):
+            chave_cache = (url, params_base.get("initialDate", ""), params_base["finalDate"], limite, pagina)
+            data = cache.obter(chave_cache)
+            if data is not None:
+                log("   💾 Página %d lida do cache local", pagina)
+                if chave_diario is not None:
+                    self.diario.registrar_pagina(grupo_diario, chave_diario, data)
+                return data
+        
+        try:
+            response = self._requisitar("GET", url, f"Página {pagina}", headers=headers, params=params)
+            
+            if response.status_code == 200:
+                data = response.json()
+                if chave_diario is not None:
+                    self.diario.registrar_pagina(grupo_diario, chave_diario, data)
+                if chave_cache is not None:
+                    cache.gravar(chave_cache, data)
+                return data
+            
+            log("❌ Erro ao buscar transações (página %s): %s", pagina, response.status_code, nivel=logging.ERROR)
+            log("   Resposta: %.500s", response.text, nivel=logging.ERROR)
+            
+            if response.status_code == 401:
+                self.invalidar_token()
+        except Exception as e:
+            log("❌ Exceção ao buscar página %s: %s", pagina, e, nivel=logging.ERROR)
+        
+        return None
+    
+    def _buscar_paginas_concorrentes(self, url, headers, params_base, limite, paginas, max_workers):
+        """
+        Busca várias páginas em paralelo e remonta o resultado na ordem das páginas
+        
+        Args:
+            url, headers, params_base, limite: Mesmos de _buscar_pagina
+            paginas: Lista com os números das páginas a buscar
+            max_workers: Número máximo de requisições simultâneas
+        
+        Returns:
+            Tupla (transações, completo). As transações vêm na ordem das
+            páginas; se alguma página falhar em todas as tentativas, o
+            resultado é truncado na página anterior a ela (mesmo comportamento
+            da busca sequencial) e completo é False.
+        """
+        log("   ⚡ Buscando %d página(s) em paralelo (%s workers)...", len(paginas), max_workers)
+        
+        conteudo_por_pagina = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futuros = {
+                executor.submit(self._buscar_pagina, url, headers, params_base, pagina, limite): pagina
+                for pagina in paginas
+            }
+            for futuro in as_completed(futuros):
+                pagina = futuros[futuro]
+                data = futuro.result()
+                if data is None:
+                    conteudo_por_pagina[pagina] = None
+                    continue
+                conteudo_por_pagina[pagina] = data.get("_content", [])
+                log("   Página %d: %d transações", pagina, len(conteudo_por_pagina[pagina]))
+        
+        # Remontar na ordem das páginas
+        transacoes = []
+        for pagina in paginas:
+            conteudo = conteudo_por_pagina.get(pagina)
+            if conteudo is None:
+                log("❌ Página %s falhou após %s tentativas - resultado truncado na página %s", pagina, TENTATIVAS_REQUISICAO, pagina - 1, nivel=logging.ERROR)
+                return transacoes, False
+            transacoes.extend(conteudo)
+        
+        return transacoes, True
     
-    def buscar_transacoes(self, branch_code, account_number, data_inicial=None, data_final=None, limite=1000):
+    def buscar_transacoes(self, branch_code, account_number, data_inicial=None, data_final=None, limite=1000,
+                          paralelo=False, max_workers=WORKERS_PAGINAS, janela=None,
+                          workers_janelas=WORKERS_JANELAS):
         """
         Busca TODAS as transações (extrato) de uma conta específica usando paginação
         
@@ -324,13 +768,47 @@ class SantanderExtratosBancarios:
             data_inicial: Data inicial (datetime ou None para 7 dias atrás)
             data_final: Data final (datetime ou None para hoje)
             limite: Número de transações por página (padrão 1000)
+            paralelo: Se True, lê totalPages da página 1 e busca as demais
+                páginas em paralelo (padrão: sequencial)
+            max_workers: Máximo de páginas buscadas simultaneamente no modo paralelo
+            janela: Divide o período em janelas buscadas em paralelo -
+                JANELA_SEMANA, JANELA_MES ou nº de dias (None = período inteiro
+                em uma única consulta)
+            workers_janelas: Máximo de janelas buscadas simultaneamente
+        
+        Returns:
+            Lista de transações (vazia se o período não tem transações)
+        
+        Raises:
+            ExtratoIncompletoError: alguma página ou janela falhou mesmo após
+                as novas tentativas (ou o limite de segurança foi atingido) -
+                o extrato nunca é devolvido truncado
+        """
+        transacoes, completo = self._buscar_transacoes_periodo(
+            branch_code, account_number, data_inicial, data_final, limite, paralelo, max_workers,
+            janela=janela, workers_janelas=workers_janelas
+        )
+        if not completo:
+            raise ExtratoIncompletoError(
+                f"Extrato incompleto da conta {branch_code}.{account_number}: "
+                f"{len(transacoes)} transação(ões) recebida(s) antes da falha",
+                transacoes
+            )
+        return transacoes
+    
+    def _buscar_transacoes_periodo(self, branch_code, account_number, data_inicial, data_final, limite,
+                                   paralelo, max_workers, janela=None, workers_janelas=WORKERS_JANELAS):
+        """
+        Implementação de buscar_transacoes que também informa se a busca foi completa
         
         Returns:
-            Lista de transações ou lista vazia em caso de erro
+            Tupla (transações, completo). completo é False quando alguma
+            página falhou, o limite de segurança foi atingido ou houve exceção
+            (nesses casos as transações podem estar truncadas).
         """
         token = self.obter_token_acesso()
         if not token:
-            return []
+            return [], False
         
         # Definir período padrão se não fornecido
         if not data_final:
@@ -338,123 +816,216 @@ class SantanderExtratosBancarios:
         if not data_inicial:
             data_inicial = data_final - timedelta(days=7)
         
-        log(f"\n📊 Buscando transações da conta {branch_code}.{account_number}...")
-        log(f"   Período: {data_inicial.strftime('%d/%m/%Y')} a {data_final.strftime('%d/%m/%Y')}")
+        if janela:
+            janelas = dividir_periodo(data_inicial, data_final, janela)
+            if len(janelas) > 1:
+                return self._buscar_transacoes_janelas(
+                    branch_code, account_number, janelas, limite, paralelo, max_workers, workers_janelas
+                )
+        
+        log("\n📊 Buscando transações da conta %s.%s...", branch_code, account_number)
+        log("   Período: %s a %s", data_inicial.strftime('%d/%m/%Y'), data_final.strftime('%d/%m/%Y'))
         
         # Formatar account_id conforme API: AAAA.CCCCCCCCCCCC (4 dígitos agência + 12 dígitos conta)
-        branch_formatted = str(branch_code).zfill(4)  # Preenche com zeros à esquerda até 4 dígitos
-        account_formatted = str(account_number).zfill(12)  # Preenche com zeros à esquerda até 12 dígitos
-        account_id = f"{branch_formatted}.{account_formatted}"
+        account_id = formatar_account_id(branch_code, account_number)
         
-        log(f"   🔢 Account ID formatado: {account_id}")
+        log("   🔢 Account ID formatado: %s", account_id)
         
         # Usar endpoint de statements com account_id no formato agencia.conta
-        url = f"https://trust-open.api.santander.com.br/bank_account_information/v1/banks/{BANK_ID}/statements/{account_id}"
+        url = url_extrato(branch_code, account_number)
+        
+        headers = cabecalhos_api(token, self.client_id)
         
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "X-Application-Key": self.client_id
+        params_base = {
+            "initialDate": data_inicial.strftime("%Y-%m-%d"),
+            "finalDate": data_final.strftime("%Y-%m-%d"),
         }
         
         # Buscar todas as transações com paginação
         todas_transacoes = []
         pagina = 1  # Número da página (não índice de registro)
+        completo = False
         
         try:
             while True:
-                params = {
-                    "initialDate": data_inicial.strftime("%Y-%m-%d"),
-                    "finalDate": data_final.strftime("%Y-%m-%d"),
-                    "_limit": str(limite),
-                    "_offset": str(pagina)  # Offset como número de página
-                }
+                log("   🔍 Buscando: página=%d, limit=%d", pagina, limite)
                 
-                log(f"   🔍 Buscando: página={pagina}, limit={limite}")
+                data = self._buscar_pagina(url, headers, params_base, pagina, limite)
+                if data is None:
+                    log("❌ Página %d falhou após %d tentativas", pagina, TENTATIVAS_REQUISICAO, nivel=logging.ERROR)
+                    break
                 
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    params=params,
-                    cert=(self.cert_path, self.key_path),
-                    timeout=30
-                )
+                # DEBUG: resposta da primeira requisição (str(data) só é montado se habilitado)
+                if pagina == 1:
+                    log_debug("   📋 Resposta da API (página 1) - keys: %s", list(data))
+                    log_debug("   Resposta completa: %.1000s", data)
+                
+                transacoes_pagina = data.get("_content", [])
+                
+                if not transacoes_pagina:
+                    # Não há mais transações
+                    log("   ⚠️ Página %d retornou 0 transações. Encerrando busca.", pagina)
+                    completo = True
+                    break
+                
+                todas_transacoes.extend(transacoes_pagina)
+                log("   Página %d: %d transações | Total: %d", pagina, len(transacoes_pagina), len(todas_transacoes))
+                
+                # DEBUG: primeira transação como exemplo
+                if pagina == 1:
+                    log_debug("   📋 Exemplo de transação: %s", transacoes_pagina[0])
+                
+                # Verificar informações de paginação
+                pageable = data.get("_pageable", {})
+                if pageable:
+                    log("   📊 Paginação: página %d de %s | Total de registros: %s",
+                        pagina, pageable.get("totalPages", "?"), pageable.get("totalRecords", "?"))
+                
+                # Modo paralelo: com totalPages conhecido, buscar o restante de uma vez
+                if paralelo and pagina == 1 and pageable and str(pageable.get("totalPages", "0")) != "0":
+                    total_pages_num = int(pageable.get("totalPages", "0"))
+                    if total_pages_num > MAX_PAGINAS:
+                        log("   ⚠️ Limite de segurança atingido (%s páginas / ~500k transações)", MAX_PAGINAS, nivel=logging.WARNING)
+                    paginas_restantes = list(range(2, min(total_pages_num, MAX_PAGINAS) + 1))
+                    completo = total_pages_num <= MAX_PAGINAS
+                    if paginas_restantes:
+                        transacoes_restantes, paginas_ok = self._buscar_paginas_concorrentes(
+                            url, headers, params_base, limite, paginas_restantes, max_workers
+                        )
+                        todas_transacoes.extend(transacoes_restantes)
+                        completo = completo and paginas_ok
+                    break
+                
+                # Continuar se a página veio cheia, há link 'next' ou totalPages indica mais páginas
+                if not ha_mais_paginas(data, pagina, limite):
+                    log("   ✅ Última página alcançada")
+                    completo = True
+                    break
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # DEBUG: Mostrar resposta completa na primeira requisição
-                    if pagina == 1:
-                        log(f"   📋 DEBUG - Resposta da API (página 1):")
-                        log(f"   Keys disponíveis: {list(data.keys())}")
-                        log(f"   Resposta completa: {str(data)[:1000]}")
-                    
-                    transacoes_pagina = data.get("_content", [])
-                    
-                    if not transacoes_pagina:
-                        # Não há mais transações
-                        log(f"   ⚠️ Página {pagina} retornou 0 transações. Encerrando busca.")
-                        break
-                    
-                    todas_transacoes.extend(transacoes_pagina)
-                    log(f"   Página {pagina}: {len(transacoes_pagina)} transações | Total: {len(todas_transacoes)}")
-                    
-                    # DEBUG: Mostrar primeira transação e info de paginação
-                    if pagina == 1 and len(transacoes_pagina) > 0:
-                        log(f"   📋 Exemplo de transação: {transacoes_pagina[0]}")
-                    
-                    # Verificar informações de paginação
-                    pageable = data.get("_pageable", {})
-                    if pageable:
-                        total_pages = pageable.get("totalPages", "?")
-                        total_records = pageable.get("totalRecords", "?")
-                        log(f"   📊 Paginação: página {pagina} de {total_pages} | Total de registros: {total_records}")
-                    
-                    # Continuar se:
-                    # 1. Retornou exatamente o limite (indica que pode ter mais)
-                    # 2. OU tem link 'next'
-                    # 3. OU totalPages indica que há mais páginas
-                    tem_mais_paginas = False
-                    
-                    if len(transacoes_pagina) >= limite:
-                        tem_mais_paginas = True
-                        log(f"   ➡️ Retornou {len(transacoes_pagina)} registros (limite={limite}), buscando próxima página...")
-                    
-                    links = data.get("_links", {})
-                    if "next" in links:
-                        tem_mais_paginas = True
-                        log(f"   ➡️ Link 'next' presente, buscando próxima página...")
-                    
-                    if pageable and str(pageable.get("totalPages", "0")) != "0":
-                        total_pages_num = int(pageable.get("totalPages", "0"))
-                        if pagina < total_pages_num:
-                            tem_mais_paginas = True
-                            log(f"   ➡️ Página {pagina} < {total_pages_num}, buscando próxima página...")
-                    
-                    if not tem_mais_paginas:
-                        log(f"   ✅ Última página alcançada")
-                        break
-                    
-                    # Incrementar número da página
-                    pagina += 1
-                    
-                    # Segurança: evitar loop infinito (aumentado para 500 páginas = 500k transações)
-                    if pagina > 500:
-                        log(f"   ⚠️ Limite de segurança atingido (500 páginas / ~500k transações)")
-                        break
-                else:
-                    log(f"❌ Erro ao buscar transações (página {pagina}): {response.status_code}")
-                    log(f"   Resposta: {response.text[:500]}")
+                # Incrementar número da página
+                pagina += 1
+                
+                # Segurança: evitar loop infinito (aumentado para 500 páginas = 500k transações)
+                if pagina > MAX_PAGINAS:
+                    log("   ⚠️ Limite de segurança atingido (%s páginas / ~500k transações)", MAX_PAGINAS, nivel=logging.WARNING)
                     break
             
-            log(f"✅ Total de {len(todas_transacoes)} transação(ões) encontrada(s)")
-            return todas_transacoes
+            log("✅ Total de %d transação(ões) encontrada(s)", len(todas_transacoes))
+            return todas_transacoes, completo
                 
         except Exception as e:
-            log(f"❌ Exceção ao buscar transações: {e}")
+            log("❌ Exceção ao buscar transações: %s", e, nivel=logging.ERROR)
             import traceback
             traceback.print_exc()
-            return todas_transacoes if todas_transacoes else []
+            return (todas_transacoes if todas_transacoes else []), False
+    
+    def _buscar_janela(self, branch_code, account_number, inicio, fim, limite, paralelo, max_workers):
+        """
+        Busca uma janela do período, refazendo apenas ela se vier incompleta
+        
+        Returns:
+            Tupla (transações, completo) da última tentativa
+        """
+        for tentativa in range(1, TENTATIVAS_JANELA + 1):
+            transacoes, completo = self._buscar_transacoes_periodo(
+                branch_code, account_number, inicio, fim, limite, paralelo, max_workers
+            )
+            if completo:
+                return transacoes, True
+        
+            log("⚠️ Janela %s a %s incompleta (tentativa %s/%s)", inicio.strftime('%d/%m/%Y'),
+                fim.strftime('%d/%m/%Y'), tentativa, TENTATIVAS_JANELA, nivel=logging.WARNING)
+            if tentativa < TENTATIVAS_JANELA:
+                time.sleep(tentativa)
+        
+        return transacoes, False
+    
+    def _buscar_transacoes_janelas(self, branch_code, account_number, janelas, limite, paralelo,
+                                   max_workers, workers_janelas):
+        """
+        Busca as janelas de um período em paralelo e mescla em ordem cronológica
+        
+        Cada janela é uma consulta independente (initialDate/finalDate próprios),
+        o que evita offsets profundos na paginação de períodos longos. As
+        repetições entre janelas são descartadas por mesclar_janelas.
+        
+        Returns:
+            Tupla (transações, completo). completo é False se alguma janela
+            continuou incompleta após TENTATIVAS_JANELA tentativas (as demais
+            janelas são mantidas).
+        """
+        log("\n🗓️  Conta %s.%s: período dividido em %d janela(s) (%d simultânea(s))",
+            branch_code, account_number, len(janelas), min(workers_janelas, len(janelas)))
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers_janelas)) as executor:
+            futuros = [
+                executor.submit(self._buscar_janela, branch_code, account_number, inicio, fim,
+                                limite, paralelo, max_workers)
+                for inicio, fim in janelas
+            ]
+            resultados = [futuro.result() for futuro in futuros]
+        
+        return mesclar_janelas(janelas, resultados)
+    
+    def buscar_transacoes_incremental(self, branch_code, account_number, data_inicial=None, data_final=None,
+                                      armazem=None, **kwargs):
+        """
+        Busca transações usando o armazém local: só consulta a API para os dias faltantes
+        
+        Os intervalos já completos (dias anteriores a hoje buscados antes) vêm
+        do armazém; os demais são buscados na API, salvos e mesclados.
+        
+        Args:
+            branch_code: Código da agência
+            account_number: Número da conta
+            data_inicial: Data inicial (datetime ou None para 7 dias atrás)
+            data_final: Data final (datetime ou None para hoje)
+            armazem: Instância de ArmazemTransacoes (padrão: banco em config/)
+            **kwargs: Repassados a buscar_transacoes (limite, paralelo, max_workers,
+                janela, workers_janelas)
+        
+        Returns:
+            Lista de transações do período, em ordem cronológica
+        
+        Raises:
+            ExtratoIncompletoError: como em buscar_transacoes
+        """
+        if armazem is None:
+            armazem = ArmazemTransacoes()
+        
+        if not data_final:
+            data_final = datetime.now()
+        if not data_inicial:
+            data_inicial = data_final - timedelta(days=7)
+        
+        faltantes = armazem.intervalos_faltantes(
+            self.fundo_id, branch_code, account_number, data_inicial, data_final
+        )
+        log("\n🗄️  Armazém local: %d intervalo(s) a buscar na API para %s.%s", len(faltantes), branch_code, account_number)
+        
+        for inicio, fim in faltantes:
+            log("   🔄 Buscando intervalo faltante: %s a %s", inicio.strftime('%d/%m/%Y'), fim.strftime('%d/%m/%Y'))
+            transacoes, completo = self._buscar_transacoes_periodo(
+                branch_code, account_number,
+                datetime.combine(inicio, datetime.min.time()),
+                datetime.combine(fim, datetime.min.time()),
+                kwargs.get('limite', 1000),
+                kwargs.get('paralelo', False),
+                kwargs.get('max_workers', WORKERS_PAGINAS),
+                janela=kwargs.get('janela'),
+                workers_janelas=kwargs.get('workers_janelas', WORKERS_JANELAS)
+            )
+            
+            if not completo:
+                # Não gravar nada parcial: retornar o que a API trouxe para o período todo
+                log("   ⚠️ Busca incompleta; armazém não atualizado. Buscando período inteiro na API...", nivel=logging.WARNING)
+                return self.buscar_transacoes(branch_code, account_number, data_inicial, data_final, **kwargs)
+            
+            armazem.salvar(self.fundo_id, branch_code, account_number, inicio, fim, transacoes)
+        
+        transacoes = armazem.carregar(self.fundo_id, branch_code, account_number, data_inicial, data_final)
+        log("✅ Total de %d transação(ões) (armazém + API)", len(transacoes))
+        return transacoes
     
     def buscar_saldo(self, branch_code, account_number):
         """
@@ -471,30 +1042,19 @@ class SantanderExtratosBancarios:
         if not token:
             return None
         
-        log(f"\n💰 Buscando saldo da conta {branch_code}.{account_number}...")
+        log("\n💰 Buscando saldo da conta %s.%s...", branch_code, account_number)
         
         # Formatar account_id conforme API: AAAA.CCCCCCCCCCCC (4 dígitos agência + 12 dígitos conta)
-        branch_formatted = str(branch_code).zfill(4)
-        account_formatted = str(account_number).zfill(12)
-        account_id = f"{branch_formatted}.{account_formatted}"
+        account_id = formatar_account_id(branch_code, account_number)
         
-        log(f"   🔢 Account ID formatado: {account_id}")
+        log("   🔢 Account ID formatado: %s", account_id)
         
-        url = f"https://trust-open.api.santander.com.br/bank_account_information/v1/banks/{BANK_ID}/balances/{account_id}"
+        url = f"{API_BASE_URL}/bank_account_information/v1/banks/{BANK_ID}/balances/{account_id}"
         
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "X-Application-Key": self.client_id
-        }
+        headers = cabecalhos_api(token, self.client_id)
         
         try:
-            response = requests.get(
-                url,
-                headers=headers,
-                cert=(self.cert_path, self.key_path),
-                timeout=30
-            )
+            response = self._requisitar("GET", url, f"Saldo {branch_code}.{account_number}", headers=headers)
             
             if response.status_code == 200:
                 saldo_data = response.json()
@@ -502,21 +1062,62 @@ class SantanderExtratosBancarios:
                 bloqueado = float(saldo_data.get("blockedAmount", 0))
                 investido = float(saldo_data.get("automaticallyInvestedAmount", 0))
                 
-                log(f"✅ Saldo disponível: R$ {disponivel:,.2f}")
-                log(f"   Bloqueado: R$ {bloqueado:,.2f}")
-                log(f"   Investido automaticamente: R$ {investido:,.2f}")
+                if log_ativo():
+                    log(f"✅ Saldo disponível: R$ {disponivel:,.2f}")
+                    log(f"   Bloqueado: R$ {bloqueado:,.2f}")
+                    log(f"   Investido automaticamente: R$ {investido:,.2f}")
                 
                 return saldo_data
             else:
-                log(f"❌ Erro ao buscar saldo: {response.status_code}")
-                log(f"   Resposta: {response.text[:500]}")
+                log("❌ Erro ao buscar saldo: %s", response.status_code, nivel=logging.ERROR)
+                log("   Resposta: %.500s", response.text, nivel=logging.ERROR)
+                if response.status_code == 401:
+                    self.invalidar_token()
                 return None
                 
         except Exception as e:
-            log(f"❌ Exceção ao buscar saldo: {e}")
+            log("❌ Exceção ao buscar saldo: %s", e, nivel=logging.ERROR)
             return None
     
-    def exportar_transacoes_excel(self, transacoes, branch_code, account_number, pasta_saida=None, saldo_info=None):
+    def calcular_extrato_conta(self, transacoes, saldo_info=None):
+        """
+        Ordena as transações e calcula sinais, saldo anterior e saldos progressivos
+        
+        Calculado uma vez por conta e repassado (parâmetro extrato) ao Excel,
+        ao PDF e ao Parquet/Arrow, em vez de cada exportador refazer o cálculo.
+        
+        Args:
+            transacoes: Lista de transações (pode ser vazia)
+            saldo_info: Informações de saldo (availableAmount = saldo atual)
+        
+        Returns:
+            motor_extrato.Extrato
+        """
+        from motor_extrato import calcular_extrato
+        
+        saldo_atual = 0
+        if saldo_info and 'availableAmount' in saldo_info:
+            saldo_atual = float(saldo_info.get('availableAmount', 0))
+            log(f"   💰 Saldo atual (API): R$ {saldo_atual:,.2f}")
+        
+        # Dias mais antigos primeiro, mais recentes no final
+        extrato = calcular_extrato(transacoes, saldo_atual)
+        
+        # DEBUG: Verificar ordem
+        if len(extrato):
+            log_debug("   📋 Primeira transação = %s, Última = %s",
+                      extrato.transacoes[0].get('transactionDate', ''),
+                      extrato.transacoes[-1].get('transactionDate', ''))
+        
+        log(f"   📋 Transações ordenadas: dias mais antigos primeiro, mais recentes no final")
+        
+        # Saldo anterior = Saldo atual - Total das transações
+        log(f"   📊 Total transações período: R$ {extrato.total:,.2f}")
+        log(f"   📍 Saldo anterior calculado: R$ {extrato.saldo_anterior:,.2f}")
+        return extrato
+    
+    def exportar_transacoes_excel(self, transacoes, branch_code, account_number, pasta_saida=None, saldo_info=None,
+                                  extrato=None):
         """
         Exporta transações para arquivo Excel no formato Santander IBE
         
@@ -526,6 +1127,7 @@ class SantanderExtratosBancarios:
             account_number: Número da conta
             pasta_saida: Pasta para salvar (padrão: diretório atual)
             saldo_info: Informações de saldo (opcional)
+            extrato: Extrato já calculado (calcular_extrato_conta); None = calcular aqui
         
         Returns:
             Caminho do arquivo gerado ou None
@@ -538,17 +1140,7 @@ class SantanderExtratosBancarios:
             pasta_saida = os.getcwd()
         
         # Nome do arquivo no formato: exportar-Santander - Extrato DD de MMMM de YYYY-AGENCIA-CONTA.xlsx
-        import locale
-        try:
-            locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-        except:
-            try:
-                locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil.1252')
-            except:
-                pass
-        
-        data_hoje = datetime.now()
-        data_formatada = data_hoje.strftime("%d de %B de %Y")
+        data_formatada = data_por_extenso(datetime.now())
         # Incluir nome do fundo no arquivo para facilitar organização
         filename = f"exportar-Santander - Extrato {data_formatada}-{self.fundo_nome}-{branch_code}-{account_number}.xlsx"
         filepath = os.path.join(pasta_saida, filename)
@@ -559,166 +1151,60 @@ class SantanderExtratosBancarios:
         # Linha 3: Data | vazio | Histórico | Documento | Valor (R$) | Saldo (R$)
         # Linha 4+: dados das transações
         
-        dados = []
-        
-        # Linha 1: Cabeçalho com agência e conta
-        dados.append(['AGENCIA', branch_code, 'CONTA', account_number, None, None])
-        
-        # Linha 2: Linha em branco
-        dados.append([None, None, None, None, None, None])
-        
-        # Linha 3: Headers das colunas
-        dados.append(['Data', None, 'Histórico', 'Documento', 'Valor (R$)', 'Saldo (R$)'])
-        
-        # Ordenar transações: dias mais antigos primeiro, mais recentes no final
-        # Função para extrair data como datetime para ordenação cronológica real
-        def extrair_data_ordenacao(trans):
-            data = trans.get('transactionDate', '')
-            if data and len(data) >= 10:
-                try:
-                    # API retorna DD/MM/YYYY
-                    dt = datetime.strptime(data[:10], '%d/%m/%Y')
-                    return dt
-                except:
-                    try:
-                        # Fallback: tentar YYYY-MM-DD
-                        dt = datetime.strptime(data[:10], '%Y-%m-%d')
-                        return dt
-                    except:
-                        # Fallback: data muito no futuro para datas inválidas
-                        return datetime(9999, 12, 31)
-            return datetime(9999, 12, 31)
-        
-        # Ordenar cronologicamente (mais antigo primeiro) - ORDEM CORRETA
-        transacoes_ordenadas = sorted(transacoes, key=extrair_data_ordenacao)
-        
-        # DEBUG: Verificar ordem
-        if transacoes_ordenadas:
-            primeira = transacoes_ordenadas[0].get('transactionDate', '')
-            ultima = transacoes_ordenadas[-1].get('transactionDate', '')
-            log(f"   📋 DEBUG: Primeira transação = {primeira}, Última = {ultima}")
-        
-        log(f"   📋 Transações ordenadas: dias mais antigos primeiro, mais recentes no final")
-        
-        # Calcular saldo anterior (saldo atual - todas as transações do período)
-        saldo_atual = 0
-        if saldo_info and 'availableAmount' in saldo_info:
-            saldo_atual = float(saldo_info.get('availableAmount', 0))
-            log(f"   💰 Saldo atual (API): R$ {saldo_atual:,.2f}")
-        
-        # Somar todas as transações do período para calcular o saldo anterior
-        total_transacoes = 0
-        for trans in transacoes_ordenadas:
-            valor = float(trans.get('amount', 0))
-            tipo = trans.get('creditDebitType', '')
-            if tipo == 'DEBITO':
-                total_transacoes -= abs(valor)
-            else:
-                total_transacoes += abs(valor)
+        from exportador_excel import PlanilhaIBE
         
-        # Saldo anterior = Saldo atual - Total das transações
-        saldo_anterior = saldo_atual - total_transacoes
-        log(f"   📊 Total transações período: R$ {total_transacoes:,.2f}")
-        log(f"   📍 Saldo anterior calculado: R$ {saldo_anterior:,.2f}")
+        cabecalho = [
+            ['AGENCIA', branch_code, 'CONTA', account_number, None, None],
+            [None, None, None, None, None, None],
+            ['Data', None, 'Histórico', 'Documento', 'Valor (R$)', 'Saldo (R$)'],
+        ]
         
-        # Iniciar com o saldo anterior
-        saldo = saldo_anterior
+        # Transações ordenadas, com sinais, saldo anterior e saldo progressivo
+        if extrato is None:
+            extrato = self.calcular_extrato_conta(transacoes, saldo_info)
+        transacoes_ordenadas = extrato.transacoes
         
-        # Adicionar linha de saldo anterior
+        # Linha de saldo anterior
         if transacoes_ordenadas:
-            primeira_data = transacoes_ordenadas[0].get('transactionDate', '')
-            dados.append([primeira_data, None, 'SALDO ANTERIOR', None, None, saldo])
+            cabecalho.append([extrato.datas[0], None, 'SALDO ANTERIOR', None, None, extrato.saldo_anterior])
         
         # Debug: mostrar se há transações
-        log(f"📝 Processando {len(transacoes_ordenadas)} transações para Excel (ordenadas da mais antiga para mais recente)...")
+        log("📝 Processando %d transações para Excel (ordenadas da mais antiga para mais recente)...",
+            len(transacoes_ordenadas))
         
         # DEBUG: Mostrar primeira e última transação que será escrita no Excel
-        if transacoes_ordenadas:
+        if transacoes_ordenadas and log_ativo(logging.DEBUG):
             primeira_trans = transacoes_ordenadas[0]
             ultima_trans = transacoes_ordenadas[-1]
-            log(f"   📅 PRIMEIRA transação no Excel: {primeira_trans.get('transactionDate', '')} - {primeira_trans.get('transactionName', '')[:50]}")
-            log(f"   📅 ÚLTIMA transação no Excel: {ultima_trans.get('transactionDate', '')} - {ultima_trans.get('transactionName', '')[:50]}")
-        
-        # Adicionar transações
-        for trans in transacoes_ordenadas:
-            data = trans.get('transactionDate', '')
-            historico = trans.get('transactionName', '')
-            documento = trans.get('documentNumber', '')
-            valor = float(trans.get('amount', 0))
-            tipo = trans.get('creditDebitType', '')
-            
-            # Ajustar sinal do valor (crédito positivo, débito negativo)
-            if tipo == 'DEBITO':
-                valor = -abs(valor)
-            else:
-                valor = abs(valor)
-            
-            saldo += valor
-            
-            # Formatar data (DD/MM/AAAA)
-            if data and len(data) >= 10:
-                try:
-                    data_obj = datetime.strptime(data[:10], '%Y-%m-%d')
-                    data = data_obj.strftime('%d/%m/%Y')
-                except:
-                    pass
-            
-            dados.append([data, None, historico, documento, valor, saldo])
-        
-        # DEBUG: Mostrar quantas linhas foram adicionadas
-        log(f"📊 Total de linhas no DataFrame: {len(dados)} (incluindo 3 linhas de cabeçalho)")
-        if len(dados) > 3:
-            log(f"   Exemplo de linha de dados: {dados[3]}")
+            log_debug("   📅 PRIMEIRA transação no Excel: %s - %.50s",
+                      primeira_trans.get('transactionDate', ''), primeira_trans.get('transactionName', ''))
+            log_debug("   📅 ÚLTIMA transação no Excel: %s - %.50s",
+                      ultima_trans.get('transactionDate', ''), ultima_trans.get('transactionName', ''))
         
-        # Criar DataFrame
-        df = pd.DataFrame(dados)
-        
-        # Salvar em Excel
+        # Salvar em Excel (write-only: cada linha é gravada assim que montada,
+        # com formatos e fonte aplicados na escrita)
         try:
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, header=False)
-                
-                # Formatar células
-                from openpyxl.styles import Font
-                workbook = writer.book
-                worksheet = writer.sheets['Sheet1']
-                
-                # Definir fonte vermelha para valores negativos
-                red_font = Font(color="FF0000")
-                
-                # Formatar valores monetários (coluna E e F - índices 5 e 6)
-                for row in range(4, len(dados) + 1):  # Começar da linha 4 (primeira transação)
-                    # Coluna Valor (R$) - índice E (coluna 5)
-                    cell_valor = worksheet.cell(row=row+1, column=5)
-                    if cell_valor.value and isinstance(cell_valor.value, (int, float)):
-                        cell_valor.number_format = '#,##0.00'
-                        # Se valor negativo, aplicar fonte vermelha APENAS no valor
-                        if cell_valor.value < 0:
-                            cell_valor.font = red_font
-                    
-                    # Coluna Saldo (R$) - índice F (coluna 6)
-                    cell_saldo = worksheet.cell(row=row+1, column=6)
-                    if cell_saldo.value and isinstance(cell_saldo.value, (int, float)):
-                        cell_saldo.number_format = '#,##0.00'
-                        # NÃO aplicar fonte vermelha no saldo
-                
-                # Auto-ajustar largura das colunas
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    
-                    for cell in column:
-                        try:
-                            if cell.value:
-                                cell_length = len(str(cell.value))
-                                if cell_length > max_length:
-                                    max_length = cell_length
-                        except:
-                            pass
-                    
-                    # Definir largura ajustada (mínimo 10, máximo 50)
-                    adjusted_width = min(max(max_length + 2, 10), 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+            planilha = PlanilhaIBE()
+            
+            # 1ª passada (barata): larguras a partir das colunas do extrato,
+            # sem montar as linhas
+            for linha in cabecalho:
+                planilha.medir(linha)
+            planilha.medir_coluna(0, extrato.datas_formatadas)
+            planilha.medir_coluna(2, (trans.get('transactionName', '') for trans in transacoes_ordenadas))
+            planilha.medir_coluna(3, (trans.get('documentNumber', '') for trans in transacoes_ordenadas))
+            planilha.medir_coluna(4, extrato.valores)
+            planilha.medir_coluna(5, extrato.saldos)
+            
+            # 2ª passada: cada linha vai direto para o arquivo
+            for linha in cabecalho:
+                planilha.adicionar(linha)
+            # Transações (data DD/MM/AAAA, valor com sinal, saldo progressivo)
+            for data, historico, documento, valor, saldo in extrato.linhas():
+                planilha.adicionar([data, None, historico, documento, valor, saldo])
+            
+            log("📊 Total de linhas na planilha: %d (incluindo 3 linhas de cabeçalho)", planilha.num_linhas)
+            planilha.salvar(filepath)
             
             log(f"✅ Extrato salvo em: {filename}")
             log(f"   Caminho completo: {filepath}")
@@ -728,20 +1214,73 @@ class SantanderExtratosBancarios:
                 tamanho = os.path.getsize(filepath)
                 log(f"   Tamanho: {tamanho} bytes")
             else:
-                log(f"   ⚠️ AVISO: Arquivo não encontrado após salvar!")
+                log(f"   ⚠️ AVISO: Arquivo não encontrado após salvar!", nivel=logging.WARNING)
             
             return filepath
         except Exception as e:
-            log(f"❌ Erro ao salvar Excel: {e}")
+            log(f"❌ Erro ao salvar Excel: {e}", nivel=logging.ERROR)
             import traceback
             traceback.print_exc()
             return None
     
-    def gerar_pdf_extrato(self, transacoes, branch_code, account_number, pasta_saida=None, saldo_info=None, data_inicial=None, data_final=None):
+    def exportar_extrato_colunar(self, transacoes, branch_code, account_number, pasta_saida=None, saldo_info=None,
+                                 data_inicial=None, data_final=None, formato="parquet", extrato=None):
+        """
+        Exporta o extrato em formato colunar (Parquet ou Arrow IPC) para análises e conciliação
+        
+        Mesmo cálculo do Excel e do PDF (motor_extrato), com colunas tipadas:
+        data, historico, documento, valor (com sinal), saldo, fundo, agencia, conta.
+        
+        Args:
+            transacoes: Lista de transações (pode ser vazia)
+            branch_code: Código da agência
+            account_number: Número da conta
+            pasta_saida: Pasta para salvar (padrão: diretório atual)
+            saldo_info: Informações de saldo (opcional)
+            data_inicial: Data inicial solicitada (datetime, vai no nome e nos metadados)
+            data_final: Data final solicitada (datetime, vai no nome e nos metadados)
+            formato: "parquet" ou "arrow" (exportador_colunar.FORMATOS_COLUNARES)
+            extrato: Extrato já calculado (calcular_extrato_conta); None = calcular aqui
+        
+        Returns:
+            Caminho do arquivo gerado ou None (inclusive sem pyarrow instalado)
+        """
+        from exportador_colunar import exportar_extrato_colunar, HAS_PYARROW
+        
+        if not HAS_PYARROW:
+            log(f"⚠️  Exportação {formato} indisponível: pyarrow não instalado", nivel=logging.WARNING)
+            return None
+        
+        if not pasta_saida:
+            pasta_saida = os.getcwd()
+        
+        periodo = ""
+        if data_inicial and data_final:
+            periodo = f"-{data_inicial.strftime('%Y%m%d')}_{data_final.strftime('%Y%m%d')}"
+        filename = f"extrato-Santander-{self.fundo_nome}-{branch_code}-{account_number}{periodo}.{formato}"
+        filepath = os.path.join(pasta_saida, filename)
+        
+        try:
+            if extrato is None:
+                extrato = self.calcular_extrato_conta(transacoes, saldo_info)
+            exportar_extrato_colunar(filepath, extrato, self.fundo_nome, branch_code, account_number,
+                                     formato=formato, data_inicial=data_inicial, data_final=data_final)
+            log(f"✅ Extrato {formato} salvo em: {filename} ({len(extrato)} linha(s))")
+            return filepath
+        except Exception as e:
+            log(f"❌ Erro ao salvar {formato}: {e}", nivel=logging.ERROR)
+            return None
+    
+    def gerar_pdf_extrato(self, transacoes, branch_code, account_number, pasta_saida=None, saldo_info=None, data_inicial=None, data_final=None,
+                          renderizador=None, modo_pdf=None, extrato=None):
         """
         Gera PDF do extrato no formato IBE (Internet Banking Empresarial) Santander
         Replica exatamente o layout do exemplo do Santander IBE
         
+        Os dados (ordenação, saldos, textos formatados) são calculados aqui;
+        o layout fica em renderizador_pdf.renderizar_extrato_pdf, que pode
+        rodar em um processo separado.
+        
         Args:
             transacoes: Lista de transações (pode ser vazia)
             branch_code: Código da agência
@@ -750,10 +1289,28 @@ class SantanderExtratosBancarios:
             saldo_info: Informações de saldo (opcional)
             data_inicial: Data inicial solicitada (datetime)
             data_final: Data final solicitada (datetime)
+            renderizador: RenderizadorPDF (pool de processos) ou None para
+                renderizar na própria thread
+            modo_pdf: Layout da tabela (renderizador_pdf.MODO_PDF_*; None =
+                MODO_PDF_TABELA_UNICA, o layout original); MODO_PDF_AUTO
+                pagina em blocos os extratos longos
+            extrato: Extrato já calculado (calcular_extrato_conta); None = calcular aqui
         
         Returns:
             Caminho do arquivo gerado ou None
         """
+        pendente = self._submeter_pdf_extrato(transacoes, branch_code, account_number, pasta_saida, saldo_info,
+                                              data_inicial, data_final, renderizador, modo_pdf, extrato)
+        return self._concluir_pdf_extrato(pendente, renderizador)
+    
+    def _submeter_pdf_extrato(self, transacoes, branch_code, account_number, pasta_saida=None, saldo_info=None,
+                              data_inicial=None, data_final=None, renderizador=None, modo_pdf=None, extrato=None):
+        """
+        Calcula os dados do PDF e agenda a renderização (sem esperar o pool)
+        
+        Returns:
+            (caminho, futuro) para _concluir_pdf_extrato, ou None em caso de erro
+        """
         num_transacoes = len(transacoes) if transacoes else 0
         log(f"\n📄 Gerando PDF com {num_transacoes} transação(ões)...")
         
@@ -768,430 +1325,34 @@ class SantanderExtratosBancarios:
         
         # Verificar se arquivo já existe para evitar duplicação
         if os.path.exists(filepath):
-            log(f"⚠️  PDF já existe, sobrescrevendo: {filename}")
+            log(f"⚠️  PDF já existe, sobrescrevendo: {filename}", nivel=logging.WARNING)
         
         try:
-            # Criar documento PDF com margens exatas do IBE (29pts = 10.23mm)
-            doc = SimpleDocTemplate(filepath, pagesize=A4,
-                                   rightMargin=28, leftMargin=29,
-                                   topMargin=29, bottomMargin=29)
-            
-            elements = []
-            styles = getSampleStyleSheet()
+            dados = self._dados_pdf_extrato(transacoes, branch_code, account_number, saldo_info,
+                                            data_inicial, data_final, extrato)
             
-            # ========== CORES IBE SANTANDER ==========
-            # Baseado na análise: RGB(0.933, 0.114, 0.137) = #EE1D23 (vermelho Santander)
-            # Texto principal: RGB(0.255, 0.333, 0.369) = #41555E
-            cor_vermelho_santander = colors.Color(0.933, 0.114, 0.137)
-            cor_texto_principal = colors.Color(0.255, 0.333, 0.369)
-            cor_cinza_claro = colors.Color(0.663, 0.663, 0.663)
-            
-            # ========== CABEÇALHO IBE ==========
-            # Título com fonte 18.1pt (análise mostrou LiberationSans, usamos Helvetica como substituto)
-            header_style = ParagraphStyle(
-                'IBEHeader',
-                parent=styles['Normal'],
-                fontSize=18,
-                textColor=cor_vermelho_santander,
-                fontName='Helvetica',
-                alignment=TA_RIGHT,
-                spaceAfter=20
-            )
-            
-            # Título "Internet Banking Empresarial"
-            elements.append(Paragraph("Internet Banking Empresarial", header_style))
-            
-            # Linha separadora (como no exemplo - linha fina cinza)
-            from reportlab.platypus import HRFlowable
-            elements.append(HRFlowable(width="100%", thickness=1, color=cor_cinza_claro, spaceAfter=15))
-            
-            # Linha com Nome do Fundo, Agência e Conta (fonte 7pt como no exemplo)
-            fund_info_style = ParagraphStyle(
-                'FundInfo',
-                parent=styles['Normal'],
-                fontSize=7,
-                fontName='Helvetica',
-                textColor=cor_texto_principal,
-                alignment=TA_LEFT,
-                spaceAfter=10
-            )
-            
-            # Buscar nome do fundo
-            fundo_nome = SANTANDER_FUNDOS.get(self.fundo_id, {}).get('nome', self.fundo_id)
-            
-            # Formato exato do IBE: "FUNDO...    Agência: XXXX    Conta: XXXXXXXXX"
-            fund_line = f"{fundo_nome.upper()}    Agência: {branch_code}    Conta: {account_number}"
-            elements.append(Paragraph(fund_line, fund_info_style))
-            
-            # Linha separadora
-            elements.append(HRFlowable(width="100%", thickness=1, color=cor_cinza_claro, spaceAfter=10))
-            
-            # Navegação (Conta Corrente > Extrato > Consultar) - fonte 8.2pt
-            nav_style = ParagraphStyle(
-                'Navigation',
-                parent=styles['Normal'],
-                fontSize=8.2,
-                fontName='Helvetica',
-                textColor=cor_texto_principal,
-                alignment=TA_LEFT,
-                spaceAfter=2
-            )
-            elements.append(Paragraph("Conta Corrente > Extrato >", nav_style))
-            
-            # "Consultar" em fonte maior (10.5pt)
-            consultar_style = ParagraphStyle(
-                'Consultar',
-                parent=styles['Normal'],
-                fontSize=10.5,
-                fontName='Helvetica',
-                textColor=cor_texto_principal,
-                alignment=TA_LEFT,
-                spaceAfter=15
-            )
-            elements.append(Paragraph("Consultar", consultar_style))
-            
-            # Opções de pesquisa e período (fonte 7pt)
-            info_style = ParagraphStyle(
-                'InfoLine',
-                parent=styles['Normal'],
-                fontSize=7,
-                fontName='Helvetica',
-                textColor=cor_texto_principal,
-                alignment=TA_LEFT,
-                leading=10
-            )
-            
-            # Determinar período - USAR DATAS SOLICITADAS, não das transações retornadas
-            import locale
-            try:
-                locale.setlocale(locale.LC_TIME, 'en_US.UTF-8')
-            except:
-                try:
-                    locale.setlocale(locale.LC_TIME, 'English_United States.1252')
-                except:
-                    pass
-            
-            if data_inicial and data_final:
-                # Usar datas solicitadas pelo usuário em formato simples
-                periodo_inicio = data_inicial.strftime('%d/%m/%Y')
-                periodo_fim = data_final.strftime('%d/%m/%Y')
-            elif transacoes:
-                # Fallback: usar primeira e última transação
-                primeira_trans = transacoes[0].get('transactionDate', '')
-                ultima_trans = transacoes[-1].get('transactionDate', '')
-                
-                if primeira_trans:
-                    try:
-                        dt_inicio = datetime.strptime(primeira_trans[:10], '%Y-%m-%d')
-                        periodo_inicio = dt_inicio.strftime('%a %b %d 00:00:00 GMT-03:00 %Y')
-                    except:
-                        periodo_inicio = primeira_trans
-                else:
-                    periodo_inicio = "N/A"
-                    
-                if ultima_trans:
-                    try:
-                        dt_fim = datetime.strptime(ultima_trans[:10], '%Y-%m-%d')
-                        periodo_fim = dt_fim.strftime('%a %b %d 23:59:59 GMT-03:00 %Y')
-                    except:
-                        periodo_fim = ultima_trans
-                else:
-                    periodo_fim = "N/A"
-            else:
-                periodo_inicio = periodo_fim = "N/A"
-            
-            data_hora_agora = datetime.now().strftime('%d/%m/%Y às %Hh%M')
-            
-            elements.append(Paragraph(f"<b>Opção de Pesquisa:</b> Todos", info_style))
-            elements.append(Paragraph(f"<b>Períodos:</b> {periodo_inicio} a {periodo_fim}", info_style))
-            elements.append(Paragraph(f"<b>Data/Hora:</b> {data_hora_agora}", info_style))
-            elements.append(Spacer(1, 10))
-            
-            # ========== TABELA DE TRANSAÇÕES ==========
-            # Baseado na análise: tabela com 6 colunas, fonte 7pt
-            table_data = []
-            
-            # Cabeçalho (com coluna vazia após Data)
-            table_data.append(['Data', '', 'Histórico', 'Documento', 'Valor (R$)', 'Saldo (R$)'])
-            
-            # Calcular saldo anterior (saldo atual - todas as transações do período)
-            saldo_atual = 0
-            saldo_fmt = "0,00"  # Inicializar com valor padrão para evitar erro quando não há transações
-            
-            # Se há informações de saldo da API, usar como saldo atual
-            if saldo_info and 'availableAmount' in saldo_info:
-                saldo_atual = float(saldo_info.get('availableAmount', 0))
-                log(f"   💰 Saldo atual (API): R$ {saldo_atual:,.2f}")
-            
-            # Ordenar transações: dias mais antigos primeiro, mais recentes no final
-            
-            # Função para extrair data como datetime para ordenação cronológica real
-            def extrair_data_ordenacao(trans):
-                data = trans.get('transactionDate', '')
-                if data and len(data) >= 10:
-                    try:
-                        # API retorna DD/MM/YYYY
-                        dt = datetime.strptime(data[:10], '%d/%m/%Y')
-                        return dt
-                    except:
-                        try:
-                            # Fallback: tentar YYYY-MM-DD
-                            dt = datetime.strptime(data[:10], '%Y-%m-%d')
-                            return dt
-                        except:
-                            # Fallback: data muito no futuro para datas inválidas
-                            return datetime(9999, 12, 31)
-                return datetime(9999, 12, 31)
-            
-            # Ordenar cronologicamente (mais antigo primeiro) - ORDEM CORRETA
-            transacoes_ordenadas = sorted(transacoes, key=extrair_data_ordenacao)
-            
-            # DEBUG: Verificar ordem
-            if transacoes_ordenadas:
-                primeira = transacoes_ordenadas[0].get('transactionDate', '')
-                ultima = transacoes_ordenadas[-1].get('transactionDate', '')
-                log(f"   📋 DEBUG PDF: Primeira transação = {primeira}, Última = {ultima}")
-            
-            log(f"   📋 Transações ordenadas: dias mais antigos primeiro, mais recentes no final")
-            
-            # Somar todas as transações do período para calcular o saldo anterior
-            total_transacoes = 0
-            for trans in transacoes_ordenadas:
-                valor = float(trans.get('amount', 0))
-                tipo = trans.get('creditDebitType', '')
-                if tipo == 'DEBITO':
-                    total_transacoes -= abs(valor)
-                else:
-                    total_transacoes += abs(valor)
-            
-            # Saldo anterior = Saldo atual - Total das transações
-            saldo_anterior = saldo_atual - total_transacoes
-            log(f"   📊 Total transações período: R$ {total_transacoes:,.2f}")
-            log(f"   📍 Saldo anterior calculado: R$ {saldo_anterior:,.2f}")
-            
-            # Iniciar com o saldo anterior
-            saldo = saldo_anterior
-            saldo_fmt = f"{abs(saldo):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-            if saldo < 0:
-                saldo_fmt = f"-{saldo_fmt}"
-            
-            # Saldo anterior
-            if transacoes_ordenadas and len(transacoes_ordenadas) > 0:
-                primeira_data = transacoes_ordenadas[0].get('transactionDate', '')
-                if primeira_data and len(primeira_data) >= 10:
-                    try:
-                        data_obj = datetime.strptime(primeira_data[:10], '%Y-%m-%d')
-                        primeira_data = data_obj.strftime('%d/%m/%Y')
-                    except:
-                        pass
-                # 6 colunas com coluna vazia
-                table_data.append([primeira_data, '', 'SALDO ANTERIOR', '', '', saldo_fmt])
-            else:
-                # Se não há transações, mostrar saldo atual na data de hoje
-                data_hoje = datetime.now().strftime('%d/%m/%Y')
-                table_data.append([data_hoje, '', 'SALDO ATUAL', '', '', saldo_fmt])
-            
-            # Transações
-            for trans in transacoes_ordenadas:
-                data = trans.get('transactionDate', '')
-                historico = trans.get('transactionName', '')
-                documento = trans.get('documentNumber', '')
-                valor = float(trans.get('amount', 0))
-                tipo = trans.get('creditDebitType', '')
-                
-                # DEBUG na primeira transação
-                if len(table_data) == 2:  # Logo após cabeçalho e saldo anterior
-                    log(f"   📋 DEBUG PDF - Primeira transação:")
-                    log(f"      Data: {data}, Histórico: {historico}, Valor: {valor}, Tipo: {tipo}")
-                
-                # Ajustar sinal
-                if tipo == 'DEBITO':
-                    valor = -abs(valor)
-                else:
-                    valor = abs(valor)
-                
-                saldo += valor
-                
-                # Formatar data
-                if data and len(data) >= 10:
-                    try:
-                        data_obj = datetime.strptime(data[:10], '%Y-%m-%d')
-                        data = data_obj.strftime('%d/%m/%Y')
-                    except:
-                        pass
-                
-                # Formatar valores
-                valor_fmt = f"{abs(valor):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                if valor < 0:
-                    valor_fmt = f"-{valor_fmt}"
-                
-                saldo_fmt = f"{abs(saldo):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                if saldo < 0:
-                    saldo_fmt = f"-{saldo_fmt}"
-                
-                # 6 colunas (Data, vazio, Histórico, Documento, Valor, Saldo)
-                table_data.append([data, '', historico, documento or '', valor_fmt, saldo_fmt])
-            
-            # Criar tabela com larguras baseadas na análise do PDF (em pts)
-            # Análise mostrou: cols muito pequenas no início e fim, maior no meio
-            # Largura útil: 538pts (567-29), dividido em: 54, 13, 276, 56, 58, 56 ≈ 513pts
-            table = Table(table_data, colWidths=[54, 13, 276, 56, 58, 56])
-            
-            # Estilo da tabela IBE (simples, linhas finas)
-            table.setStyle(TableStyle([
-                # Cabeçalho
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 7),
-                ('TEXTCOLOR', (0, 0), (-1, 0), cor_texto_principal),
-                ('ALIGN', (0, 0), (1, 0), 'LEFT'),
-                ('ALIGN', (2, 0), (3, 0), 'LEFT'),
-                ('ALIGN', (4, 0), (5, 0), 'RIGHT'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-                ('TOPPADDING', (0, 0), (-1, 0), 6),
-                
-                # Corpo
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 7),
-                ('TEXTCOLOR', (0, 1), (-1, -1), cor_texto_principal),
-                ('ALIGN', (0, 1), (1, -1), 'LEFT'),
-                ('ALIGN', (2, 1), (3, -1), 'LEFT'),
-                ('ALIGN', (4, 1), (5, -1), 'RIGHT'),
-                
-                # Bordas externas
-                ('BOX', (0, 0), (-1, -1), 0.5, cor_cinza_claro),
-                # Linhas internas horizontais
-                ('LINEBELOW', (0, 0), (-1, -2), 0.25, cor_cinza_claro),
-                # Linhas internas verticais
-                ('LINEAFTER', (0, 0), (-2, -1), 0.25, cor_cinza_claro),
-                
-                # Padding
-                ('TOPPADDING', (0, 1), (-1, -1), 4),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-                ('LEFTPADDING', (0, 0), (-1, -1), 3),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-            ]))
-            
-            elements.append(table)
-            elements.append(Spacer(1, 10))
-            
-            # ========== LEGENDA ==========
-            legend_style = ParagraphStyle(
-                'Legend',
-                parent=styles['Normal'],
-                fontSize=7,
-                fontName='Helvetica',
-                textColor=cor_texto_principal,
-                alignment=TA_LEFT,
-                leading=10
-            )
-            
-            elements.append(Paragraph(
-                "<b>a</b> = Bloqueio Dia / ADM    Entenda a composição do seu saldo no quadro abaixo.",
-                legend_style
-            ))
-            elements.append(Paragraph("<b>b</b> = Bloqueado", legend_style))
-            elements.append(Paragraph("<b>p</b> = Lançamento Provisionado", legend_style))
-            elements.append(Spacer(1, 8))
-            
-            # ========== QUADRO DE SALDO ==========
-            # Usar saldo_info se disponível, senão usar saldo calculado
-            if saldo_info and 'availableAmount' in saldo_info:
-                saldo_disponivel = float(saldo_info.get('availableAmount', 0))
-                saldo_bloqueado = float(saldo_info.get('blockedAmount', 0))
-                saldo_conta = saldo_disponivel + saldo_bloqueado
-                
-                saldo_conta_fmt = f"{abs(saldo_conta):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                saldo_bloqueado_fmt = f"{abs(saldo_bloqueado):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                saldo_disponivel_fmt = f"{abs(saldo_disponivel):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                
-                if saldo_conta < 0:
-                    saldo_conta_fmt = f"-{saldo_conta_fmt}"
-                if saldo_bloqueado < 0:
-                    saldo_bloqueado_fmt = f"-{saldo_bloqueado_fmt}"
-                if saldo_disponivel < 0:
-                    saldo_disponivel_fmt = f"-{saldo_disponivel_fmt}"
-            else:
-                # Usar saldo calculado das transações
-                saldo_conta_fmt = saldo_fmt
-                saldo_bloqueado_fmt = "0,00"
-                saldo_disponivel_fmt = saldo_fmt
-            
-            # Baseado na análise: formato exato do IBE
-            saldo_data = [
-                ['', 'Saldo', 'Valor (R$)', ''],
-                ['', f'Posição em:{datetime.now().strftime("%d/%m/%Y")}', '', ''],
-                ['', '', '', ''],
-                ['', 'Saldo', 'Valor (R$)', ''],
-                ['', 'A - Saldo de Conta Corrente', saldo_conta_fmt, ''],
-                ['', 'B - Saldo Bloqueado', saldo_bloqueado_fmt, ''],
-                ['', '    Desbloqueio em 1 dia', '0,00', ''],
-                ['', '    Desbloqueio em 2 dias', '0,00', ''],
-                ['', '    Desbloqueio em mais de 2 dias', '0,00', ''],
-                ['C - Saldo Disponível em Conta Corrente (A - B) ' + saldo_disponivel_fmt, '', '', ''],
-            ]
-            
-            # Larguras aproximadas da tabela de saldo
-            saldo_table = Table(saldo_data, colWidths=[10, 370, 80, 10])
-            saldo_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 7),
-                ('TEXTCOLOR', (0, 0), (-1, -1), cor_texto_principal),
-                ('FONTNAME', (1, 0), (2, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 3), (2, 3), 'Helvetica-Bold'),
-                ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('BOX', (0, 0), (-1, -1), 0.5, cor_cinza_claro),
-                ('LINEBELOW', (0, 0), (-1, 0), 0.5, cor_cinza_claro),
-                ('LINEBELOW', (0, 3), (-1, 3), 0.5, cor_cinza_claro),
-                ('LINEAFTER', (0, 0), (-2, -1), 0.25, cor_cinza_claro),
-                ('TOPPADDING', (0, 0), (-1, -1), 3),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-                ('LEFTPADDING', (0, 0), (-1, -1), 4),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ]))
-            
-            elements.append(saldo_table)
-            elements.append(Spacer(1, 15))
-            
-            # ========== RODAPÉ COM CONTATOS ==========
-            footer_style = ParagraphStyle(
-                'Footer',
-                parent=styles['Normal'],
-                fontSize=7,
-                fontName='Helvetica',
-                textColor=cor_texto_principal,
-                alignment=TA_LEFT,
-                leading=9
-            )
-            
-            contatos = [
-                "<b>Central de Atendimento Santander Empresarial</b> - Das 8h às 20h, de segunda a sexta-feira",
-                "4004-2125 (Capitais e Regiões Metropolitanas)",
-                "0800 702 2125 (Demais Localidades)",
-                "",
-                "<b>Central de Atendimento Getnet</b> - Atendimento 24h por dia, todos os dias",
-                "4002-4000 (Capitais e Regiões Metropolitanas)",
-                "4003-4000 (Capitais e Regiões Metropolitanas)",
-                "0800 648 8000 (Demais Localidades)",
-                "",
-                "<b>Central de Vendas PJ</b> - Das 8h às 20h, de segunda a sexta-feira, exceto feriados.",
-                "0800 013 7333",
-                "",
-                "<b>SAC</b> - Atendimento 24h por dia, todos os dias.",
-                "Reclamações cancelamentos e informações:",
-                "0800 762 7777",
-                "",
-                "<b>Ouvidoria</b> - Disponível das 9h às 18h, de segunda a sexta-feira, exceto feriados.",
-                "Se não ficar satisfeito com a solução apresentada:",
-                "0800 726 0322",
-                "55 (11) 3012 0322 (No exterior, ligue a cobrar)"
-            ]
-            
-            for linha in contatos:
-                elements.append(Paragraph(linha, footer_style))
-            
-            # Gerar PDF
-            doc.build(elements)
+            # Gerar PDF (no pool, o layout segue em outro processo)
+            from renderizador_pdf import renderizar_extrato_pdf, MODO_PDF_TABELA_UNICA
+            modo_pdf = modo_pdf or MODO_PDF_TABELA_UNICA
+            if renderizador is not None:
+                return filepath, renderizador.submeter(filepath, dados, modo_pdf)
+            return filepath, renderizar_extrato_pdf(filepath, dados, modo_pdf)
+        
+        except Exception as e:
+            log(f"❌ Erro ao gerar PDF: {e}", nivel=logging.ERROR)
+            import traceback
+            traceback.print_exc()
+            return None
+    
+    def _concluir_pdf_extrato(self, pendente, renderizador=None):
+        """Aguarda a renderização agendada por _submeter_pdf_extrato; retorna o caminho ou None"""
+        if pendente is None:
+            return None
+        filepath, futuro = pendente
+        filename = os.path.basename(filepath)
+        try:
+            if renderizador is not None:
+                renderizador.aguardar(futuro)
             
             log(f"✅ PDF gerado: {filename}")
             log(f"   Caminho completo: {filepath}")
@@ -1201,18 +1362,417 @@ class SantanderExtratosBancarios:
                 tamanho = os.path.getsize(filepath)
                 log(f"   Tamanho: {tamanho} bytes")
             else:
-                log(f"   ⚠️ AVISO: Arquivo não encontrado após salvar!")
+                log(f"   ⚠️ AVISO: Arquivo não encontrado após salvar!", nivel=logging.WARNING)
             
             return filepath
             
         except Exception as e:
-            log(f"❌ Erro ao gerar PDF: {e}")
+            log(f"❌ Erro ao gerar PDF: {e}", nivel=logging.ERROR)
             import traceback
             traceback.print_exc()
             return None
+    
+    def _dados_pdf_extrato(self, transacoes, branch_code, account_number, saldo_info, data_inicial, data_final,
+                           extrato=None):
+        """
+        Calcula o conteúdo do PDF (apenas strings e listas, serializáveis)
+        
+        Args:
+            extrato: Extrato já calculado (calcular_extrato_conta); None = calcular aqui
+        
+        Returns:
+            Dicionário aceito por renderizador_pdf.renderizar_extrato_pdf
+        """
+        # Buscar nome do fundo
+        fundo_nome = SANTANDER_FUNDOS.get(self.fundo_id, {}).get('nome', self.fundo_id)
+        
+        # Determinar período - USAR DATAS SOLICITADAS, não das transações retornadas
+        if data_inicial and data_final:
+            # Usar datas solicitadas pelo usuário em formato simples
+            periodo_inicio = data_inicial.strftime('%d/%m/%Y')
+            periodo_fim = data_final.strftime('%d/%m/%Y')
+        elif transacoes:
+            # Fallback: usar primeira e última transação
+            primeira_trans = transacoes[0].get('transactionDate', '')
+            ultima_trans = transacoes[-1].get('transactionDate', '')
+        
+            if primeira_trans:
+                try:
+                    dt_inicio = datetime.strptime(primeira_trans[:10], '%Y-%m-%d')
+                    periodo_inicio = data_periodo_ibe(dt_inicio, '00:00:00')
+                except:
+                    periodo_inicio = primeira_trans
+            else:
+                periodo_inicio = "N/A"
+            
+            if ultima_trans:
+                try:
+                    dt_fim = datetime.strptime(ultima_trans[:10], '%Y-%m-%d')
+                    periodo_fim = data_periodo_ibe(dt_fim, '23:59:59')
+                except:
+                    periodo_fim = ultima_trans
+            else:
+                periodo_fim = "N/A"
+        else:
+            periodo_inicio = periodo_fim = "N/A"
+        
+        data_hora_agora = datetime.now().strftime('%d/%m/%Y às %Hh%M')
+        
+        # ========== LINHAS DA TABELA DE TRANSAÇÕES ==========
+        linhas = []
+        
+        # Transações ordenadas, com sinais, saldo anterior e saldo progressivo
+        if extrato is None:
+            extrato = self.calcular_extrato_conta(transacoes, saldo_info)
+        transacoes_ordenadas = extrato.transacoes
+        saldo_anterior = extrato.saldo_anterior
+        
+        saldo_fmt= formatar_brl(saldo_anterior)
+        
+        # Saldo anterior
+        if transacoes_ordenadas:
+            primeira_data = extrato.datas_formatadas[0]
+            # 6 colunas com coluna vazia
+            linhas.append([primeira_data, '', 'SALDO ANTERIOR', '', '', saldo_fmt])
+            
+            # DEBUG na primeira transação
+            primeira_trans = transacoes_ordenadas[0]
+            log_debug("   📋 PDF - Primeira transação: Data: %s, Histórico: %s, Valor: %s, Tipo: %s",
+                      primeira_trans.get('transactionDate', ''), primeira_trans.get('transactionName', ''),
+                      primeira_trans.get('amount', 0), primeira_trans.get('creditDebitType', ''))
+        else:
+            # Se não há transações, mostrar saldo atual na data de hoje
+            data_hoje = datetime.now().strftime('%d/%m/%Y')
+            linhas.append([data_hoje, '', 'SALDO ATUAL', '', '', saldo_fmt])
+        
+        # Transações: valores e saldos formatados por coluna, em lote
+        valores_fmt = formatar_brl_lote(extrato.valores)
+        saldos_fmt = formatar_brl_lote(extrato.saldos)
+        for trans, data, valor_fmt, saldo_fmt in zip(extrato.transacoes, extrato.datas_formatadas,
+                                                     valores_fmt, saldos_fmt):
+            # 6 colunas (Data, vazio, Histórico, Documento, Valor, Saldo)
+            linhas.append([data, '', trans.get('transactionName', ''), trans.get('documentNumber', '') or '',
+                           valor_fmt, saldo_fmt])
+        
+        # ========== QUADRO DE SALDO ==========
+        # Usar saldo_info se disponível, senão usar saldo calculado
+        if saldo_info and 'availableAmount' in saldo_info:
+            saldo_disponivel = float(saldo_info.get('availableAmount', 0))
+            saldo_bloqueado = float(saldo_info.get('blockedAmount', 0))
+            saldo_conta = saldo_disponivel + saldo_bloqueado
+            
+            saldo_conta_fmt, saldo_bloqueado_fmt, saldo_disponivel_fmt = formatar_brl_lote(
+                [saldo_conta, saldo_bloqueado, saldo_disponivel])
+        else:
+            # Usar saldo calculado das transações
+            saldo_conta_fmt = saldo_fmt
+            saldo_bloqueado_fmt = "0,00"
+            saldo_disponivel_fmt = saldo_fmt
+        
+        return {
+            'fundo_nome': fundo_nome,
+            'agencia': str(branch_code),
+            'conta': str(account_number),
+            'periodo_inicio': periodo_inicio,
+            'periodo_fim': periodo_fim,
+            'data_hora': data_hora_agora,
+            'data_posicao': datetime.now().strftime("%d/%m/%Y"),
+            'linhas': linhas,
+            'saldo_conta': saldo_conta_fmt,
+            'saldo_bloqueado': saldo_bloqueado_fmt,
+            'saldo_disponivel': saldo_disponivel_fmt,
+        }
 
 
-def main(fundos=None, data_inicial=None, data_final=None, pasta_saida=None, gerar_pdf=False):
+def _notificar(progresso, evento, **dados):
+    """Envia um evento ao callback de progresso (falhas no callback não interrompem a busca)"""
+    if progresso is None:
+        return
+    try:
+        progresso(evento, dados)
+    except Exception as e:
+        log(f"⚠️ Erro no callback de progresso ({evento}): {e}", nivel=logging.WARNING)
+
+
+def _artefato(cliente, branch_code, account_number, data_inicial, data_final, formato, caminho):
+    """Descreve um arquivo gerado (item do manifesto retornado por main)"""
+    return {
+        'fundo_id': cliente.fundo_id,
+        'fundo_nome': cliente.fundo_nome,
+        'agencia': str(branch_code),
+        'conta': str(account_number),
+        'data_inicial': data_inicial,
+        'data_final': data_final,
+        'formato': formato,
+        'caminho': caminho,
+        'tamanho': os.path.getsize(caminho),
+    }
+
+
+def _processar_conta(cliente, conta, i, total_contas, data_inicial, data_final, pasta_saida, gerar_pdf,
+                     armazem=None, renderizador=None, janela_busca=None, formato_colunar=None,
+                     modo_pdf=None):
+    """
+    Processa uma conta: saldo, transações, Excel e (opcionalmente) PDF e Parquet/Arrow
+    
+    Args:
+        armazem: ArmazemTransacoes para busca incremental (None = busca tudo na API)
+        renderizador: RenderizadorPDF para gerar o PDF em outro processo (opcional)
+        janela_busca: Janela de divisão do período (JANELA_SEMANA, JANELA_MES,
+            nº de dias ou None para uma única consulta)
+        formato_colunar: "parquet" ou "arrow" para exportar também o extrato
+            em formato colunar (None = não exportar)
+        modo_pdf: Layout da tabela do PDF (renderizador_pdf.MODO_PDF_*; None = tabela única)
+    
+    Returns:
+        Dicionário com 'teve_transacoes', 'arquivos_gerados' (quantidade) e
+        'artefatos' (manifesto dos arquivos), ou None se a conta veio com
+        dados incompletos
+    """
+    branch_code = conta.get('branchCode') or conta.get('agencyCode')
+    account_number = conta.get('number') or conta.get('accountNumber')
+    
+    if not branch_code or not account_number:
+        log("❌ Conta %s: Dados incompletos - Branch: %s, Account: %s", i, branch_code, account_number, nivel=logging.ERROR)
+        return None
+    
+    log("\n%s", '-' * 80)
+    log("Processando Conta %s/%s: %s.%s", i, total_contas, branch_code, account_number)
+    log("%s", '-' * 80)
+    
+    teve_transacoes = False
+    artefatos = []
+    
+    # Buscar saldo
+    saldo = cliente.buscar_saldo(branch_code, account_number)
+    log("💰 Saldo obtido: %s", saldo)
+    
+    # Buscar transações (apenas dias faltantes, se houver armazém local)
+    if armazem is not None:
+        transacoes = cliente.buscar_transacoes_incremental(
+            branch_code,
+            account_number,
+            data_inicial=data_inicial,
+            data_final=data_final,
+            armazem=armazem,
+            janela=janela_busca
+        )
+    else:
+        transacoes = cliente.buscar_transacoes(
+            branch_code, 
+            account_number,
+            data_inicial=data_inicial,
+            data_final=data_final,
+            janela=janela_busca
+        )
+    
+    log("📊 Transações recebidas da API: %d", len(transacoes) if transacoes else 0)
+    if transacoes and len(transacoes) > 0:
+        log_debug("   Primeira transação: %s", transacoes[0])
+        teve_transacoes = True
+    
+    # SEMPRE exportar Excel, mesmo sem transações (mostra saldo)
+    # Se não houver transações, criar lista vazia para incluir apenas saldo
+    transacoes_para_export = transacoes if transacoes else []
+    
+    # Ordem, sinais e saldos calculados uma única vez e compartilhados por
+    # todos os formatos (Excel, PDF, Parquet/Arrow)
+    extrato = cliente.calcular_extrato_conta(transacoes_para_export, saldo)
+    
+    # PDF agendado primeiro (mesmo sem transações): com o pool de renderização,
+    # o layout roda em outro processo enquanto o Excel e o Parquet/Arrow são
+    # gravados nesta thread
+    pdf_pendente = None
+    if gerar_pdf:
+        pdf_pendente = cliente._submeter_pdf_extrato(
+            transacoes_para_export,
+            branch_code,
+            account_number,
+            pasta_saida=pasta_saida,
+            saldo_info=saldo,  # Passar info de saldo
+            data_inicial=data_inicial,  # Passar data solicitada
+            data_final=data_final,  # Passar data solicitada
+            renderizador=renderizador,
+            modo_pdf=modo_pdf,
+            extrato=extrato
+        )
+    
+    arquivo_excel = cliente.exportar_transacoes_excel(
+        transacoes_para_export,
+        branch_code,
+        account_number,
+        pasta_saida=pasta_saida,
+        saldo_info=saldo,  # Passar info de saldo
+        extrato=extrato
+    )
+    
+    if arquivo_excel:
+        artefatos.append(_artefato(cliente, branch_code, account_number, data_inicial, data_final,
+                                   'xlsx', arquivo_excel))
+        log("   ✅ Excel gerado: %s", os.path.basename(arquivo_excel))
+    
+    # Exportação colunar (Parquet/Arrow) para análises, se solicitada
+    arquivo_colunar = None
+    if formato_colunar:
+        arquivo_colunar = cliente.exportar_extrato_colunar(
+            transacoes_para_export,
+            branch_code,
+            account_number,
+            pasta_saida=pasta_saida,
+            saldo_info=saldo,
+            data_inicial=data_inicial,
+            data_final=data_final,
+            formato=formato_colunar,
+            extrato=extrato
+        )
+    
+    if gerar_pdf:
+        arquivo_pdf = cliente._concluir_pdf_extrato(pdf_pendente, renderizador)
+        if arquivo_pdf:
+            artefatos.append(_artefato(cliente, branch_code, account_number, data_inicial, data_final,
+                                       'pdf', arquivo_pdf))
+            log("   ✅ PDF gerado: %s", os.path.basename(arquivo_pdf))
+    
+    if arquivo_colunar:
+        artefatos.append(_artefato(cliente, branch_code, account_number, data_inicial, data_final,
+                                   formato_colunar, arquivo_colunar))
+        
+    return {'teve_transacoes': teve_transacoes, 'arquivos_gerados': len(artefatos), 'artefatos': artefatos}
+
+
+def _processar_fundo(fundo_id, data_inicial, data_final, pasta_saida, gerar_pdf,
+                     executar_contas=executar_sequencial, armazem=None, progresso=None,
+                     renderizador=None, janela_busca=None, atualizar_contas=False, formato_colunar=None,
+                     diario=None, modo_pdf=None):
+    """
+    Processa todas as contas de um fundo
+    
+    Args:
+        executar_contas: Função (funcao, itens) que executa as contas
+            (sequencial ou via AgendadorExtratos)
+        armazem: ArmazemTransacoes para busca incremental (opcional)
+        progresso: Callback (evento, dados) notificado a cada conta (opcional)
+        renderizador: RenderizadorPDF compartilhado entre as contas (opcional)
+        janela_busca: Janela de divisão do período de cada conta (opcional)
+        atualizar_contas: Se True, consulta /accounts mesmo com contas válidas em cache
+        formato_colunar: "parquet"/"arrow" para exportar também em formato colunar (opcional)
+        diario: DiarioExecucao para pular contas concluídas e retomar páginas (opcional)
+        modo_pdf: Layout da tabela do PDF (renderizador_pdf.MODO_PDF_*; None = tabela única)
+    
+    Returns:
+        Dicionário com 'status' ('com_transacoes', 'sem_transacoes' ou 'erro')
+        e 'artefatos' (arquivos gerados pelas contas do fundo). Uma conta com
+        extrato incompleto (ExtratoIncompletoError) não interrompe as demais:
+        o fundo fica em 'erro' e os arquivos das outras contas são mantidos
+    """
+    log("\n%s", '=' * 80)
+    log("PROCESSANDO FUNDO: %s", fundo_id)
+    log("%s", '=' * 80)
+    
+    log("\n🔧 Criando cliente para fundo %s...", fundo_id)
+    # Criar cliente
+    cliente = SantanderExtratosBancarios(fundo_id)
+    cliente.diario = diario
+    log("✅ Cliente criado com sucesso")
+    
+    log("🏦 Iniciando listagem de contas...")
+    # Listar contas
+    contas = cliente.listar_contas(usar_cache=not atualizar_contas)
+    log("📊 Resultado da listagem: %d contas", len(contas) if contas else 0)
+    
+    if not contas:
+        log("⚠️  Nenhuma conta encontrada para o fundo %s", fundo_id, nivel=logging.WARNING)
+        log("   Isso pode indicar:")
+        log("   - Token obtido mas sem permissão para listar contas")
+        log("   - Endpoint /accounts retornou estrutura vazia")
+        log("   - CNPJ %s não possui contas no Santander", cliente.cnpj)
+        log("   - Credenciais incorretas ou expiradas")
+        log("   - Problema na API de listagem de contas")
+        return {'status': 'erro', 'artefatos': []}
+    
+    log("📊 Total de contas encontradas: %d", len(contas))
+    if len(contas) > 1:
+        log("   🔍 ATENÇÃO: Fundo com MÚLTIPLAS CONTAS detectado!")
+        for i, c in enumerate(contas, 1):
+            branch = c.get('branchCode') or c.get('agencyCode')
+            account = c.get('number') or c.get('accountNumber')
+            log("      Conta %s: %s.%s", i, branch, account)
+    
+    _notificar(progresso, 'fundo_inicio', fundo_id=fundo_id, contas_total=len(contas))
+    
+    def processar_conta(item):
+        i, conta = item
+        agencia = conta.get('branchCode') or conta.get('agencyCode')
+        numero = conta.get('number') or conta.get('accountNumber')
+        resultado = None
+        try:
+            if diario is not None:
+                resultado = diario.conta_concluida(fundo_id, agencia, numero)
+                if resultado is not None:
+                    log("\n♻️  Conta %s.%s já concluída (diário de execução): %s arquivo(s) mantido(s)",
+                        agencia, numero, resultado['arquivos_gerados'])
+                    return resultado
+            try:
+                resultado = _processar_conta(
+                    cliente, conta, i, len(contas),
+                    data_inicial, data_final, pasta_saida, gerar_pdf,
+                    armazem=armazem, renderizador=renderizador, janela_busca=janela_busca,
+                    formato_colunar=formato_colunar, modo_pdf=modo_pdf
+                )
+            except ExtratoIncompletoError as e:
+                # Só esta conta falha: as demais seguem e mantêm seus arquivos
+                log("❌ Conta %s.%s: extrato incompleto, arquivos não gerados: %s", agencia, numero, e,
+                    nivel=logging.ERROR)
+                resultado = {'teve_transacoes': False, 'arquivos_gerados': 0, 'artefatos': [], 'erro': str(e)}
+                return resultado
+            if diario is not None and resultado is not None:
+                diario.registrar_conta(fundo_id, agencia, numero, resultado,
+                                       paginas=_grupo_diario(fundo_id, url_extrato(agencia, numero)))
+            return resultado
+        finally:
+            _notificar(progresso, 'conta_concluida', fundo_id=fundo_id,
+                       agencia=agencia, conta=numero,
+                       arquivos=resultado['arquivos_gerados'] if resultado else 0,
+                       artefatos=resultado['artefatos'] if resultado else [])
+    
+    # Processar cada conta
+    resultados_contas = executar_contas(processar_conta, list(enumerate(contas, 1)))
+    resultados_contas = [r for r in resultados_contas if r]
+    
+    # Flag para rastrear se o fundo teve alguma transação
+    fundo_teve_transacoes = any(r['teve_transacoes'] for r in resultados_contas)
+    artefatos = [a for r in resultados_contas for a in r['artefatos']]
+    arquivos_gerados = len(artefatos)
+    contas_com_erro = sum(1 for r in resultados_contas if r.get('erro'))
+    
+    # Relatório final do fundo
+    log("\n📈 FUNDO %s - PROCESSAMENTO CONCLUÍDO:", fundo_id)
+    log("   📊 Contas processadas: %d", len(contas))
+    log("   📄 Arquivos gerados: %s", arquivos_gerados)
+    if contas_com_erro:
+        log("   ❌ Contas com extrato incompleto: %s", contas_com_erro, nivel=logging.ERROR)
+    if fundo_teve_transacoes:
+        log("   💰 Teve transações: ✅ SIM")
+    else:
+        log("   💰 Teve transações: ❌ NÃO", nivel=logging.WARNING)
+    
+    # Conta com erro deixa o fundo em 'erro' (refeito ao retomar), mas os
+    # arquivos das demais contas continuam no manifesto
+    if contas_com_erro:
+        status = 'erro'
+    else:
+        status = 'com_transacoes' if fundo_teve_transacoes else 'sem_transacoes'
+    return {
+        'status': status,
+        'artefatos': artefatos,
+    }
+
+
+def main(fundos=None, data_inicial=None, data_final=None, pasta_saida=None, gerar_pdf=False,
+         paralelo=False, max_fundos=MAX_FUNDOS, max_contas_por_fundo=MAX_CONTAS_POR_FUNDO,
+         max_contas_total=MAX_CONTAS_TOTAL, incremental=False, progresso=None,
+         processos_pdf=None, limpar_cache_tokens=False, janela_busca=None, atualizar_contas=False,
+         formato_colunar=None, retomar=False, modo_pdf=None):
     """
     Função principal para buscar extratos de múltiplos fundos
     
@@ -1222,33 +1782,79 @@ def main(fundos=None, data_inicial=None, data_final=None, pasta_saida=None, gera
         data_final: Data final (datetime ou None)
         pasta_saida: Pasta para salvar arquivos
         gerar_pdf: Se True, gera também PDF do extrato
+        paralelo: Se True, processa fundos e contas simultaneamente
+        max_fundos: Fundos simultâneos no modo paralelo
+        max_contas_por_fundo: Contas simultâneas de um mesmo fundo no modo paralelo
+        max_contas_total: Contas simultâneas somando todos os fundos no modo paralelo
+        incremental: Se True, usa o armazém local (config/transacoes.db) e só
+            busca na API os dias que ainda não foram baixados
+        progresso: Callback opcional progresso(evento, dados), chamado com os
+            eventos 'inicio', 'fundo_inicio', 'conta_concluida',
+            'fundo_concluido' e 'fim' (pode ser chamado de várias threads)
+        processos_pdf: Processos usados para renderizar os PDFs grandes (0 =
+            renderizar na própria thread de cada conta; None =
+            renderizador_pdf.MAX_PROCESSOS_PDF). O pool é compartilhado pelo
+            processo e só é criado no primeiro extrato com
+            renderizador_pdf.LINHAS_MINIMAS_POOL linhas
+        limpar_cache_tokens: Se True, descarta os tokens em cache (memória,
+            SANTANDER_CACHE_TOKENS e config/santander_token_*.json) antes de começar
+        janela_busca: Divide o período de cada conta em janelas buscadas em
+            paralelo (JANELA_SEMANA, JANELA_MES ou nº de dias; None = uma
+            única consulta por conta) - recomendado para períodos longos
+        atualizar_contas: Se True, ignora as contas em cache (cache_contas) e
+            consulta /accounts para todos os fundos, atualizando o cache
+        formato_colunar: "parquet" ou "arrow" para gerar também o extrato em
+            formato colunar tipado (exportador_colunar; requer pyarrow)
+        retomar: Se True, grava um diário de execução (diario_execucao) e, se
+            uma execução com os mesmos parâmetros foi interrompida, pula os
+            fundos/contas já concluídos e continua as buscas da última página
+            concluída; o diário é apagado quando a execução termina sem erros
+        modo_pdf: Layout da tabela dos PDFs (renderizador_pdf.MODO_PDF_*; None =
+            tabela única, o layout original). MODO_PDF_AUTO pagina em blocos os
+            extratos com mais de LIMITE_TABELA_UNICA linhas (mais rápido em
+            períodos longos); MODO_PDF_PAGINADO pagina todos
+    
+    Returns:
+        Dicionário com o resumo: fundos_com_transacoes, fundos_sem_transacoes,
+        fundos_com_erro, tempo_por_fundo (segundos), tempo_total (segundos) e
+        artefatos - manifesto dos arquivos gerados, um dicionário por arquivo com
+        fundo_id, fundo_nome, agencia, conta, data_inicial, data_final,
+        formato ('xlsx', 'pdf', 'parquet' ou 'arrow'), caminho e tamanho (bytes); limitadores -
+        estatísticas de taxa por client_id (requisições, 429, 5xx, novas
+        tentativas, tempo de espera, taxa atual); contas_cache - acertos,
+        listas vencidas usadas como fallback, ausências e gravações do cache
+        de contas; diario - fundos, contas e páginas retomados (com retomar=True)
     """
     log("="*80)
     log("BUSCA DE EXTRATOS BANCÁRIOS SANTANDER")
     log("="*80)
     
-    # 🧹 LIMPEZA DE CACHE: Remover tokens antigos
-    log("\n🧹 Limpando cache de tokens...")
-    import glob
-    tokens_removidos = 0
-    try:
-        # Buscar arquivos de token no diretório config
-        config_dir = os.path.join(os.path.dirname(__file__), 'config')
-        if os.path.exists(config_dir):
-            token_files = glob.glob(os.path.join(config_dir, 'santander_token_*.json'))
-            for token_file in token_files:
-                try:
-                    os.remove(token_file)
-                    tokens_removidos += 1
-                except Exception as e:
-                    log(f"⚠️ Não foi possível remover {os.path.basename(token_file)}: {e}")
-    except Exception as e:
-        log(f"⚠️ Erro ao limpar cache: {e}")
+    inicio_execucao = time.perf_counter()
     
-    if tokens_removidos > 0:
-        log(f"✅ {tokens_removidos} token(s) de cache removido(s)")
-    else:
-        log("✅ Nenhum token de cache encontrado")
+    # 🧹 LIMPEZA DE CACHE (opcional): por padrão os tokens válidos são reutilizados
+    if limpar_cache_tokens:
+        log("\n🧹 Limpando cache de tokens...")
+        obter_cache_tokens().limpar()
+        import glob
+        tokens_removidos = 0
+        try:
+            # Buscar arquivos de token no diretório config
+            config_dir = os.path.join(os.path.dirname(__file__), 'config')
+            if os.path.exists(config_dir):
+                token_files = glob.glob(os.path.join(config_dir, 'santander_token_*.json'))
+                for token_file in token_files:
+                    try:
+                        os.remove(token_file)
+                        tokens_removidos += 1
+                    except Exception as e:
+                        log(f"⚠️ Não foi possível remover {os.path.basename(token_file)}: {e}", nivel=logging.WARNING)
+        except Exception as e:
+            log(f"⚠️ Erro ao limpar cache: {e}", nivel=logging.WARNING)
+        
+        if tokens_removidos > 0:
+            log(f"✅ {tokens_removidos} token(s) de cache removido(s)")
+        else:
+            log("✅ Cache de tokens limpo")
     
     # Determinar quais fundos processar
     if not fundos:
@@ -1257,131 +1863,106 @@ def main(fundos=None, data_inicial=None, data_final=None, pasta_saida=None, gera
                   if creds.get("client_id") and creds.get("client_secret")]
     
     log(f"\n📋 Fundos a processar: {', '.join(fundos)}")
+    if paralelo:
+        log(f"⚡ Modo paralelo: {max_fundos} fundo(s), {max_contas_por_fundo} conta(s) por fundo, "
+            f"{max_contas_total} conta(s) no total")
+    
+    armazem = ArmazemTransacoes() if incremental else None
+    if armazem is not None:
+        log(f"🗄️  Busca incremental ativa (armazém: {armazem.caminho})")
+    
+    # PDFs grandes renderizados em processos separados (o layout do ReportLab é
+    # CPU-bound); o pool é do processo e reaproveitado entre execuções
+    renderizador = None
+    if gerar_pdf:
+        from renderizador_pdf import obter_renderizador_pdf, LINHAS_MINIMAS_POOL
+        renderizador = obter_renderizador_pdf(processos_pdf)
+    if renderizador is not None and renderizador.ativo:
+        log("🖨️  PDFs com %d+ linhas renderizados em até %d processo(s)",
+            LINHAS_MINIMAS_POOL, renderizador.processos)
+    
+    # Diário de execução: checkpoints para retomar uma execução interrompida
+    diario = None
+    if retomar:
+        # Período padrão resolvido como em buscar_transacoes (hoje e 7 dias antes): com as
+        # datas None, execuções de dias diferentes abririam o mesmo diário
+        fim_diario = data_final or datetime.now()
+        inicio_diario = data_inicial or fim_diario - timedelta(days=7)
+        diario = abrir_diario_execucao({
+            'fundos': list(fundos), 'data_inicial': inicio_diario.strftime("%Y-%m-%d"),
+            'data_final': fim_diario.strftime("%Y-%m-%d"),
+            'pasta_saida': os.path.abspath(pasta_saida or os.getcwd()), 'gerar_pdf': bool(gerar_pdf),
+            'formato_colunar': formato_colunar, 'janela_busca': janela_busca, 'incremental': bool(incremental),
+            'modo_pdf': modo_pdf,
+        })
+        if diario.retomada:
+            log(f"♻️  Retomando execução interrompida (diário: {diario.caminho})")
+        else:
+            log(f"📒 Diário de execução: {diario.caminho}")
+    
+    _notificar(progresso, 'inicio', fundos=list(fundos))
+    
+    def processar(fundo_id, executar_contas=executar_sequencial):
+        status = 'erro'
+        try:
+            resultado = diario.fundo_concluido(fundo_id) if diario is not None else None
+            if resultado is not None:
+                log(f"\n♻️  Fundo {fundo_id} já concluído (diário de execução): "
+                    f"{len(resultado['artefatos'])} arquivo(s) mantido(s)")
+                status = resultado['status']
+                return resultado
+            resultado = _processar_fundo(fundo_id, data_inicial, data_final, pasta_saida, gerar_pdf,
+                                         executar_contas=executar_contas, armazem=armazem,
+                                         progresso=progresso, renderizador=renderizador,
+                                         janela_busca=janela_busca, atualizar_contas=atualizar_contas,
+                                         formato_colunar=formato_colunar, diario=diario, modo_pdf=modo_pdf)
+            if diario is not None:
+                diario.registrar_fundo(fundo_id, resultado)
+            status = resultado['status']
+            return resultado
+        finally:
+            _notificar(progresso, 'fundo_concluido', fundo_id=fundo_id, status=status)
+    
+    # Processar fundos (sequencialmente ou via agendador)
+    if paralelo:
+        agendador = AgendadorExtratos(max_fundos, max_contas_por_fundo, max_contas_total)
+        execucoes = agendador.executar(fundos, processar)
+    else:
+        execucoes = []
+        for fundo_id in fundos:
+            inicio = time.perf_counter()
+            resultado = erro = None
+            try:
+                resultado = processar(fundo_id)
+            except Exception as e:
+                erro = e
+            execucoes.append((fundo_id, resultado, erro, time.perf_counter() - inicio))
     
     # Rastreamento de resultados
     fundos_com_transacoes = []
     fundos_sem_transacoes = []
     fundos_com_erro = []
+    tempo_por_fundo = {}
+    artefatos = []
     
-    # Processar cada fundo
-    for fundo_id in fundos:
-        log(f"\n{'='*80}")
-        log(f"PROCESSANDO FUNDO: {fundo_id}")
-        log(f"{'='*80}")
-        
-        try:
-            log(f"\n🔧 Criando cliente para fundo {fundo_id}...")
-            # Criar cliente
-            cliente = SantanderExtratosBancarios(fundo_id)
-            log(f"✅ Cliente criado com sucesso")
-            
-            log(f"🏦 Iniciando listagem de contas...")
-            # Listar contas
-            contas = cliente.listar_contas()
-            log(f"📊 Resultado da listagem: {len(contas) if contas else 0} contas")
-            
-            if not contas:
-                log(f"⚠️  Nenhuma conta encontrada para o fundo {fundo_id}")
-                log(f"   Isso pode indicar:")
-                log(f"   - Token obtido mas sem permissão para listar contas")
-                log(f"   - Endpoint /accounts retornou estrutura vazia")
-                log(f"   - CNPJ {cliente.cnpj} não possui contas no Santander")
-                log(f"   - Credenciais incorretas ou expiradas")
-                log(f"   - Problema na API de listagem de contas")
-                fundos_com_erro.append(fundo_id)
-                continue
-            
-            log(f"📊 Total de contas encontradas: {len(contas)}")
-            if len(contas) > 1:
-                log(f"   🔍 ATENÇÃO: Fundo com MÚLTIPLAS CONTAS detectado!")
-                for i, c in enumerate(contas, 1):
-                    branch = c.get('branchCode') or c.get('agencyCode')
-                    account = c.get('number') or c.get('accountNumber')
-                    log(f"      Conta {i}: {branch}.{account}")
-            
-            # Flag para rastrear se o fundo teve alguma transação
-            fundo_teve_transacoes = False
-            arquivos_gerados = 0
-            
-            # Processar cada conta
-            for i, conta in enumerate(contas, 1):
-                branch_code = conta.get('branchCode') or conta.get('agencyCode')
-                account_number = conta.get('number') or conta.get('accountNumber')
-                
-                if not branch_code or not account_number:
-                    log(f"❌ Conta {i}: Dados incompletos - Branch: {branch_code}, Account: {account_number}")
-                    continue
-                
-                log(f"\n{'-'*80}")
-                log(f"Processando Conta {i}/{len(contas)}: {branch_code}.{account_number}")
-                log(f"{'-'*80}")
-                
-                # Buscar saldo
-                saldo = cliente.buscar_saldo(branch_code, account_number)
-                log(f"💰 Saldo obtido: {saldo}")
-                
-                # Buscar transações
-                transacoes = cliente.buscar_transacoes(
-                    branch_code, 
-                    account_number,
-                    data_inicial=data_inicial,
-                    data_final=data_final
-                )
-                
-                log(f"📊 Transações recebidas da API: {len(transacoes) if transacoes else 0}")
-                if transacoes and len(transacoes) > 0:
-                    log(f"   Primeira transação: {transacoes[0]}")
-                    fundo_teve_transacoes = True
-                
-                # SEMPRE exportar Excel, mesmo sem transações (mostra saldo)
-                # Se não houver transações, criar lista vazia para incluir apenas saldo
-                transacoes_para_export = transacoes if transacoes else []
-                
-                arquivo_excel = cliente.exportar_transacoes_excel(
-                    transacoes_para_export,
-                    branch_code,
-                    account_number,
-                    pasta_saida=pasta_saida,
-                    saldo_info=saldo  # Passar info de saldo
-                )
-                
-                if arquivo_excel:
-                    arquivos_gerados += 1
-                    log(f"   ✅ Excel gerado: {os.path.basename(arquivo_excel)}")
-                
-                # Gerar PDF se solicitado (mesmo sem transações)
-                if gerar_pdf:
-                    arquivo_pdf = cliente.gerar_pdf_extrato(
-                        transacoes_para_export,
-                        branch_code,
-                        account_number,
-                        pasta_saida=pasta_saida,
-                        saldo_info=saldo,  # Passar info de saldo
-                        data_inicial=data_inicial,  # Passar data solicitada
-                        data_final=data_final  # Passar data solicitada
-                    )
-                    
-                    if arquivo_pdf:
-                        arquivos_gerados += 1
-                        log(f"   ✅ PDF gerado: {os.path.basename(arquivo_pdf)}")
-            
-            # Relatório final do fundo
-            log(f"\n📈 FUNDO {fundo_id} - PROCESSAMENTO CONCLUÍDO:")
-            log(f"   📊 Contas processadas: {len(contas)}")
-            log(f"   📄 Arquivos gerados: {arquivos_gerados}")
-            log(f"   💰 Teve transações: {'✅ SIM' if fundo_teve_transacoes else '❌ NÃO'}")
-            
-            # Adicionar fundo na lista apropriada
-            if fundo_teve_transacoes:
-                fundos_com_transacoes.append(fundo_id)
-            else:
-                fundos_sem_transacoes.append(fundo_id)
-        
-        except Exception as e:
-            log(f"\n❌ Erro ao processar fundo {fundo_id}: {e}")
-            fundos_com_erro.append(fundo_id)
+    for fundo_id, resultado, erro, tempo in execucoes:
+        tempo_por_fundo[fundo_id] = tempo
+        if resultado:
+            artefatos.extend(resultado['artefatos'])
+            resultado = resultado['status']
+        if erro is not None:
+            log(f"\n❌ Erro ao processar fundo {fundo_id}: {erro}", nivel=logging.ERROR)
             import traceback
-            traceback.print_exc()
+            traceback.print_exception(type(erro), erro, erro.__traceback__)
+            fundos_com_erro.append(fundo_id)
+        elif resultado == 'com_transacoes':
+            fundos_com_transacoes.append(fundo_id)
+        elif resultado == 'sem_transacoes':
+            fundos_sem_transacoes.append(fundo_id)
+        else:
+            fundos_com_erro.append(fundo_id)
+    
+    tempo_total = time.perf_counter() - inicio_execucao
     
     log("\n" + "="*80)
     log("PROCESSAMENTO CONCLUÍDO")
@@ -1398,19 +1979,66 @@ def main(fundos=None, data_inicial=None, data_final=None, pasta_saida=None, gera
             log(f"   • {fundo_nome}")
     
     if fundos_sem_transacoes:
-        log(f"\n⚠️  Fundos SEM transações no período ({len(fundos_sem_transacoes)}):")
+        log(f"\n⚠️  Fundos SEM transações no período ({len(fundos_sem_transacoes)}):", nivel=logging.WARNING)
         for fundo in fundos_sem_transacoes:
             fundo_nome = SANTANDER_FUNDOS.get(fundo, {}).get('nome', fundo)
             log(f"   • {fundo_nome}")
         log("\n   💡 Arquivos foram gerados mostrando apenas os saldos atuais")
     
     if fundos_com_erro:
-        log(f"\n❌ Fundos com ERRO ({len(fundos_com_erro)}):")
+        log(f"\n❌ Fundos com ERRO ({len(fundos_com_erro)}):", nivel=logging.ERROR)
         for fundo in fundos_com_erro:
             fundo_nome = SANTANDER_FUNDOS.get(fundo, {}).get('nome', fundo)
             log(f"   • {fundo_nome}")
     
+    # Tempo de cada fundo (wall time)
+    log(f"\n⏱️  Tempo por fundo:")
+    for fundo_id, tempo in tempo_por_fundo.items():
+        log(f"   • {fundo_id}: {tempo:.1f}s")
+    log(f"   Total: {tempo_total:.1f}s")
+    
+    # Estatísticas do pool de conexões mTLS
+    for (cert, _key), estat in estatisticas_sessoes().items():
+        log(f"\n🔌 Conexões ({os.path.basename(cert)}): {estat['requisicoes']} requisições | "
+            f"{estat['conexoes_abertas']} abertas | {estat['conexoes_reutilizadas']} reutilizadas")
+    
+    # Estatísticas dos limitadores de taxa (para calibrar SANTANDER_TAXA_MAXIMA)
+    limitadores = estatisticas_limitadores()
+    for client_id, estat in limitadores.items():
+        log(f"🚦 Taxa ({client_id[:10]}...): {estat['requisicoes']} requisições | "
+            f"{estat['respostas_429']} x 429 | {estat['respostas_5xx']} x 5xx | {estat['excecoes']} exceções | "
+            f"{estat['novas_tentativas']} novas tentativas | {estat['tempo_espera']:.1f}s de espera | "
+            f"taxa atual {estat['taxa_atual']:.1f}/s")
+    
+    contas_cache = dict(obter_cache_contas().estatisticas)
+    log(f"🏦 Contas: {contas_cache['acertos']} fundo(s) do cache | {contas_cache['gravacoes']} consultado(s) na API | "
+        f"{contas_cache['vencidas_usadas']} com cache vencido como fallback")
+    
+    # Diário: apagado se tudo terminou bem; mantido para a próxima execução retomar os fundos com erro
+    estatisticas_diario = None
+    if diario is not None:
+        diario.encerrar(concluida=not fundos_com_erro)
+        estatisticas_diario = dict(diario.estatisticas)
+        log(f"📒 Diário: {estatisticas_diario['fundos_retomados']} fundo(s), "
+            f"{estatisticas_diario['contas_retomadas']} conta(s) e {estatisticas_diario['paginas_retomadas']} "
+            f"página(s) retomados | {'apagado (execução concluída)' if not fundos_com_erro else 'mantido em ' + diario.caminho}")
+    
     log("\n" + "="*80)
+    
+    resumo = {
+        'fundos_com_transacoes': fundos_com_transacoes,
+        'fundos_sem_transacoes': fundos_sem_transacoes,
+        'fundos_com_erro': fundos_com_erro,
+        'tempo_por_fundo': tempo_por_fundo,
+        'tempo_total': tempo_total,
+        'artefatos': artefatos,
+        'limitadores': limitadores,
+        'contas_cache': contas_cache,
+    }
+    if estatisticas_diario is not None:
+        resumo['diario'] = estatisticas_diario
+    _notificar(progresso, 'fim', resumo=resumo)
+    return resumo
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+"""
+Cache persistente das contas de cada fundo (descoberta via /accounts)
+As contas de um fundo quase nunca mudam, mas main() chamava listar_contas()
+- uma requisição autenticada - para cada fundo em toda execução, e só usava
+as contas conhecidas (fixas no código) quando /accounts respondia 401.
+
+- Validade (TTL_CONTAS): dentro dela, as contas do cache são usadas sem
+  consultar a API
+- Fallback: vencida a validade, a API é consultada; se /accounts falhar ou
+  demorar, a última lista conhecida é usada mesmo vencida
+- Invalidação explícita por fundo (invalidar) ou total (limpar)
+- A entrada guarda o client_id: se as credenciais do fundo mudarem, a lista
+  antiga é ignorada
+- Persistência em ARQUIVO_CACHE (padrão config/contas_santander.json;
+  SANTANDER_CACHE_CONTAS="" = somente memória)
+
+Uso:
+    cache = obter_cache_contas()
+    contas = cache.obter(fundo_id, client_id)                        # None se ausente/vencida
+    contas = cache.obter(fundo_id, client_id, aceitar_vencida=True)  # fallback
+    cache.gravar(fundo_id, client_id, contas)
+    cache.invalidar(fundo_id)
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+CAMINHO_PADRAO = Path(__file__).parent / "config" / "contas_santander.json"
+
+TTL_CONTAS = float(os.environ.get("SANTANDER_TTL_CONTAS", 24 * 3600))  # Segundos
+
+# Arquivo de persistência do cache padrão (vazio = somente memória)
+ARQUIVO_CACHE = os.environ.get("SANTANDER_CACHE_CONTAS", str(CAMINHO_PADRAO)) or None
+
+
+class CacheContas:
+    """
+    Contas por fundo com validade e persistência opcional em JSON
+
+    Args:
+        caminho: Arquivo JSON compartilhado entre execuções (None = somente memória)
+        ttl: Segundos em que a lista é usada sem consultar a API
+    """
+
+    def __init__(self, caminho=None, ttl=TTL_CONTAS):
+        self.caminho = caminho
+        self.ttl = ttl
+        self._entradas = None  # Carregadas do disco no primeiro acesso
+        self._lock = threading.Lock()
+        self.estatisticas = {'acertos': 0, 'vencidas_usadas': 0, 'ausentes': 0, 'gravacoes': 0}
+
+    def _carregar(self):
+        """Entradas em memória (lidas do arquivo na primeira chamada); chamar com o lock"""
+        if self._entradas is None:
+            self._entradas = self._ler_arquivo() if self.caminho else {}
+        return self._entradas
+
+    def obter(self, fundo_id, client_id, aceitar_vencida=False):
+        """
+        Contas do fundo em cache
+
+        Args:
+            fundo_id: ID do fundo
+            client_id: client_id atual do fundo (entradas de outro client_id são ignoradas)
+            aceitar_vencida: Se True, devolve a lista mesmo fora da validade (fallback)
+
+        Returns:
+            Lista de contas ou None
+        """
+        with self._lock:
+            entrada = self._carregar().get(fundo_id)
+            if not entrada or entrada.get('client_id') != client_id or not entrada.get('contas'):
+                self.estatisticas['ausentes'] += 1
+                return None
+            if time.time() - entrada['atualizado_em'] < self.ttl:
+                self.estatisticas['acertos'] += 1
+            elif aceitar_vencida:
+                self.estatisticas['vencidas_usadas'] += 1
+            else:
+                return None
+            return [dict(conta) for conta in entrada['contas']]
+
+    def idade(self, fundo_id):
+        """Segundos desde a última atualização das contas do fundo, ou None"""
+        with self._lock:
+            entrada = self._carregar().get(fundo_id)
+        return time.time() - entrada['atualizado_em'] if entrada else None
+
+    def gravar(self, fundo_id, client_id, contas):
+        """Registra a lista devolvida pela API (listas vazias não são gravadas)"""
+        if not contas:
+            return
+        entrada = {'client_id': client_id, 'contas': [dict(conta) for conta in contas],
+                   'atualizado_em': time.time()}
+        with self._lock:
+            self._carregar()[fundo_id] = entrada
+            self.estatisticas['gravacoes'] += 1
+            self._persistir()
+
+    def invalidar(self, fundo_id):
+        """Descarta as contas do fundo (a próxima listagem consulta a API)"""
+        with self._lock:
+            if self._carregar().pop(fundo_id, None) is not None:
+                self._persistir()
+
+    def limpar(self):
+        """Descarta as contas de todos os fundos (memória e disco)"""
+        with self._lock:
+            self._entradas = {}
+            self._persistir()
+
+    # ------------------------------------------------------------------ #
+    # Persistência
+    # ------------------------------------------------------------------ #
+    def _ler_arquivo(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                entradas = json.load(f)
+            return entradas if isinstance(entradas, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _persistir(self):
+        """Grava as entradas no arquivo (chamar com o lock); falhas de escrita só desativam a persistência"""
+        if not self.caminho:
+            return
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(self._entradas, f, ensure_ascii=False, indent=2)
+            os.replace(temporario, self.caminho)
+        except OSError:
+            self.caminho = None
+
+
+_cache_padrao = None
+_lock_cache_padrao = threading.Lock()
+
+
+def obter_cache_contas():
+    """Cache compartilhado pelo processo (persistido em ARQUIVO_CACHE, se definido)"""
+    global _cache_padrao
+    with _lock_cache_padrao:
+        if _cache_padrao is None:
+            _cache_padrao = CacheContas(ARQUIVO_CACHE)
+        return _cache_padrao
@@ -0,0 +1,221 @@
+"""
+Cache em disco das páginas de extrato (opcional, para desenvolvimento e conferências)
+Os scripts de conferência (conferir_todas_transacoes.py,
+conferir_saldo_progressivo.py, comparar_api_santander.py,
+teste_validacao_saldos.py) buscam a mesma janela na API a cada execução.
+Com o cache ativo, uma página de uma janela já encerrada é lida do disco.
+
+- Ativação: variável SANTANDER_CACHE_PAGINAS com a pasta do cache (ou
+  ativar_cache_paginas(pasta) no próprio script); sem ela, nada é gravado
+- Chave: (URL da conta, initialDate, finalDate, _limit, _offset)
+- Só janelas encerradas: se finalDate é hoje ou depois, a página sempre vem
+  da API (o dia corrente ainda recebe lançamentos)
+- Validade (SANTANDER_TTL_PAGINAS, padrão 7 dias) e tamanho máximo
+  (SANTANDER_CACHE_PAGINAS_MB, padrão 200 MB): acima do limite, as páginas
+  usadas há mais tempo são descartadas
+- Integridade: cada arquivo guarda o SHA-256 do conteúdo; arquivo cortado ou
+  alterado é descartado e a página é buscada de novo
+
+Uso:
+    cache = obter_cache_paginas()          # None se o cache não estiver ativo
+    if cache is not None and cache.cacheavel(final_date):
+        dados = cache.obter(chave)         # None se ausente/vencida
+        cache.gravar(chave, dados)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import date
+
+TTL_PAGINAS = float(os.environ.get("SANTANDER_TTL_PAGINAS", 7 * 24 * 3600))  # Segundos
+TAMANHO_MAXIMO = int(float(os.environ.get("SANTANDER_CACHE_PAGINAS_MB", 200)) * 1024 * 1024)  # Bytes
+
+# Pasta do cache padrão (vazio = desativado)
+PASTA_CACHE = os.environ.get("SANTANDER_CACHE_PAGINAS") or None
+
+_EXTENSAO = '.pagina'
+
+
+def janela_encerrada(data_final, hoje=None):
+    """True se a janela terminou antes de hoje (data_final: 'YYYY-MM-DD', date ou datetime)"""
+    if not data_final:
+        return False
+    if isinstance(data_final, str):
+        try:
+            data_final = date.fromisoformat(data_final[:10])
+        except ValueError:
+            return False
+    elif hasattr(data_final, 'date'):
+        data_final = data_final.date()
+    return data_final < (hoje or date.today())
+
+
+class CachePaginas:
+    """
+    Páginas de extrato em disco, um arquivo por chave
+
+    Args:
+        pasta: Pasta dos arquivos (criada se não existir)
+        ttl: Segundos em que uma página gravada é reaproveitada
+        tamanho_maximo: Bytes ocupados pela pasta antes de descartar as
+            páginas menos usadas
+    """
+
+    def __init__(self, pasta, ttl=TTL_PAGINAS, tamanho_maximo=TAMANHO_MAXIMO):
+        self.pasta = os.fspath(pasta)
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self._tamanho = None  # Bytes na pasta (medido no primeiro uso)
+        self._lock = threading.Lock()
+        self.estatisticas = {'acertos': 0, 'ausentes': 0, 'vencidas': 0, 'invalidas': 0,
+                             'gravacoes': 0, 'descartadas': 0}
+        os.makedirs(self.pasta, exist_ok=True)
+
+    # Só janelas encerradas: o dia corrente ainda recebe lançamentos
+    cacheavel = staticmethod(janela_encerrada)
+
+    def _caminho(self, chave):
+        texto = json.dumps([str(parte) for parte in chave], ensure_ascii=False)
+        return os.path.join(self.pasta, hashlib.sha256(texto.encode('utf-8')).hexdigest() + _EXTENSAO)
+
+    def obter(self, chave):
+        """
+        Página gravada para a chave
+
+        Returns:
+            Dicionário com a resposta da API ou None (ausente, vencida ou inválida)
+        """
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                cabecalho = json.loads(f.readline())
+                corpo = f.read()
+        except FileNotFoundError:
+            self._contar('ausentes')
+            return None
+        except (OSError, ValueError):
+            self._descartar(caminho, 'invalidas')
+            return None
+
+        if time.time() - cabecalho.get('gravado_em', 0) >= self.ttl:
+            self._descartar(caminho, 'vencidas')
+            return None
+        if hashlib.sha256(corpo).hexdigest() != cabecalho.get('sha256'):
+            self._descartar(caminho, 'invalidas')
+            return None
+
+        try:
+            dados = json.loads(corpo)
+            os.utime(caminho)  # Usada agora: última a ser descartada por tamanho
+        except (OSError, ValueError):
+            self._descartar(caminho, 'invalidas')
+            return None
+        self._contar('acertos')
+        return dados
+
+    def gravar(self, chave, dados):
+        """Grava a resposta da API (arquivo temporário + rename: leitores nunca veem meia página)"""
+        corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        cabecalho = json.dumps({'chave': [str(parte) for parte in chave], 'gravado_em': time.time(),
+                                'sha256': hashlib.sha256(corpo).hexdigest()}, ensure_ascii=False)
+        conteudo = cabecalho.encode('utf-8') + b"\n" + corpo
+        caminho = self._caminho(chave)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            anterior = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+            with open(temporario, 'wb') as f:
+                f.write(conteudo)
+            os.replace(temporario, caminho)
+        except OSError:
+            return
+        with self._lock:
+            self.estatisticas['gravacoes'] += 1
+            if self._tamanho is not None:
+                self._tamanho += len(conteudo) - anterior
+        self._limitar_tamanho()
+
+    def limpar(self):
+        """Apaga todas as páginas"""
+        with self._lock:
+            for nome in os.listdir(self.pasta):
+                if nome.endswith(_EXTENSAO):
+                    try:
+                        os.remove(os.path.join(self.pasta, nome))
+                    except OSError:
+                        pass
+            self._tamanho = 0
+
+    # ------------------------------------------------------------------ #
+    # Manutenção
+    # ------------------------------------------------------------------ #
+    def _contar(self, campo):
+        with self._lock:
+            self.estatisticas[campo] += 1
+
+    def _descartar(self, caminho, motivo):
+        try:
+            tamanho = os.path.getsize(caminho)
+            os.remove(caminho)
+        except OSError:
+            tamanho = 0
+        with self._lock:
+            self.estatisticas[motivo] += 1
+            if self._tamanho is not None:
+                self._tamanho -= tamanho
+
+    def _arquivos(self):
+        """(mtime, tamanho, caminho) das páginas na pasta"""
+        arquivos = []
+        for entrada in os.scandir(self.pasta):
+            if entrada.name.endswith(_EXTENSAO):
+                try:
+                    estat = entrada.stat()
+                except OSError:
+                    continue
+                arquivos.append((estat.st_mtime, estat.st_size, entrada.path))
+        return arquivos
+
+    def _limitar_tamanho(self):
+        """Acima de tamanho_maximo, descarta as páginas usadas há mais tempo até 90% do limite"""
+        with self._lock:
+            if self._tamanho is None:
+                self._tamanho = sum(tamanho for _m, tamanho, _c in self._arquivos())
+            if self._tamanho <= self.tamanho_maximo:
+                return
+            alvo = self.tamanho_maximo * 0.9
+            arquivos = sorted(self._arquivos())
+            self._tamanho = sum(tamanho for _m, tamanho, _c in arquivos)
+            for _mtime, tamanho, caminho in arquivos:
+                if self._tamanho <= alvo:
+                    break
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    continue
+                self._tamanho -= tamanho
+                self.estatisticas['descartadas'] += 1
+
+
+_cache_padrao = None
+_lock_cache_padrao = threading.Lock()
+
+
+def ativar_cache_paginas(pasta, ttl=TTL_PAGINAS, tamanho_maximo=TAMANHO_MAXIMO):
+    """Ativa o cache do processo na pasta informada (equivale a definir SANTANDER_CACHE_PAGINAS)"""
+    global _cache_padrao
+    with _lock_cache_padrao:
+        _cache_padrao = CachePaginas(pasta, ttl, tamanho_maximo)
+        return _cache_padrao
+
+
+def obter_cache_paginas():
+    """Cache do processo, ou None se não foi ativado (SANTANDER_CACHE_PAGINAS / ativar_cache_paginas)"""
+    global _cache_padrao
+    if _cache_padrao is None and PASTA_CACHE:
+        with _lock_cache_padrao:
+            if _cache_padrao is None:
+                _cache_padrao = CachePaginas(PASTA_CACHE)
+    return _cache_padrao
@@ -0,0 +1,331 @@
+"""
+Cache compartilhado de tokens OAuth2 das APIs Santander
+Um token por (client_id, escopo), compartilhado por todos os clientes do
+processo - e, opcionalmente, entre processos e execuções via arquivo em disco.
+
+Antes, cada instância (SantanderExtratosBancarios, SantanderAuth) guardava o
+próprio token e main() apagava o cache em disco a cada execução, então cada
+script, clique no dashboard e fundo emitia um token novo.
+
+- Um lock por chave: com várias threads pedindo o mesmo token expirado,
+  apenas uma chama o endpoint; as demais esperam e reutilizam o resultado
+- Renovação proativa: perto do vencimento (ANTECEDENCIA_RENOVACAO), uma
+  única thread renova enquanto as demais continuam usando o token atual
+- Persistência opcional (SANTANDER_CACHE_TOKENS=caminho/arquivo.json), com
+  trava de arquivo (fcntl no Linux/macOS, msvcrt no Windows) para que
+  processos diferentes também não emitam tokens em paralelo
+
+Uso:
+    cache = obter_cache_tokens()
+    token = cache.obter(client_id, escopo, emitir)   # emitir() -> (token, expires_in) ou None
+    token = await cache.obter_async(client_id, escopo, emitir_async)   # cliente assíncrono
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager, nullcontext
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+try:
+    import msvcrt
+    HAS_MSVCRT = True
+except ImportError:
+    HAS_MSVCRT = False
+
+MARGEM_EXPIRACAO = 60          # Segundos antes de expires_in em que o token deixa de ser usado
+ANTECEDENCIA_RENOVACAO = 180   # Segundos antes de expires_in em que a renovação proativa começa
+
+# Arquivo de persistência do cache padrão (vazio = somente memória)
+ARQUIVO_CACHE = os.environ.get("SANTANDER_CACHE_TOKENS") or None
+
+
+@contextmanager
+def _travar_arquivo(caminho_trava):
+    """Trava exclusiva entre processos (bloqueante) usando um arquivo auxiliar"""
+    with open(caminho_trava, 'a+b') as f:
+        if HAS_FCNTL:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif HAS_MSVCRT:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if HAS_FCNTL:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif HAS_MSVCRT:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CacheTokens:
+    """
+    Tokens por (client_id, escopo) com renovação proativa e persistência opcional
+
+    Args:
+        caminho: Arquivo JSON para compartilhar tokens entre processos/execuções
+            (None = somente memória)
+        margem_expiracao: Segundos antes do vencimento em que o token é descartado
+        antecedencia_renovacao: Segundos antes do vencimento em que uma thread
+            renova o token sem bloquear as demais
+    """
+
+    def __init__(self, caminho=None, margem_expiracao=MARGEM_EXPIRACAO,
+                 antecedencia_renovacao=ANTECEDENCIA_RENOVACAO):
+        self.caminho = caminho
+        self.margem_expiracao = margem_expiracao
+        self.antecedencia_renovacao = max(antecedencia_renovacao, margem_expiracao)
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._locks_chaves = {}
+        self._locks_async = weakref.WeakKeyDictionary()  # loop -> {chave: asyncio.Lock}
+        self.estatisticas = {'reutilizados': 0, 'emitidos': 0, 'lidos_disco': 0, 'renovacoes_proativas': 0}
+
+        if caminho:
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+
+    # ------------------------------------------------------------------ #
+    # Validade
+    # ------------------------------------------------------------------ #
+    def _valido(self, entrada, agora):
+        return entrada is not None and agora < entrada['expira_em'] - self.margem_expiracao
+
+    def _renovacao_devida(self, entrada, agora):
+        return agora >= entrada['expira_em'] - self.antecedencia_renovacao
+
+    def _lock_chave(self, chave):
+        with self._lock:
+            lock = self._locks_chaves.get(chave)
+            if lock is None:
+                lock = self._locks_chaves[chave] = threading.Lock()
+            return lock
+
+    def _lock_chave_async(self, chave):
+        # asyncio.Lock pertence a um loop: um conjunto de locks por loop em execução
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            locks = self._locks_async.setdefault(loop, {})
+            lock = locks.get(chave)
+            if lock is None:
+                lock = locks[chave] = asyncio.Lock()
+            return lock
+
+    def _contar(self, evento):
+        with self._lock:
+            self.estatisticas[evento] += 1
+
+    # ------------------------------------------------------------------ #
+    # API
+    # ------------------------------------------------------------------ #
+    def obter(self, client_id, escopo, emitir):
+        """
+        Retorna um token válido, emitindo um novo só quando necessário
+
+        Args:
+            client_id: Client ID da aplicação
+            escopo: Escopo OAuth2 solicitado
+            emitir: Função sem argumentos que chama o endpoint de token e
+                retorna (access_token, expires_in) ou None em caso de falha
+
+        Returns:
+            access_token ou None se a emissão falhou
+        """
+        chave = (client_id, escopo)
+        with self._lock:
+            entrada = self._tokens.get(chave)
+
+        agora = time.time()
+        if self._valido(entrada, agora):
+            if not self._renovacao_devida(entrada, agora):
+                self._contar('reutilizados')
+                return entrada['token']
+
+            # Renovação proativa: só uma thread renova; as demais seguem com o token atual
+            lock = self._lock_chave(chave)
+            if not lock.acquire(blocking=False):
+                self._contar('reutilizados')
+                return entrada['token']
+            try:
+                self._contar('renovacoes_proativas')
+                nova = self._emitir_e_guardar(chave, emitir)
+                return (nova or entrada)['token']
+            finally:
+                lock.release()
+
+        # Sem token válido: a primeira thread emite, as demais aguardam o resultado
+        with self._lock_chave(chave):
+            with self._lock:
+                entrada = self._tokens.get(chave)
+            if self._valido(entrada, time.time()):
+                self._contar('reutilizados')
+                return entrada['token']
+            entrada = self._emitir_e_guardar(chave, emitir)
+            return entrada['token'] if entrada else None
+
+    async def obter_async(self, client_id, escopo, emitir):
+        """
+        Versão assíncrona de obter (emitir é uma corrotina sem argumentos)
+
+        Corrotinas que pedem o mesmo token aguardam uma única emissão, e a
+        renovação proativa não bloqueia as demais. O arquivo em disco é lido e
+        gravado em uma thread auxiliar; a trava entre processos não fica
+        retida enquanto a emissão aguarda a rede.
+        """
+        chave = (client_id, escopo)
+        with self._lock:
+            entrada = self._tokens.get(chave)
+
+        agora = time.time()
+        if self._valido(entrada, agora) and not self._renovacao_devida(entrada, agora):
+            self._contar('reutilizados')
+            return entrada['token']
+
+        lock = self._lock_chave_async(chave)
+        if self._valido(entrada, agora) and lock.locked():
+            # Renovação proativa já em andamento: seguir com o token atual
+            self._contar('reutilizados')
+            return entrada['token']
+
+        async with lock:
+            with self._lock:
+                entrada = self._tokens.get(chave)
+            agora = time.time()
+            if self._valido(entrada, agora):
+                if not self._renovacao_devida(entrada, agora):
+                    self._contar('reutilizados')
+                    return entrada['token']
+                self._contar('renovacoes_proativas')
+
+            if self.caminho:
+                do_disco = await asyncio.to_thread(self._adotar_do_disco, chave)
+                if do_disco:
+                    return do_disco['token']
+
+            nova = self._guardar(chave, await emitir())
+            if nova is None:
+                return entrada['token'] if self._valido(entrada, time.time()) else None
+            if self.caminho:
+                await asyncio.to_thread(self._gravar_entrada, chave, nova)
+            return nova['token']
+
+    def expiracao(self, client_id, escopo):
+        """Instante (epoch) até o qual o token em cache pode ser usado, ou None"""
+        with self._lock:
+            entrada = self._tokens.get((client_id, escopo))
+        return entrada['expira_em'] - self.margem_expiracao if entrada else None
+
+    def invalidar(self, client_id, escopo=None):
+        """Descarta o token (ex.: após um 401); escopo=None descarta todos do client_id"""
+        with self._lock:
+            for chave in [c for c in self._tokens if c[0] == client_id and escopo in (None, c[1])]:
+                del self._tokens[chave]
+        if self.caminho:
+            with _travar_arquivo(self.caminho + '.lock'):
+                tokens = self._ler_arquivo()
+                for chave in [c for c in tokens if c.split('|', 1)[0] == client_id
+                              and escopo in (None, c.split('|', 1)[1])]:
+                    del tokens[chave]
+                self._gravar_arquivo(tokens)
+
+    def limpar(self):
+        """Descarta todos os tokens (memória e disco)"""
+        with self._lock:
+            self._tokens.clear()
+        if self.caminho:
+            with _travar_arquivo(self.caminho + '.lock'):
+                self._gravar_arquivo({})
+
+    # ------------------------------------------------------------------ #
+    # Emissão e persistência
+    # ------------------------------------------------------------------ #
+    def _emitir_e_guardar(self, chave, emitir):
+        """Usa o token do disco (se outro processo já renovou) ou emite um novo"""
+        if not self.caminho:
+            return self._guardar(chave, emitir())
+
+        with _travar_arquivo(self.caminho + '.lock'):
+            entrada = self._adotar_do_disco(chave, travado=True)
+            if entrada:
+                return entrada
+
+            entrada = self._guardar(chave, emitir())
+            if entrada:
+                self._gravar_entrada(chave, entrada, travado=True)
+            return entrada
+
+    def _adotar_do_disco(self, chave, travado=False):
+        """Passa a usar o token do arquivo se ele ainda não precisa de renovação"""
+        with nullcontext() if travado else _travar_arquivo(self.caminho + '.lock'):
+            entrada = self._ler_arquivo().get('|'.join(chave))
+        agora = time.time()
+        if not self._valido(entrada, agora) or self._renovacao_devida(entrada, agora):
+            return None
+        with self._lock:
+            self._tokens[chave] = entrada
+        self._contar('lidos_disco')
+        return entrada
+
+    def _gravar_entrada(self, chave, entrada, travado=False):
+        with nullcontext() if travado else _travar_arquivo(self.caminho + '.lock'):
+            # Aproveitar a escrita para descartar tokens vencidos
+            agora = time.time()
+            tokens = {k: v for k, v in self._ler_arquivo().items() if v.get('expira_em', 0) > agora}
+            tokens['|'.join(chave)] = entrada
+            self._gravar_arquivo(tokens)
+
+    def _guardar(self, chave, resultado):
+        """Registra o resultado de emitir() ((token, expires_in) ou None) no cache em memória"""
+        if not resultado:
+            return None
+        token, expires_in = resultado
+        agora = time.time()
+        entrada = {'token': token, 'emitido_em': agora, 'expira_em': agora + float(expires_in)}
+        with self._lock:
+            self._tokens[chave] = entrada
+        self._contar('emitidos')
+        return entrada
+
+    def _ler_arquivo(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                tokens = json.load(f)
+            return tokens if isinstance(tokens, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _gravar_arquivo(self, tokens):
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(tokens, f)
+        try:
+            os.chmod(temporario, 0o600)  # Tokens são credenciais
+        except OSError:
+            pass
+        os.replace(temporario, self.caminho)
+
+
+_cache_padrao = None
+_lock_cache_padrao = threading.Lock()
+
+
+def obter_cache_tokens():
+    """Cache compartilhado pelo processo (persistido em ARQUIVO_CACHE, se definido)"""
+    global _cache_padrao
+    with _lock_cache_padrao:
+        if _cache_padrao is None:
+            _cache_padrao = CacheTokens(ARQUIVO_CACHE)
+        return _cache_padrao
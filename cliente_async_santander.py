@@ -0,0 +1,474 @@
+"""
+Cliente assíncrono (asyncio + httpx) da API Balance & Statement do Santander
+Mesma interface de SantanderExtratosBancarios - obter_token_acesso,
+listar_contas, buscar_saldo e buscar_transacoes - em corrotinas, para que um
+único loop mantenha centenas de requisições de página em andamento para
+todos os fundos ao mesmo tempo, sem uma thread por requisição.
+
+- Montagem das requisições e normalização das respostas são as mesmas do
+  cliente síncrono (funções de buscar_extratos_bancarios)
+- Tokens vêm do mesmo cache compartilhado (cache_tokens)
+- mTLS com o SSLContext de sessao_santander: um httpx.AsyncClient (pool
+  keep-alive) por certificado
+- MAX_REQUISICOES_ASYNC limita as requisições simultâneas do loop inteiro, e
+  o limitador de taxa do client_id (limitador_taxa) é o mesmo do cliente
+  síncrono, com as mesmas novas tentativas em 429/5xx/timeouts
+
+Uso:
+    async with SessoesAsync() as sessoes:
+        cliente = SantanderExtratosAsync("FUNDO", sessoes)
+        contas = await cliente.listar_contas()
+        transacoes = await cliente.buscar_transacoes(agencia, conta, data_inicial, data_final)
+
+    # Vários fundos de uma vez (fora de um loop):
+    resultados = buscar_extratos_async(["FUNDO1", "FUNDO2"], data_inicial, data_final)
+
+Requer httpx (pip install httpx).
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+import buscar_extratos_bancarios
+from buscar_extratos_bancarios import (
+    SantanderExtratosBancarios, ExtratoIncompletoError, BANK_ID, ESCOPO_EXTRATOS, MAX_PAGINAS,
+    TENTATIVAS_REQUISICAO, TENTATIVAS_JANELA, TENTATIVAS_CONTAS_COM_CACHE, TIMEOUT_CONTAS_COM_CACHE,
+    log, formatar_account_id, cabecalhos_api,
+    requisicao_token, interpretar_token, extrair_contas, total_paginas, ha_mais_paginas,
+    dividir_periodo, mesclar_janelas,
+)
+from cache_contas import obter_cache_contas
+from cache_paginas import obter_cache_paginas
+from cache_tokens import obter_cache_tokens
+from limitador_taxa import obter_limitador, executar_com_backoff_async
+from sessao_santander import criar_contexto_ssl
+
+MAX_REQUISICOES_ASYNC = 256   # Requisições simultâneas no loop (todos os fundos e páginas)
+MAX_CONEXOES_ASYNC = 100      # Conexões keep-alive por certificado
+TIMEOUT_ASYNC = 30            # Segundos por requisição
+
+
+class SessoesAsync:
+    """
+    httpx.AsyncClient por certificado e limite global de requisições simultâneas
+
+    Deve ser criada e usada dentro do mesmo loop (async with SessoesAsync() as sessoes).
+    """
+
+    def __init__(self, max_requisicoes=MAX_REQUISICOES_ASYNC, max_conexoes=MAX_CONEXOES_ASYNC):
+        if not HAS_HTTPX:
+            raise ImportError("httpx não instalado - necessário para o cliente assíncrono (pip install httpx)")
+        self.max_conexoes = max_conexoes
+        self.semaforo = asyncio.Semaphore(max(1, max_requisicoes))
+        self.requisicoes = 0
+        self._clientes = {}
+
+    def cliente(self, cert_path, key_path):
+        """AsyncClient do certificado (criado na primeira chamada)"""
+        chave = (os.path.abspath(cert_path), os.path.abspath(key_path))
+        cliente = self._clientes.get(chave)
+        if cliente is None:
+            cliente = self._clientes[chave] = httpx.AsyncClient(
+                verify=criar_contexto_ssl(cert_path, key_path),
+                limits=httpx.Limits(max_connections=self.max_conexoes,
+                                    max_keepalive_connections=self.max_conexoes),
+                timeout=TIMEOUT_ASYNC,
+            )
+        return cliente
+
+    async def requisicao(self, cert_path, key_path, metodo, url, **kwargs):
+        async with self.semaforo:
+            self.requisicoes += 1
+            return await self.cliente(cert_path, key_path).request(metodo, url, **kwargs)
+
+    async def fechar(self):
+        clientes = list(self._clientes.values())
+        self._clientes.clear()
+        for cliente in clientes:
+            await cliente.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.fechar()
+
+
+class SantanderExtratosAsync:
+    """Versão assíncrona de SantanderExtratosBancarios (mesmos métodos, em corrotinas)"""
+
+    def __init__(self, fundo_id, sessoes):
+        """
+        Args:
+            fundo_id: Fundo configurado em SANTANDER_FUNDOS
+            sessoes: SessoesAsync compartilhada pelos clientes do loop
+        """
+        # Credenciais, contas conhecidas e exportação (Excel/PDF) do cliente síncrono
+        self.sincrono = SantanderExtratosBancarios(fundo_id)
+        self.fundo_id = fundo_id
+        self.fundo_nome = self.sincrono.fundo_nome
+        self.client_id = self.sincrono.client_id
+        self.client_secret = self.sincrono.client_secret
+        self.cnpj = self.sincrono.cnpj
+        self.cert_path = self.sincrono.cert_path
+        self.key_path = self.sincrono.key_path
+        self.sessoes = sessoes
+        self.token = None
+
+    async def _requisicao(self, metodo, url, descricao, tentativas=TENTATIVAS_REQUISICAO, **kwargs):
+        """Requisição limitada pela taxa do client_id, com novas tentativas em 429/5xx/timeouts"""
+        return await executar_com_backoff_async(
+            obter_limitador(self.client_id),
+            lambda: self.sessoes.requisicao(self.cert_path, self.key_path, metodo, url, **kwargs),
+            descricao,
+            tentativas=tentativas,
+            excecoes=(httpx.TransportError,),
+            log=log
+        )
+
+    # ------------------------------------------------------------------ #
+    # Token
+    # ------------------------------------------------------------------ #
+    async def obter_token_acesso(self):
+        """Token OAuth2 do cache compartilhado (uma emissão por client_id, mesmo com várias corrotinas)"""
+        self.token = await obter_cache_tokens().obter_async(self.client_id, ESCOPO_EXTRATOS, self._emitir_token)
+        return self.token
+
+    def invalidar_token(self):
+        """Descarta o token do cache compartilhado (ex.: após resposta 401)"""
+        obter_cache_tokens().invalidar(self.client_id, ESCOPO_EXTRATOS)
+        self.token = None
+
+    async def _emitir_token(self):
+        """
+        Chama o endpoint de token
+
+        Returns:
+            Tupla (access_token, expires_in) ou None em caso de erro
+        """
+        log(f"\n🔑 Obtendo token OAuth2 (async) para fundo {self.fundo_id}...")
+        url = f"{buscar_extratos_bancarios.API_BASE_URL}/auth/oauth/v2/token"
+        headers, data = requisicao_token(self.client_id, self.client_secret)
+
+        try:
+            response = await self._requisicao("POST", url, "Token", headers=headers, data=data)
+            if response.status_code == 200:
+                return interpretar_token(response.json())
+            log(f"❌ Erro ao obter token: {response.status_code}", nivel=logging.ERROR)
+            log("   Resposta: %.500s", response.text, nivel=logging.ERROR)
+            return None
+        except Exception as e:
+            log(f"❌ Exceção ao obter token: {e}", nivel=logging.ERROR)
+            return None
+
+    # ------------------------------------------------------------------ #
+    # Contas e saldo
+    # ------------------------------------------------------------------ #
+    async def listar_contas(self, usar_cache=True):
+        """Lista todas as contas bancárias do fundo (mesmo cache e fallbacks do cliente síncrono)"""
+        cache = obter_cache_contas()
+        if usar_cache:
+            contas = cache.obter(self.fundo_id, self.client_id)
+            if contas:
+                log(f"\n🏦 {len(contas)} conta(s) do fundo {self.fundo_id} em cache (sem consultar /accounts)")
+                return contas
+
+        if cache.idade(self.fundo_id) is not None:
+            contas = await self._consultar_contas(TENTATIVAS_CONTAS_COM_CACHE, TIMEOUT_CONTAS_COM_CACHE)
+        else:
+            contas = await self._consultar_contas()
+        if contas:
+            cache.gravar(self.fundo_id, self.client_id, contas)
+            return contas
+
+        contas = cache.obter(self.fundo_id, self.client_id, aceitar_vencida=True)
+        if contas:
+            log(f"   ♻️ Usando {len(contas)} conta(s) do cache (vencido)", nivel=logging.WARNING)
+            return contas
+
+        contas = self.sincrono.obter_contas_conhecidas()
+        if contas:
+            log(f"   ✅ Usando {len(contas)} conta(s) conhecida(s)")
+        return contas
+
+    async def _consultar_contas(self, tentativas=TENTATIVAS_REQUISICAO, timeout=TIMEOUT_ASYNC):
+        """Consulta /accounts; lista de contas (pode ser vazia) ou None se a consulta falhou"""
+        token = await self.obter_token_acesso()
+        if not token:
+            return None
+
+        log(f"\n🏦 Listando contas bancárias do fundo {self.fundo_id}...")
+        url = f"{buscar_extratos_bancarios.API_BASE_URL}/bank_account_information/v1/banks/{BANK_ID}/accounts"
+        params = {"_offset": "1", "_limit": "50"}
+
+        try:
+            response = await self._requisicao("GET", url, "Listagem de contas", tentativas=tentativas,
+                                              timeout=timeout, headers=cabecalhos_api(token, self.client_id),
+                                              params=params)
+            if response.status_code == 200:
+                return extrair_contas(response.json())
+
+            log(f"❌ Erro ao listar contas: {response.status_code}", nivel=logging.ERROR)
+            log("   Resposta completa: %s", response.text, nivel=logging.ERROR)
+            if response.status_code == 401:
+                self.invalidar_token()
+            return None
+        except Exception as e:
+            log(f"❌ Exceção ao listar contas: {e}", nivel=logging.ERROR)
+            return None
+
+    async def buscar_saldo(self, branch_code, account_number):
+        """
+        Busca saldo de uma conta específica
+
+        Returns:
+            Dicionário com informações de saldo ou None
+        """
+        token = await self.obter_token_acesso()
+        if not token:
+            return None
+
+        account_id = formatar_account_id(branch_code, account_number)
+        url = f"{buscar_extratos_bancarios.API_BASE_URL}/bank_account_information/v1/banks/{BANK_ID}/balances/{account_id}"
+
+        try:
+            response = await self._requisicao("GET", url, f"Saldo {branch_code}.{account_number}",
+                                              headers=cabecalhos_api(token, self.client_id))
+            if response.status_code == 200:
+                saldo_data = response.json()
+                log(f"✅ Saldo {branch_code}.{account_number}: R$ {float(saldo_data.get('availableAmount', 0)):,.2f}")
+                return saldo_data
+
+            log(f"❌ Erro ao buscar saldo: {response.status_code}", nivel=logging.ERROR)
+            log("   Resposta: %.500s", response.text, nivel=logging.ERROR)
+            if response.status_code == 401:
+                self.invalidar_token()
+            return None
+        except Exception as e:
+            log(f"❌ Exceção ao buscar saldo: {e}", nivel=logging.ERROR)
+            return None
+
+    # ------------------------------------------------------------------ #
+    # Transações
+    # ------------------------------------------------------------------ #
+    async def _buscar_pagina(self, url, headers, params_base, pagina, limite):
+        """
+        Busca UMA página de transações, com novas tentativas isoladas
+
+        Returns:
+            Dicionário com a resposta da API ou None se a página falhou
+        """
+        params = dict(params_base)
+        params["_limit"] = str(limite)
+        params["_offset"] = str(pagina)  # Offset como número de página
+
+        # Mesmo cache em disco (opcional) do cliente síncrono
+        cache = obter_cache_paginas()
+        chave_cache = None
+        if cache is not None and cache.cacheavel(params_base.get("finalDate")):
+            chave_cache = (url, params_base.get("initialDate", ""), params_base["finalDate"], limite, pagina)
+            data = cache.obter(chave_cache)
+            if data is not None:
+                return data
+
+        try:
+            response = await self._requisicao("GET", url, f"Página {pagina}", headers=headers, params=params)
+            if response.status_code == 200:
+                data = response.json()
+                if chave_cache is not None:
+                    cache.gravar(chave_cache, data)
+                return data
+
+            log(f"❌ Erro ao buscar transações (página {pagina}): {response.status_code}", nivel=logging.ERROR)
+            if response.status_code == 401:
+                self.invalidar_token()
+        except Exception as e:
+            log(f"❌ Exceção ao buscar página {pagina}: {e}", nivel=logging.ERROR)
+
+        return None
+
+    async def buscar_transacoes(self, branch_code, account_number, data_inicial=None, data_final=None,
+                                limite=1000, janela=None):
+        """
+        Busca TODAS as transações (extrato) de uma conta
+
+        Com totalPages conhecido na página 1, as demais páginas são pedidas
+        todas de uma vez (limitadas por MAX_REQUISICOES_ASYNC); sem ele, a
+        paginação segue página a página, como no cliente síncrono.
+
+        Args:
+            branch_code: Código da agência
+            account_number: Número da conta
+            data_inicial: Data inicial (datetime ou None para 7 dias atrás)
+            data_final: Data final (datetime ou None para hoje)
+            limite: Número de transações por página (padrão 1000)
+            janela: Divide o período em janelas (JANELA_SEMANA, JANELA_MES ou
+                nº de dias) buscadas simultaneamente
+
+        Returns:
+            Lista de transações (vazia se o período não tem transações)
+
+        Raises:
+            ExtratoIncompletoError: alguma página ou janela falhou mesmo após
+                as novas tentativas
+        """
+        transacoes, completo = await self._buscar_transacoes_periodo(
+            branch_code, account_number, data_inicial, data_final, limite, janela
+        )
+        if not completo:
+            raise ExtratoIncompletoError(
+                f"Extrato incompleto da conta {branch_code}.{account_number}: "
+                f"{len(transacoes)} transação(ões) recebida(s) antes da falha",
+                transacoes
+            )
+        return transacoes
+
+    async def _buscar_transacoes_periodo(self, branch_code, account_number, data_inicial, data_final,
+                                         limite, janela=None):
+        """
+        Implementação de buscar_transacoes que também informa se a busca foi completa
+
+        Returns:
+            Tupla (transações, completo)
+        """
+        token = await self.obter_token_acesso()
+        if not token:
+            return [], False
+
+        if not data_final:
+            data_final = datetime.now()
+        if not data_inicial:
+            data_inicial = data_final - timedelta(days=7)
+
+        if janela:
+            janelas = dividir_periodo(data_inicial, data_final, janela)
+            if len(janelas) > 1:
+                resultados = await asyncio.gather(*(
+                    self._buscar_janela(branch_code, account_number, inicio, fim, limite)
+                    for inicio, fim in janelas
+                ))
+                return mesclar_janelas(janelas, resultados)
+
+        log(f"\n📊 Buscando transações da conta {branch_code}.{account_number} "
+            f"({data_inicial.strftime('%d/%m/%Y')} a {data_final.strftime('%d/%m/%Y')})...")
+
+        account_id = formatar_account_id(branch_code, account_number)
+        url = f"{buscar_extratos_bancarios.API_BASE_URL}/bank_account_information/v1/banks/{BANK_ID}/statements/{account_id}"
+        headers = cabecalhos_api(token, self.client_id)
+        params_base = {
+            "initialDate": data_inicial.strftime("%Y-%m-%d"),
+            "finalDate": data_final.strftime("%Y-%m-%d"),
+        }
+
+        data = await self._buscar_pagina(url, headers, params_base, 1, limite)
+        if data is None:
+            log(f"❌ Página 1 falhou após {TENTATIVAS_REQUISICAO} tentativas", nivel=logging.ERROR)
+            return [], False
+
+        transacoes = list(data.get("_content", []))
+        if not transacoes:
+            return [], True
+
+        total_pages_num = total_paginas(data)
+        if total_pages_num > 1:
+            if total_pages_num > MAX_PAGINAS:
+                log(f"   ⚠️ Limite de segurança atingido ({MAX_PAGINAS} páginas / ~500k transações)", nivel=logging.WARNING)
+            paginas = range(2, min(total_pages_num, MAX_PAGINAS) + 1)
+            conteudos = await asyncio.gather(*(
+                self._buscar_pagina(url, headers, params_base, pagina, limite) for pagina in paginas
+            ))
+            for pagina, dados in zip(paginas, conteudos):
+                if dados is None:
+                    log(f"❌ Página {pagina} falhou após {TENTATIVAS_REQUISICAO} tentativas - resultado truncado na página {pagina - 1}", nivel=logging.ERROR)
+                    return transacoes, False
+                transacoes.extend(dados.get("_content", []))
+            log(f"✅ Total de {len(transacoes)} transação(ões) encontrada(s)")
+            return transacoes, total_pages_num <= MAX_PAGINAS
+
+        # Sem totalPages: página a página
+        pagina = 1
+        while ha_mais_paginas(data, pagina, limite):
+            pagina += 1
+            if pagina > MAX_PAGINAS:
+                log(f"   ⚠️ Limite de segurança atingido ({MAX_PAGINAS} páginas / ~500k transações)", nivel=logging.WARNING)
+                return transacoes, False
+            data = await self._buscar_pagina(url, headers, params_base, pagina, limite)
+            if data is None:
+                log(f"❌ Página {pagina} falhou após {TENTATIVAS_REQUISICAO} tentativas", nivel=logging.ERROR)
+                return transacoes, False
+            conteudo = data.get("_content", [])
+            if not conteudo:
+                break
+            transacoes.extend(conteudo)
+
+        log(f"✅ Total de {len(transacoes)} transação(ões) encontrada(s)")
+        return transacoes, True
+
+    async def _buscar_janela(self, branch_code, account_number, inicio, fim, limite):
+        """Busca uma janela do período, refazendo apenas ela se vier incompleta"""
+        for tentativa in range(1, TENTATIVAS_JANELA + 1):
+            transacoes, completo = await self._buscar_transacoes_periodo(
+                branch_code, account_number, inicio, fim, limite
+            )
+            if completo:
+                return transacoes, True
+
+            log(f"⚠️ Janela {inicio.strftime('%d/%m/%Y')} a {fim.strftime('%d/%m/%Y')} incompleta "
+                f"(tentativa {tentativa}/{TENTATIVAS_JANELA})", nivel=logging.WARNING)
+            if tentativa < TENTATIVAS_JANELA:
+                await asyncio.sleep(tentativa)
+
+        return transacoes, False
+
+
+async def buscar_fundos(fundos, data_inicial=None, data_final=None, limite=1000, janela=None,
+                        max_requisicoes=MAX_REQUISICOES_ASYNC):
+    """
+    Busca contas, saldos e transações de vários fundos em um único loop
+
+    Todos os fundos, contas e páginas ficam em andamento ao mesmo tempo,
+    limitados apenas por max_requisicoes.
+
+    Returns:
+        Dicionário fundo_id -> {'contas': [...], 'erro': None ou mensagem}; cada
+        conta é {'agencia', 'conta', 'saldo', 'transacoes', 'completo'}
+    """
+    async with SessoesAsync(max_requisicoes) as sessoes:
+
+        async def processar_conta(cliente, conta):
+            branch_code = conta.get('branchCode') or conta.get('agencyCode')
+            account_number = conta.get('number') or conta.get('accountNumber')
+            saldo, (transacoes, completo) = await asyncio.gather(
+                cliente.buscar_saldo(branch_code, account_number),
+                cliente._buscar_transacoes_periodo(branch_code, account_number, data_inicial, data_final,
+                                                   limite, janela),
+            )
+            return {'agencia': branch_code, 'conta': account_number, 'saldo': saldo,
+                    'transacoes': transacoes, 'completo': completo}
+
+        async def processar_fundo(fundo_id):
+            cliente = SantanderExtratosAsync(fundo_id, sessoes)
+            contas = await cliente.listar_contas()
+            return await asyncio.gather(*(processar_conta(cliente, conta) for conta in contas))
+
+        resultados = await asyncio.gather(*(processar_fundo(fundo_id) for fundo_id in fundos),
+                                          return_exceptions=True)
+
+    return {
+        fundo_id: ({'contas': [], 'erro': str(resultado)} if isinstance(resultado, Exception)
+                   else {'contas': list(resultado), 'erro': None})
+        for fundo_id, resultado in zip(fundos, resultados)
+    }
+
+
+def buscar_extratos_async(fundos, data_inicial=None, data_final=None, **kwargs):
+    """Executa buscar_fundos em um novo loop (para chamar a partir de código síncrono)"""
+    return asyncio.run(buscar_fundos(fundos, data_inicial, data_final, **kwargs))
@@ -14,6 +14,7 @@ try:
         from config_credentials import SANTANDER_FUNDOS
     
     from buscar_extratos_bancarios import SantanderExtratosBancarios
+    from motor_extrato import calcular_extrato
     print("✅ Módulos importados\n")
 except ImportError as e:
     print(f"❌ Erro: {e}")
@@ -491,20 +492,10 @@ try:
         account_number="000130107983"
     )
     
-    # Ordenar transações
-    def extrair_data_ordenacao(trans):
-        data = trans.get('transactionDate', '')
-        if data and len(data) >= 10:
-            try:
-                return datetime.strptime(data[:10], '%d/%m/%Y')
-            except:
-                try:
-                    return datetime.strptime(data[:10], '%Y-%m-%d')
-                except:
-                    return datetime(9999, 12, 31)
-        return datetime(9999, 12, 31)
-    
-    transacoes_ordenadas = sorted(transacoes, key=extrair_data_ordenacao)
+    # Ordenar transações e aplicar sinais (crédito positivo, débito negativo)
+    extrato = calcular_extrato(transacoes, float(saldo_info.get('availableAmount', 0)))
+    transacoes_ordenadas = extrato.transacoes
+    valores_api = extrato.valores.tolist()
     
     print(f"✅ API: {len(transacoes_ordenadas)} transações")
     print(f"✅ Santander: {len(extrato_santander)} transações\n")
@@ -522,14 +513,7 @@ try:
             trans_api = transacoes_ordenadas[i - 1]
             data_api = trans_api.get('transactionDate', '')
             hist_api = trans_api.get('transactionName', '')
-            valor_api_raw = float(trans_api.get('amount', 0))
-            tipo_api = trans_api.get('creditDebitType', '')
-            
-            # Aplicar sinal
-            if tipo_api == 'DEBITO':
-                valor_api = -abs(valor_api_raw)
-            else:
-                valor_api = abs(valor_api_raw)
+            valor_api = valores_api[i - 1]
             
             # Verificar match
             match_data = data_api == data_sant
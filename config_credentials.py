@@ -1,19 +1,41 @@
 """
 Configuração de credenciais para Streamlit Cloud
 Usa st.secrets quando disponível, caso contrário carrega do arquivo local
+
+Importar este módulo é barato: streamlit só é importado e os secrets só são
+lidos no primeiro acesso a SANTANDER_FUNDOS (uma vez por processo, inclusive
+entre reruns do Streamlit), e os PEMs só são regravados quando mudam.
 """
 
 import os
+from collections.abc import MutableMapping
 from pathlib import Path
 import tempfile
+import threading
 
-# Tentar importar streamlit para usar secrets
-try:
-    import streamlit as st
-    HAS_STREAMLIT = True
-except ImportError:
-    HAS_STREAMLIT = False
-    st = None
+_STREAMLIT = []  # [módulo streamlit ou None] após a primeira tentativa de import
+
+
+def _obter_streamlit():
+    """Módulo streamlit (importado na primeira chamada) ou None se não instalado"""
+    if not _STREAMLIT:
+        try:
+            import streamlit as st
+        except ImportError:
+            st = None
+        _STREAMLIT.append(st)
+    return _STREAMLIT[0]
+
+
+def _gravar_se_mudou(caminho, conteudo):
+    """Grava o arquivo apenas se o conteúdo for diferente do atual; retorna True se gravou"""
+    try:
+        if caminho.read_text() == conteudo:
+            return False
+    except OSError:
+        pass
+    caminho.write_text(conteudo)
+    return True
 
 
 def get_fundos_config():
@@ -22,7 +44,8 @@ def get_fundos_config():
     Prioridade: Streamlit Secrets > Arquivo Local
     """
     # Se estiver no Streamlit Cloud, usar secrets
-    if HAS_STREAMLIT and hasattr(st, 'secrets'):
+    st = _obter_streamlit()
+    if st is not None and hasattr(st, 'secrets'):
         try:
             # Verificar se secrets estão configurados
             if "santander_fundos" not in st.secrets:
@@ -40,12 +63,11 @@ def get_fundos_config():
             cert_content = st.secrets["santander_fundos"]["cert_pem"].replace("\\n", "\n")
             key_content = st.secrets["santander_fundos"]["key_pem"].replace("\\n", "\n")
             
-            cert_path.write_text(cert_content)
-            key_path.write_text(key_content)
-            
-            # Verificar se arquivos foram criados
-            print(f"📄 Certificado salvo: {cert_path} ({cert_path.stat().st_size} bytes)")
-            print(f"🔑 Chave privada salva: {key_path} ({key_path.stat().st_size} bytes)")
+            # Regravar só se o conteúdo mudou (evita escrita a cada processo/rerun)
+            if _gravar_se_mudou(cert_path, cert_content):
+                print(f"📄 Certificado salvo: {cert_path} ({cert_path.stat().st_size} bytes)")
+            if _gravar_se_mudou(key_path, key_content):
+                print(f"🔑 Chave privada salva: {key_path} ({key_path.stat().st_size} bytes)")
             
             # Construir dicionário de fundos a partir dos secrets
             fundos = {}
@@ -85,7 +107,8 @@ def get_pipefy_token():
     Retorna token do Pipefy.
     Prioridade: Streamlit Secrets > Variável de Ambiente
     """
-    if HAS_STREAMLIT and hasattr(st, 'secrets'):
+    st = _obter_streamlit()
+    if st is not None and hasattr(st, 'secrets'):
         try:
             return st.secrets.get("pipefy", {}).get("api_token", "")
         except:
@@ -94,23 +117,78 @@ def get_pipefy_token():
     return os.getenv("PIPEFY_API_TOKEN", "")
 
 
-# Exportar configurações
-SANTANDER_FUNDOS = get_fundos_config()
-PIPEFY_API_TOKEN = get_pipefy_token()
+class FundosConfigurados(MutableMapping):
+    """
+    Dicionário de fundos carregado sob demanda
+    
+    get_fundos_config() roda no primeiro acesso (chaves, itens, len...) e o
+    resultado fica memorizado; se falhar (sem credenciais), a exceção é
+    levantada no acesso e a próxima tentativa carrega de novo.
+    """
+    
+    def __init__(self, carregar=get_fundos_config):
+        self._carregar = carregar
+        self._fundos = None
+        self._lock = threading.Lock()
+    
+    def _dados(self):
+        if self._fundos is None:
+            with self._lock:
+                if self._fundos is None:
+                    self._fundos = self._carregar()
+        return self._fundos
+    
+    def recarregar(self):
+        """Descarta a configuração memorizada (o próximo acesso relê os secrets)"""
+        with self._lock:
+            self._fundos = None
+    
+    def __getitem__(self, fundo_id):
+        return self._dados()[fundo_id]
+    
+    def __setitem__(self, fundo_id, config):
+        self._dados()[fundo_id] = config
+    
+    def __delitem__(self, fundo_id):
+        del self._dados()[fundo_id]
+    
+    def __iter__(self):
+        return iter(self._dados())
+    
+    def __len__(self):
+        return len(self._dados())
+    
+    def __repr__(self):
+        if self._fundos is None:
+            return "FundosConfigurados(<não carregado>)"
+        return f"FundosConfigurados({list(self._fundos)})"
+
+
+# Exportar configurações (carregadas no primeiro acesso)
+SANTANDER_FUNDOS = FundosConfigurados()
+
+
+def __getattr__(nome):
+    """PIPEFY_API_TOKEN resolvido apenas quando usado"""
+    if nome == "PIPEFY_API_TOKEN":
+        token = get_pipefy_token()
+        globals()["PIPEFY_API_TOKEN"] = token
+        return token
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 # Importar classe de autenticação se disponível
 try:
     from credenciais_bancos import SantanderAuth
 except ImportError:
     # Criar versão simplificada se não existir
-    import requests
+    # (requests e cache_tokens são importados na primeira emissão de token)
     import base64
     from datetime import datetime, timedelta
     
     class SantanderAuth:
         """Classe de autenticação OAuth2 para Santander"""
         
-        TOKEN_URL = "https://trust-open.api.santander.com.br/auth/oauth/v2/token"
+        TOKEN_URL = os.environ.get("SANTANDER_API_BASE_URL", "https://trust-open.api.santander.com.br").rstrip("/") + "/auth/oauth/v2/token"
         SCOPES = {
             "comprovantes": "open_banking_payment_receipts",
             "extratos": "open_banking_balances_statement"
@@ -156,10 +234,17 @@ except ImportError:
             return datetime.now() < self.token_expiry
         
         def obter_token(self) -> str:
-            """Obtém ou renova o token OAuth2"""
-            if self._is_token_valid():
-                return self.token
-            
+            """Obtém ou renova o token OAuth2 (cache compartilhado por client_id + escopo)"""
+            from cache_tokens import obter_cache_tokens
+            cache = obter_cache_tokens()
+            self.token = cache.obter(self.client_id, self.scope, self._emitir_token)
+            expira_em = cache.expiracao(self.client_id, self.scope)
+            self.token_expiry = datetime.fromtimestamp(expira_em) if expira_em else None
+            return self.token
+        
+        def _emitir_token(self):
+            """Chama o endpoint de token; retorna (access_token, expires_in)"""
+            import requests
             payload = {
                 "grant_type": "client_credentials",
                 "scope": self.scope
@@ -191,8 +276,4 @@ except ImportError:
             response.raise_for_status()
             data = response.json()
             
-            self.token = data["access_token"]
-            expires_in = data.get("expires_in", 900)
-            self.token_expiry = datetime.now() + timedelta(seconds=expires_in - 60)
-            
-            return self.token
+            return data["access_token"], data.get("expires_in", 900)
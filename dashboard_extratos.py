@@ -7,7 +7,10 @@ Bancos suportados: Santander (Itaú e Arbi em desenvolvimento)
 import streamlit as st
 from datetime import datetime, timedelta
 import os
+import shutil
 import sys
+import tempfile
+import time
 
 # Adicionar diretório ao path para imports
 sys.path.insert(0, os.path.dirname(__file__))
@@ -348,12 +351,18 @@ try:
         # Fallback para credenciais locais
         from credenciais_bancos import SANTANDER_FUNDOS
     
-    from buscar_extratos_bancarios import SantanderExtratosBancarios, main
+    from buscar_extratos_bancarios import SantanderExtratosBancarios, main, JANELA_MES
     import buscar_extratos_bancarios
+    from executor_jobs import GerenciadorJobs, ESTADOS_FINAIS, ERRO, TEMPO_RETENCAO
+    from diario_execucao import diario_pendente, identificador_execucao
     # Desabilitar logs verbosos
     buscar_extratos_bancarios.VERBOSE = False
+    
+    # Lista de fundos disponíveis (primeiro acesso carrega as credenciais,
+    # memorizadas no processo entre reruns)
+    fundos_disponiveis = sorted(SANTANDER_FUNDOS)
     HAS_CREDENCIAIS = True
-except ImportError as e:
+except Exception as e:
     HAS_CREDENCIAIS = False
     st.markdown(f"""
     <div style="background: linear-gradient(135deg, #ffebee 0%, #ffcdd2 100%); padding: 1.5rem; border-radius: 12px; border-left: 4px solid #f44336; margin: 1rem 0;">
@@ -373,9 +382,6 @@ except ImportError as e:
     """, unsafe_allow_html=True)
     st.stop()
 
-# Lista de fundos disponíveis
-fundos_disponiveis = sorted(list(SANTANDER_FUNDOS.keys()))
-
 st.markdown("---")
 
 # ========== SEÇÃO 1: SELEÇÃO DE FUNDOS ==========
@@ -498,6 +504,11 @@ with col1:
     """, unsafe_allow_html=True)
     st.markdown("<br>", unsafe_allow_html=True)
     gerar_pdf = st.checkbox("📑 Gerar também PDF (.pdf)", value=True, help="Gera arquivo PDF no formato Internet Banking Empresarial")
+    pdf_paginado = gerar_pdf and st.checkbox(
+        "📚 PDF paginado para extratos longos", value=False,
+        help="Extratos com mais de 1000 lançamentos saem em blocos por página, com saldo transportado "
+             "(geração bem mais rápida). Desmarcado: tabela única, igual ao IBE"
+    )
 
 with col2:
     formatos_str = ["Excel"]
@@ -512,15 +523,100 @@ with col2:
 
 st.markdown("<br><br>", unsafe_allow_html=True)
 
+# ========== EXECUÇÃO EM SEGUNDO PLANO ==========
+INTERVALO_ATUALIZACAO = 1.0  # Segundos entre atualizações do progresso
+DIAS_BUSCA_POR_JANELAS = 62  # Períodos mais longos são buscados mês a mês, em paralelo
+
+# Pasta base das saídas: cada job grava em uma subpasta própria, nomeada pelos
+# parâmetros da execução - a mesma pasta (e o mesmo diário) depois de uma queda
+PASTA_SAIDAS = os.environ.get("SANTANDER_SAIDAS_DASHBOARD",
+                              os.path.join(tempfile.gettempdir(), "extratos_santander"))
+
+
+@st.cache_resource
+def obter_gerenciador_jobs():
+    """Gerenciador único por processo: os jobs sobrevivem a reruns e a recarregar a página"""
+    # Pastas de execuções interrompidas são mantidas para a retomada
+    return GerenciadorJobs(reter_pasta=diario_pendente)
+
+
+def limpar_saidas_orfas(gerenciador):
+    """
+    Apaga pastas de saída que nenhum job conhece (ex.: servidor reiniciado)
+
+    Mantém as pastas de jobs ativos, as usadas por um diário pendente e as
+    alteradas há menos de TEMPO_RETENCAO segundos.
+    """
+    em_uso = {job['pasta'] for job in gerenciador.listar()}
+    limite = time.time() - TEMPO_RETENCAO
+    try:
+        entradas = list(os.scandir(PASTA_SAIDAS))
+    except OSError:
+        return
+    for entrada in entradas:
+        if not (entrada.name.startswith("job_") and entrada.is_dir()) or entrada.path in em_uso:
+            continue
+        try:
+            if entrada.stat().st_mtime >= limite or diario_pendente(entrada.path):
+                continue
+        except OSError:
+            continue
+        shutil.rmtree(entrada.path, ignore_errors=True)
+
+
+def gerar_extratos_em_segundo_plano(progresso, fundos, data_inicial, data_final, pasta_saida, gerar_pdf,
+                                    pdf_paginado=False):
+    """Executa a busca em uma thread do executor de jobs (resultado inclui o manifesto 'artefatos')"""
+    modo_pdf = None  # Tabela única (layout original)
+    if pdf_paginado:
+        from renderizador_pdf import MODO_PDF_AUTO
+        modo_pdf = MODO_PDF_AUTO
+    # Chamar função main com lista de fundos e objetos datetime
+    return main(
+        fundos=fundos,
+        data_inicial=data_inicial,
+        data_final=data_final,
+        pasta_saida=pasta_saida,
+        gerar_pdf=gerar_pdf,
+        paralelo=True,  # Fundos e contas processados simultaneamente
+        incremental=True,  # Reaproveita dias já baixados (armazém local)
+        retomar=True,  # Execução interrompida (queda do app) continua de onde parou
+        progresso=progresso,  # Eventos reais por fundo/conta
+        # Ex.: "Últimos 2 anos" vira 25 consultas mensais em vez de uma paginação profunda
+        janela_busca=JANELA_MES if (data_final - data_inicial).days > DIAS_BUSCA_POR_JANELAS else None,
+        modo_pdf=modo_pdf
+    )
+
+
+@st.fragment(run_every=INTERVALO_ATUALIZACAO)
+def acompanhar_job(job_id):
+    """Mostra o progresso do job em andamento (reexecutado a cada INTERVALO_ATUALIZACAO)"""
+    job = obter_gerenciador_jobs().obter(job_id)
+    if job is None or job['estado'] in ESTADOS_FINAIS:
+        # Recarregar a página inteira para exibir o resultado
+        st.rerun()
+    
+    st.progress(job['progresso'])
+    st.info(job['mensagem'])
+    st.caption(
+        f"🆔 Execução {job_id} • "
+        f"{job['fundos_concluidos']}/{job['fundos_total']} fundo(s) • "
+        f"{job['contas_concluidas']}/{job['contas_total']} conta(s) concluída(s)"
+    )
+
+
 # ========== BOTÃO DE GERAÇÃO ==========
 buscar_disabled = (
     len(fundos_selecionados) == 0 or
     data_inicial > data_final
 )
 
-# Inicializar session_state para controlar execução
-if 'processando' not in st.session_state:
-    st.session_state.processando = False
+gerenciador_jobs = obter_gerenciador_jobs()
+
+# Job atual: da sessão ou da URL (?job=...), para reencontrar a execução após recarregar a página
+job_id = st.session_state.get('job_id') or st.query_params.get('job')
+job = gerenciador_jobs.obter(job_id) if job_id else None
+job_em_andamento = job is not None and job['estado'] not in ESTADOS_FINAIS
 
 # Container destacado para o botão
 st.markdown("""
@@ -532,132 +628,79 @@ st.markdown("""
 """, unsafe_allow_html=True)
 st.markdown("<br>", unsafe_allow_html=True)
 
-if st.button("▶️ Gerar Extratos", disabled=buscar_disabled or st.session_state.processando, use_container_width=True, key="btn_gerar"):
-    # Marcar como processando para evitar cliques duplos
-    st.session_state.processando = True
-    
-    # 🧹 LIMPEZA: Remover arquivos antigos da pasta de saída (silencioso)
-    pasta_saida = os.getcwd()
-    
-    arquivos_antigos = []
-    for arquivo in os.listdir(pasta_saida):
-        if arquivo.startswith('exportar-Santander') or arquivo.startswith('comprovante-ibe'):
-            caminho_completo = os.path.join(pasta_saida, arquivo)
-            try:
-                os.remove(caminho_completo)
-                arquivos_antigos.append(arquivo)
-            except:
-                pass  # Silenciar erros de remoção
-    
-    # Barra de progresso e status
-    progress_container = st.container()
-    with progress_container:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-    
+if st.button("▶️ Gerar Extratos", disabled=buscar_disabled or job_em_andamento, use_container_width=True, key="btn_gerar"):
     # Preparar parâmetros - converter date para datetime
-    from datetime import datetime as dt
-    data_inicial_dt = dt.combine(data_inicial, dt.min.time())
-    data_final_dt = dt.combine(data_final, dt.max.time())
-    
-    # Atualizar status inicial
-    status_text.info(f"🔄 Iniciando busca de extratos para {len(fundos_selecionados)} fundo(s)...")
-    progress_bar.progress(0.1)
-    
-    # Capturar stdout para silenciar logs técnicos
-    import sys
-    from io import StringIO
-    
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()  # Redirecionar para silenciar
-    
-    arquivos_gerados = []
-    
-    # Marcar timestamp de início
-    from datetime import datetime, timedelta
-    timestamp_inicio = datetime.now() - timedelta(minutes=15)
+    data_inicial_dt = datetime.combine(data_inicial, datetime.min.time())
+    data_final_dt = datetime.combine(data_final, datetime.max.time())
+    parametros = {
+        'fundos': list(fundos_selecionados),
+        'data_inicial': data_inicial_dt,
+        'data_final': data_final_dt,
+        'gerar_pdf': gerar_pdf,
+        'pdf_paginado': bool(pdf_paginado),
+    }
+    
+    # Pasta do job nomeada pelos parâmetros: execuções diferentes não sobrescrevem
+    # nem apagam os arquivos umas das outras (e o ZIP lê daqui), e repetir uma
+    # execução interrompida reencontra a pasta e o diário dela. Nada é apagado
+    # antes: a retomada pula as contas cujos arquivos ainda estão aqui
+    limpar_saidas_orfas(gerenciador_jobs)
+    pasta_saida = os.path.join(PASTA_SAIDAS, f"job_{identificador_execucao(parametros)}")
+    os.makedirs(pasta_saida, exist_ok=True)
+    
+    # Enfileirar a execução em segundo plano (a página não fica bloqueada);
+    # com os mesmos parâmetros de um job em andamento, acompanha o existente
+    job_id = gerenciador_jobs.submeter(
+        gerar_extratos_em_segundo_plano,
+        descricao=f"{len(fundos_selecionados)} fundo(s) | {data_inicial.strftime('%d/%m/%Y')} a {data_final.strftime('%d/%m/%Y')}",
+        parametros=dict(parametros, pasta_saida=pasta_saida),
+        pasta=pasta_saida
+    )
+    st.session_state.job_id = job_id
+    st.query_params['job'] = job_id
+    job = gerenciador_jobs.obter(job_id)
+
+if job is None and job_id:
+    # Job não existe mais (servidor reiniciado ou execução expirada)
+    st.session_state.pop('job_id', None)
+    st.query_params.pop('job', None)
+    st.info("ℹ️ A execução anterior não está mais disponível. Gere os extratos novamente.")
+
+elif job is not None and job['estado'] not in ESTADOS_FINAIS:
+    # Barra de progresso e status (atualizados periodicamente)
+    acompanhar_job(job['job_id'])
+
+elif job is not None and job['estado'] == ERRO:
+    st.progress(1.0)
+    st.error("❌ Erro durante processamento")
+    st.markdown(f"""
+    <div style="background: linear-gradient(135deg, #ffebee 0%, #ffcdd2 100%); padding: 1.5rem; border-radius: 12px; border-left: 4px solid #f44336;">
+        <strong style="color: #c62828; font-size: 1.2rem;">❌ Erro durante processamento</strong><br>
+        <span style="color: #b71c1c; font-size: 0.95rem;">{job['erro']}</span>
+    </div>
+    """, unsafe_allow_html=True)
+    with st.expander("🔴 Ver detalhes técnicos do erro"):
+        st.code(job['detalhes_erro'])
+
+elif job is not None:
+    # Resultado da execução (parâmetros do próprio job, não dos campos atuais da tela)
+    arquivos_gerados = job['resultado']['artefatos']  # Manifesto: um item por arquivo
+    periodo_inicial = job['parametros']['data_inicial']
+    periodo_final = job['parametros']['data_final']
     
-    # Silenciar stdout (remover logs técnicos)
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()
+    st.progress(1.0)
     
-    try:
-        # Status: Buscando extratos
-        status_text.info("📡 Conectando à API e buscando extratos...")
-        progress_bar.progress(0.2)
-        
-        # Chamar função main com lista de fundos e objetos datetime
-        main(
-            fundos=fundos_selecionados,
-            data_inicial=data_inicial_dt,
-            data_final=data_final_dt,
-            pasta_saida=pasta_saida,
-            gerar_pdf=gerar_pdf
-        )
-        
-        # Atualizar progresso: gerando arquivos
-        progress_bar.progress(0.6)
-        status_text.info("📄 Gerando arquivos Excel e PDF...")
-        
-        # Forçar flush/sync dos arquivos
-        import time
-        time.sleep(1)  # Garantir que arquivos foram escritos
-        
-        # Status: Organizando arquivos
-        progress_bar.progress(0.8)
-        status_text.info("📂 Organizando arquivos gerados...")
-        
-        # Buscar arquivos gerados nos últimos 15 minutos
-        todos_arquivos = os.listdir(pasta_saida)
-        
-        # Procurar arquivos Excel
-        for arquivo in todos_arquivos:
-            if arquivo.endswith('.xlsx') and arquivo.startswith('exportar-Santander'):
-                arquivo_completo = os.path.join(pasta_saida, arquivo)
-                if datetime.fromtimestamp(os.path.getmtime(arquivo_completo)) > timestamp_inicio:
-                    arquivos_gerados.append(arquivo_completo)
-        
-        # Procurar arquivos PDF se solicitado
-        if gerar_pdf:
-            for arquivo in todos_arquivos:
-                if arquivo.endswith('.pdf') and arquivo.startswith('comprovante-ibe'):
-                    arquivo_completo = os.path.join(pasta_saida, arquivo)
-                    if datetime.fromtimestamp(os.path.getmtime(arquivo_completo)) > timestamp_inicio:
-                        arquivos_gerados.append(arquivo_completo)
-        
-        progress_bar.progress(1.0)
-        
-        # Mensagens de conclusão
-        if len(arquivos_gerados) == 0:
-            status_text.warning("⚠️ Nenhum arquivo gerado")
-            st.markdown("""
-            <div style="background: linear-gradient(135deg, #fff3e0 0%, #ffe0b2 100%); padding: 1.25rem; border-radius: 12px; border-left: 4px solid #ff9800;">
-                <strong style="color: #e65100;">⚠️ Nenhum arquivo foi gerado</strong><br>
-                <span style="color: #bf360c; font-size: 0.95rem;">Verifique se os fundos selecionados têm contas cadastradas no período.</span>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            status_text.success(f"✅ {len(arquivos_gerados)} arquivo(s) gerado(s) com sucesso!")
-            
-    except Exception as e:
-        progress_bar.progress(1.0)
-        status_text.error("❌ Erro durante processamento")
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #ffebee 0%, #ffcdd2 100%); padding: 1.5rem; border-radius: 12px; border-left: 4px solid #f44336;">
-            <strong style="color: #c62828; font-size: 1.2rem;">❌ Erro durante processamento</strong><br>
-            <span style="color: #b71c1c; font-size: 0.95rem;">{str(e)}</span>
+    # Mensagens de conclusão
+    if len(arquivos_gerados) == 0:
+        st.warning("⚠️ Nenhum arquivo gerado")
+        st.markdown("""
+        <div style="background: linear-gradient(135deg, #fff3e0 0%, #ffe0b2 100%); padding: 1.25rem; border-radius: 12px; border-left: 4px solid #ff9800;">
+            <strong style="color: #e65100;">⚠️ Nenhum arquivo foi gerado</strong><br>
+            <span style="color: #bf360c; font-size: 0.95rem;">Verifique se os fundos selecionados têm contas cadastradas no período.</span>
         </div>
         """, unsafe_allow_html=True)
-        import traceback
-        with st.expander("🔴 Ver detalhes técnicos do erro"):
-            st.code(traceback.format_exc())
-    
-    finally:
-        # Restaurar stdout
-        sys.stdout = old_stdout
-        
-        # Liberar estado de processamento
-        st.session_state.processando = False
+    else:
+        st.success(f"✅ {len(arquivos_gerados)} arquivo(s) gerado(s) com sucesso!")
     
     # Mostrar resultados apenas se há arquivos gerados
     if arquivos_gerados:
@@ -672,8 +715,8 @@ if st.button("▶️ Gerar Extratos", disabled=buscar_disabled or st.session_sta
         """, unsafe_allow_html=True)
         
         # Agrupar por tipo
-        excels = [f for f in arquivos_gerados if f.endswith('.xlsx')]
-        pdfs = [f for f in arquivos_gerados if f.endswith('.pdf')]
+        excels = [a for a in arquivos_gerados if a['formato'] == 'xlsx']
+        pdfs = [a for a in arquivos_gerados if a['formato'] == 'pdf']
         
         # Resumo com cards visuais
         col1, col2, col3 = st.columns(3)
@@ -710,119 +753,18 @@ if st.button("▶️ Gerar Extratos", disabled=buscar_disabled or st.session_sta
         # Botão para baixar ZIP com todos os arquivos
         st.markdown("<br><br>", unsafe_allow_html=True)
         
-        # Criar arquivo ZIP em memória com estrutura de pastas
-        from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+        # Criar arquivo ZIP em memória com estrutura de pastas, a partir do manifesto
+        from zipfile import ZipFile, ZIP_STORED
         from io import BytesIO
-        import re
         
-        # Extrair informações dos nomes de arquivo para organização
-        def extrair_info_arquivo(caminho_arquivo):
-            """Extrai fundo e período do nome do arquivo"""
-            nome = os.path.basename(caminho_arquivo)
-            
-            # Padrão: exportar-Santander - Extrato DD de MMMM de YYYY-AGENCIA-CONTA.xlsx
-            # ou: comprovante-ibe-UUID.pdf
-            
-            # Para Excel, extrair data do nome
-            if nome.endswith('.xlsx'):
-                match = re.search(r'Extrato (\d{2} de \w+ de \d{4})', nome)
-                periodo = match.group(1) if match else "sem_data"
-            else:
-                # Para PDF, usar período selecionado pelo usuário
-                periodo = f"{data_inicial.strftime('%d-%m-%Y')} a {data_final.strftime('%d-%m-%Y')}"
-            
-            return periodo
-        
-        # Agrupar arquivos por fundo
+        # Agrupar arquivos por fundo e, dentro do fundo, por conta
         arquivos_por_fundo = {}
-        
-        # Criar mapeamento: nome_longo -> fundo_id (para nomes curtos nas pastas)
-        nome_para_id = {}
-        for fundo_id in fundos_selecionados:
-            if fundo_id in SANTANDER_FUNDOS:
-                nome_longo = SANTANDER_FUNDOS[fundo_id].get('nome', fundo_id)
-                nome_para_id[nome_longo] = fundo_id
-        
-        for arquivo in arquivos_gerados:
-            # Identificar fundo pelo nome do arquivo
-            nome = os.path.basename(arquivo)
-            
-            # Extrair nome do fundo do nome do arquivo
-            fundo_nome = "Sem_Fundo"  # Default
-            
-            # Padrão Excel: exportar-Santander - Extrato DD de MMMM de YYYY-FUNDO-AGENCIA-CONTA.xlsx
-            # Padrão PDF: comprovante-ibe-FUNDO-AGENCIA-CONTA.pdf
-            
-            if nome.startswith('exportar-Santander'):
-                # Excel: formato "exportar-Santander - Extrato DD de MMMM de YYYY-FUNDO-AGENCIA-CONTA.xlsx"
-                # Extrair tudo entre último "de YYYY-" e penúltimo "-"
-                match = re.search(r'de \d{4}-(.+?)-\d{4}-\d+\.xlsx$', nome)
-                if match:
-                    fundo_nome = match.group(1).strip()
-                else:
-                    print(f"   ⚠️ Não conseguiu extrair fundo do Excel: {nome}")
-            elif nome.startswith('comprovante-ibe'):
-                # PDF: formato "comprovante-ibe-FUNDO-AGENCIA-CONTA.pdf"
-                # Extrair tudo entre "comprovante-ibe-" e "-AGENCIA-CONTA.pdf"
-                match = re.search(r'comprovante-ibe-(.+?)-\d{4}-\d+\.pdf$', nome)
-                if match:
-                    fundo_nome = match.group(1).strip()
-                else:
-                    print(f"   ⚠️ Não conseguiu extrair fundo do PDF: {nome}")
-            
-            # Se não conseguiu extrair, tentar usar fundos_selecionados
-            if fundo_nome == "Sem_Fundo" and len(fundos_selecionados) == 1:
-                fundo_nome = fundos_selecionados[0]
-            
-            # Converter nome longo para ID curto
-            fundo_id_curto = nome_para_id.get(fundo_nome, fundo_nome)
-            
-            if fundo_id_curto not in arquivos_por_fundo:
-                arquivos_por_fundo[fundo_id_curto] = []
-            arquivos_por_fundo[fundo_id_curto].append(arquivo)
-        
-        print(f"\n📁 Fundos identificados: {len(arquivos_por_fundo)}")
-        
-        # Criar mapeamento: nome_longo -> fundo_id (para nomes curtos nas pastas)
-        nome_para_id = {}
-        for fundo_id in fundos_selecionados:
-            if fundo_id in SANTANDER_FUNDOS:
-                nome_longo = SANTANDER_FUNDOS[fundo_id].get('nome', fundo_id)
-                nome_para_id[nome_longo] = fundo_id
-        
-        for arquivo in arquivos_gerados:
-            # Identificar fundo pelo nome do arquivo
-            nome = os.path.basename(arquivo)
-            
-            # Extrair nome do fundo do nome do arquivo
-            fundo_nome = "Sem_Fundo"  # Default
-            
-            # Padrão Excel: exportar-Santander - Extrato DD de MMMM de YYYY-FUNDO-AGENCIA-CONTA.xlsx
-            # Padrão PDF: comprovante-ibe-FUNDO-AGENCIA-CONTA.pdf
-            
-            if nome.startswith('exportar-Santander'):
-                # Excel: formato "exportar-Santander - Extrato DD de MMMM de YYYY-FUNDO-AGENCIA-CONTA.xlsx"
-                match = re.search(r'de \d{4}-(.+?)-\d{4}-\d+\.xlsx$', nome)
-                if match:
-                    fundo_nome_longo = match.group(1)
-                    # Converter nome longo para ID curto
-                    fundo_nome = nome_para_id.get(fundo_nome_longo, fundo_nome_longo)
-            elif nome.startswith('comprovante-ibe'):
-                # PDF: formato "comprovante-ibe-FUNDO-AGENCIA-CONTA.pdf"
-                match = re.search(r'comprovante-ibe-(.+?)-\d{4}-\d+', nome)
-                if match:
-                    fundo_nome_longo = match.group(1)
-                    fundo_nome = nome_para_id.get(fundo_nome_longo, fundo_nome_longo)
-            
-            # Adicionar ao dicionário
-            if fundo_nome not in arquivos_por_fundo:
-                arquivos_por_fundo[fundo_nome] = []
-            arquivos_por_fundo[fundo_nome].append(arquivo)
+        for artefato in arquivos_gerados:
+            contas_fundo = arquivos_por_fundo.setdefault(artefato['fundo_id'], {})
+            conta_key = f"{artefato['agencia']}_{artefato['conta']}"
+            contas_fundo.setdefault(conta_key, {'xlsx': None, 'pdf': None})[artefato['formato']] = artefato['caminho']
         
         # Criar ZIP com estrutura organizada: FUNDO/DATA/extrato.xlsx e extrato.pdf
-        from zipfile import ZipFile, ZIP_STORED
-        from io import BytesIO
-        
         zip_buffer = BytesIO()
         
         try:
@@ -830,48 +772,13 @@ if st.button("▶️ Gerar Extratos", disabled=buscar_disabled or st.session_sta
             with ZipFile(zip_buffer, 'w', ZIP_STORED) as zip_file:
                 contador = 0
                 
-                # Agrupar arquivos por fundo E conta
-                for fundo_id, arquivos in arquivos_por_fundo.items():
+                # Período para subpasta - formato curto (DDMMAAAA_DDMMAAAA)
+                periodo_str = f"{periodo_inicial.strftime('%d%m%Y')}_{periodo_final.strftime('%d%m%Y')}"
+                
+                for fundo_id, arquivos_por_conta in arquivos_por_fundo.items():
                     # Usar o ID do fundo diretamente (já é curto)
                     fundo_safe = fundo_id.replace(' ', '_')
                     
-                    # Período para subpasta - formato curto (DDMMAAAA_DDMMAAAA)
-                    periodo_str = f"{data_inicial.strftime('%d%m%Y')}_{data_final.strftime('%d%m%Y')}"
-                    
-                    # Agrupar arquivos por conta dentro do fundo
-                    arquivos_por_conta = {}
-                    
-                    for arquivo in arquivos:
-                        if os.path.exists(arquivo):
-                            nome_original = os.path.basename(arquivo)
-                            
-                            # Extrair agência e conta do nome do arquivo
-                            agencia = None
-                            conta = None
-                            
-                            if 'exportar-Santander' in nome_original:
-                                # Formato: exportar-Santander - Extrato ... -FUNDO-AGENCIA-CONTA.xlsx
-                                match = re.search(r'-(\d{4})-(\d+)\.xlsx$', nome_original)
-                                if match:
-                                    agencia = match.group(1)
-                                    conta = match.group(2)
-                            elif 'comprovante-ibe' in nome_original:
-                                # Formato: comprovante-ibe-FUNDO-AGENCIA-CONTA.pdf
-                                match = re.search(r'-(\d{4})-(\d+)', nome_original)
-                                if match:
-                                    agencia = match.group(1)
-                                    conta = match.group(2)
-                            
-                            if agencia and conta:
-                                conta_key = f"{agencia}_{conta}"
-                                if conta_key not in arquivos_por_conta:
-                                    arquivos_por_conta[conta_key] = {'excel': None, 'pdf': None}
-                                
-                                if arquivo.endswith('.xlsx'):
-                                    arquivos_por_conta[conta_key]['excel'] = arquivo
-                                elif arquivo.endswith('.pdf'):
-                                    arquivos_por_conta[conta_key]['pdf'] = arquivo
-                    
                     # Adicionar arquivos ao ZIP organizados por conta
                     for conta_key, arquivos_conta in arquivos_por_conta.items():
                         # Se há apenas uma conta, não criar subpasta de conta
@@ -882,17 +789,11 @@ if st.button("▶️ Gerar Extratos", disabled=buscar_disabled or st.session_sta
                             # Estrutura: FUNDO/DATA/CONTA/extrato.xlsx
                             pasta_destino = f"{fundo_safe}/{periodo_str}/{conta_key}"
                         
-                        # Adicionar Excel
-                        if arquivos_conta['excel']:
-                            caminho_zip = f"{pasta_destino}/extrato.xlsx"
-                            zip_file.write(arquivos_conta['excel'], caminho_zip)
-                            contador += 1
-                        
-                        # Adicionar PDF
-                        if arquivos_conta['pdf']:
-                            caminho_zip = f"{pasta_destino}/extrato.pdf"
-                            zip_file.write(arquivos_conta['pdf'], caminho_zip)
-                            contador += 1
+                        # Adicionar Excel e PDF
+                        for formato in ('xlsx', 'pdf'):
+                            if arquivos_conta[formato]:
+                                zip_file.write(arquivos_conta[formato], f"{pasta_destino}/extrato.{formato}")
+                                contador += 1
             
             # Obter bytes do ZIP
             zip_bytes = zip_buffer.getvalue()
@@ -900,7 +801,7 @@ if st.button("▶️ Gerar Extratos", disabled=buscar_disabled or st.session_sta
             
             # Nome do arquivo ZIP
             data_hora = datetime.now().strftime("%Y%m%d_%H%M%S")
-            periodo_str = f"{data_inicial.strftime('%d-%m-%Y')}_a_{data_final.strftime('%d-%m-%Y')}"
+            periodo_str = f"{periodo_inicial.strftime('%d-%m-%Y')}_a_{periodo_final.strftime('%d-%m-%Y')}"
             nome_zip = f"extratos_bancarios_{periodo_str}_{data_hora}.zip"
             
             # Botão de download
@@ -921,6 +822,7 @@ if st.button("▶️ Gerar Extratos", disabled=buscar_disabled or st.session_sta
     else:
         st.warning("⚠️ Nenhum arquivo foi gerado. Verifique os fundos selecionados.")
 
+
 # ========== INFORMAÇÕES E AJUDA ==========
 st.markdown("---")
 st.markdown('<div class="section-title">ℹ️ Informações</div>', unsafe_allow_html=True)
@@ -953,7 +855,8 @@ with tab1:
         ### Dicas Importantes
         
         - ⏱️ O processamento pode levar alguns minutos dependendo da quantidade de fundos
-        - 📁 Os arquivos são salvos no diretório do projeto
+        - 📁 Os arquivos de cada execução ficam em uma pasta própria, disponível para download por algumas horas
+        - ♻️ Se a execução for interrompida, gere de novo com os mesmos fundos e período: ela continua de onde parou
         - ⚠️ Certifique-se de que as credenciais estão configuradas
         - 🔄 A data final não pode ser anterior à data inicial
         """)
@@ -0,0 +1,345 @@
+"""
+Diário de execução (checkpoints) para retomar buscas longas interrompidas
+main() só guardava em memória os fundos processados: se o dashboard ou a
+linha de comando caíam no meio de "Selecionar todos os fundos" com um
+período de 2 anos, tudo era refeito do zero.
+
+O diário é um arquivo JSON Lines, um evento por linha, gravado à medida
+que o trabalho termina:
+- conta: conta concluída, com o manifesto dos arquivos gerados
+- fundo: fundo concluído (status e arquivos)
+
+As respostas das páginas de extrato ficam fora dele, em um arquivo por
+conta na pasta <diário>_paginas/, apenas de janelas já encerradas (páginas
+de uma janela que termina hoje ainda podem mudar e são sempre buscadas de
+novo). Nada disso fica em memória: o arquivo de uma conta só é lido quando
+a conta volta a ser buscada e é apagado quando ela é registrada como
+concluída.
+
+Uma nova execução com os mesmos parâmetros (fundos, período, pasta, formatos)
+abre o mesmo diário: fundos e contas concluídos são pulados (se os arquivos
+ainda existirem) e contas buscadas pela metade continuam da última página
+concluída. Ao terminar sem erros, o diário é apagado; diários de execuções
+que falharam e não foram retomadas são apagados depois de TTL_DIARIOS
+(SANTANDER_TTL_DIARIOS, padrão 7 dias sem gravações).
+
+Uso:
+    diario = abrir_diario_execucao({'fundos': [...], 'data_inicial': ..., ...})
+    dados = diario.pagina(grupo, chave)     # None se a página ainda não foi buscada
+    diario.registrar_pagina(grupo, chave, dados)
+    diario.registrar_conta(fundo_id, agencia, conta, resultado, paginas=grupo)
+    diario.encerrar(concluida=True)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+PASTA_PADRAO = Path(__file__).parent / "config" / "execucoes"
+
+# Pasta dos diários (um arquivo por conjunto de parâmetros)
+PASTA_DIARIOS = os.environ.get("SANTANDER_DIARIOS", str(PASTA_PADRAO))
+
+# Segundos sem gravações até um diário pendente ser descartado
+TTL_DIARIOS = float(os.environ.get("SANTANDER_TTL_DIARIOS", 7 * 24 * 3600))
+
+# Campos de data dos artefatos (voltam a ser datetime ao carregar o diário)
+_CAMPOS_DATA = ('data_inicial', 'data_final')
+
+
+def _serializar(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return str(valor)
+
+
+def _restaurar_artefatos(artefatos):
+    for artefato in artefatos:
+        for campo in _CAMPOS_DATA:
+            if isinstance(artefato.get(campo), str):
+                try:
+                    artefato[campo] = datetime.fromisoformat(artefato[campo])
+                except ValueError:
+                    pass
+    return artefatos
+
+
+def _arquivos_existem(artefatos):
+    return all(os.path.exists(artefato.get('caminho', '')) for artefato in artefatos)
+
+
+def _pasta_paginas(caminho):
+    """Pasta com as páginas gravadas do diário (um arquivo por conta)"""
+    return os.path.splitext(caminho)[0] + "_paginas"
+
+
+def identificador_execucao(parametros):
+    """Hash estável dos parâmetros da execução (mesmos parâmetros = mesmo diário)"""
+    texto = json.dumps(parametros, sort_keys=True, default=_serializar, ensure_ascii=False)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:16]
+
+
+class DiarioExecucao:
+    """
+    Checkpoints de uma execução de main(), thread-safe
+
+    Args:
+        caminho: Arquivo JSON Lines do diário (criado se não existir)
+        parametros: Parâmetros da execução, gravados no evento inicial
+    """
+
+    def __init__(self, caminho, parametros=None):
+        self.caminho = os.fspath(caminho)
+        self.pasta_paginas = _pasta_paginas(self.caminho)
+        self._lock = threading.Lock()
+        self._paginas = {}  # grupo -> páginas lidas do disco e ainda não devolvidas
+        self._contas = {}
+        self._fundos = {}
+        self.estatisticas = {'fundos_retomados': 0, 'contas_retomadas': 0,
+                             'paginas_retomadas': 0, 'paginas_gravadas': 0}
+
+        eventos = self._ler_arquivo()
+        self.retomada = bool(eventos)
+        for evento in eventos:
+            self._aplicar(evento)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+        self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        if eventos and not self._termina_com_quebra():
+            self._arquivo.write("\n")  # Última linha cortada por uma queda: isolar
+        if not eventos:
+            shutil.rmtree(self.pasta_paginas, ignore_errors=True)  # Sobras de um diário descartado
+            self._gravar({'tipo': 'inicio', 'parametros': parametros or {}, 'em': time.time()})
+
+    # ------------------------------------------------------------------ #
+    # Leitura
+    # ------------------------------------------------------------------ #
+    def _ler_arquivo(self):
+        eventos = []
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        eventos.append(json.loads(linha))
+                    except ValueError:
+                        continue  # Linha incompleta (gravação interrompida)
+        except OSError:
+            pass
+        return eventos
+
+    def _termina_com_quebra(self):
+        try:
+            with open(self.caminho, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) == b"\n"
+        except OSError:
+            return True
+
+    def _arquivo_paginas(self, grupo):
+        nome = hashlib.sha1(grupo.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.pasta_paginas, f"{nome}.jsonl")
+
+    def _ler_paginas(self, grupo):
+        paginas = {}
+        try:
+            with open(self._arquivo_paginas(grupo), 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        evento = json.loads(linha)
+                    except ValueError:
+                        continue  # Linha incompleta (gravação interrompida)
+                    paginas[evento['chave']] = evento['dados']
+        except OSError:
+            pass
+        return paginas
+
+    def _aplicar(self, evento):
+        tipo = evento.get('tipo')
+        if tipo == 'conta':
+            chave = (evento['fundo_id'], evento['agencia'], evento['conta'])
+            resultado = evento['resultado']
+            _restaurar_artefatos(resultado.get('artefatos', []))
+            self._contas[chave] = resultado
+        elif tipo == 'fundo':
+            resultado = evento['resultado']
+            _restaurar_artefatos(resultado.get('artefatos', []))
+            self._fundos[evento['fundo_id']] = resultado
+
+    def pagina(self, grupo, chave):
+        """
+        Resposta gravada da página ou None (grupo e chave: ver SantanderExtratosBancarios._buscar_pagina)
+
+        O arquivo da conta é lido na primeira consulta do grupo e cada página
+        sai da memória ao ser devolvida.
+        """
+        with self._lock:
+            if grupo not in self._paginas:
+                self._paginas[grupo] = self._ler_paginas(grupo) if self.retomada else {}
+            dados = self._paginas[grupo].pop(chave, None)
+            if dados is not None:
+                self.estatisticas['paginas_retomadas'] += 1
+            return dados
+
+    def conta_concluida(self, fundo_id, agencia, conta):
+        """Resultado da conta já concluída (com todos os arquivos ainda no disco) ou None"""
+        with self._lock:
+            resultado = self._contas.get((fundo_id, str(agencia), str(conta)))
+            if resultado is None or not _arquivos_existem(resultado.get('artefatos', [])):
+                return None
+            self.estatisticas['contas_retomadas'] += 1
+            return resultado
+
+    def fundo_concluido(self, fundo_id):
+        """Resultado do fundo já concluído (com todos os arquivos ainda no disco) ou None"""
+        with self._lock:
+            resultado = self._fundos.get(fundo_id)
+            if resultado is None or not _arquivos_existem(resultado.get('artefatos', [])):
+                return None
+            self.estatisticas['fundos_retomados'] += 1
+            return resultado
+
+    # ------------------------------------------------------------------ #
+    # Gravação
+    # ------------------------------------------------------------------ #
+    def _gravar(self, evento):
+        """Acrescenta o evento ao arquivo (chamar com o lock ou antes de compartilhar o diário)"""
+        if self._arquivo is None:
+            return
+        self._arquivo.write(json.dumps(evento, ensure_ascii=False, default=_serializar) + "\n")
+        self._arquivo.flush()
+
+    def registrar_pagina(self, grupo, chave, dados):
+        """Grava a resposta da página no arquivo da conta (grupo), sem mantê-la em memória"""
+        linha = json.dumps({'chave': chave, 'dados': dados}, ensure_ascii=False, default=_serializar) + "\n"
+        with self._lock:
+            if self._arquivo is None:
+                return
+            os.makedirs(self.pasta_paginas, exist_ok=True)
+            with open(self._arquivo_paginas(grupo), 'a', encoding='utf-8') as f:
+                f.write(linha)
+            self.estatisticas['paginas_gravadas'] += 1
+
+    def registrar_conta(self, fundo_id, agencia, conta, resultado, paginas=None):
+        """
+        Conta concluída (resultado de _processar_conta, com os artefatos gerados)
+
+        paginas: grupo das páginas da conta (ver registrar_pagina), descartadas
+        da memória e do disco - a conta não será mais buscada nesta execução
+        """
+        chave = (fundo_id, str(agencia), str(conta))
+        with self._lock:
+            self._contas[chave] = resultado
+            self._gravar({'tipo': 'conta', 'fundo_id': fundo_id, 'agencia': chave[1], 'conta': chave[2],
+                          'resultado': resultado})
+            if paginas is not None:
+                self._paginas.pop(paginas, None)
+                try:
+                    os.remove(self._arquivo_paginas(paginas))
+                except OSError:
+                    pass
+
+    def registrar_fundo(self, fundo_id, resultado):
+        """Fundo concluído; fundos com status 'erro' não são registrados (serão refeitos)"""
+        if resultado.get('status') == 'erro':
+            return
+        with self._lock:
+            self._fundos[fundo_id] = resultado
+            self._gravar({'tipo': 'fundo', 'fundo_id': fundo_id, 'resultado': resultado})
+
+    def encerrar(self, concluida=False):
+        """Fecha o diário; se a execução terminou sem erros, apaga o arquivo e as páginas"""
+        with self._lock:
+            if self._arquivo is None:
+                return
+            self._arquivo.close()
+            self._arquivo = None
+            self._paginas.clear()
+            if concluida:
+                try:
+                    os.remove(self.caminho)
+                except OSError:
+                    pass
+                shutil.rmtree(self.pasta_paginas, ignore_errors=True)
+
+
+def limpar_diarios_antigos(pasta=None, ttl=None):
+    """
+    Apaga diários sem gravações há mais de ttl segundos (execuções que falharam e não foram retomadas)
+
+    Returns:
+        Quantidade de diários apagados
+    """
+    pasta = pasta or PASTA_DIARIOS
+    limite = time.time() - (TTL_DIARIOS if ttl is None else ttl)
+    apagados = 0
+    try:
+        entradas = list(os.scandir(pasta))
+    except OSError:
+        return 0
+    for entrada in entradas:
+        if not (entrada.name.startswith('execucao_') and entrada.name.endswith('.jsonl')):
+            continue
+        try:
+            if entrada.stat().st_mtime < limite:
+                os.remove(entrada.path)
+                shutil.rmtree(_pasta_paginas(entrada.path), ignore_errors=True)
+                apagados += 1
+        except OSError:
+            continue
+    return apagados
+
+
+def diario_pendente(pasta_saida, pasta=None, ttl=None):
+    """
+    True se algum diário ainda válido (execução interrompida ou em andamento) grava em pasta_saida
+
+    Os arquivos dessa pasta não devem ser apagados: a execução retomada pula
+    as contas concluídas justamente porque os arquivos delas ainda existem.
+    """
+    pasta = pasta or PASTA_DIARIOS
+    limite = time.time() - (TTL_DIARIOS if ttl is None else ttl)
+    alvo = os.path.abspath(pasta_saida)
+    try:
+        entradas = list(os.scandir(pasta))
+    except OSError:
+        return False
+    for entrada in entradas:
+        if not (entrada.name.startswith('execucao_') and entrada.name.endswith('.jsonl')):
+            continue
+        try:
+            if entrada.stat().st_mtime < limite:
+                continue
+            with open(entrada.path, 'r', encoding='utf-8') as f:
+                inicio = json.loads(f.readline())  # Evento 'inicio', com os parâmetros
+        except (OSError, ValueError):
+            continue
+        if inicio.get('parametros', {}).get('pasta_saida') == alvo:
+            return True
+    return False
+
+
+def abrir_diario_execucao(parametros, pasta=None, ttl=None):
+    """
+    Abre (ou retoma) o diário da execução com estes parâmetros
+
+    Diários vencidos (ver limpar_diarios_antigos) são apagados antes, inclusive
+    um diário antigo com os mesmos parâmetros: a execução recomeça do zero.
+
+    Args:
+        parametros: Dicionário com tudo que define o resultado da execução
+            (fundos, período, pasta de saída, formatos...)
+        pasta: Pasta dos diários (padrão: PASTA_DIARIOS)
+        ttl: Segundos sem gravações até um diário ser descartado (padrão: TTL_DIARIOS)
+
+    Returns:
+        DiarioExecucao (retomada=True se havia um diário interrompido)
+    """
+    pasta = pasta or PASTA_DIARIOS
+    limpar_diarios_antigos(pasta, ttl)
+    caminho = os.path.join(pasta, f"execucao_{identificador_execucao(parametros)}.jsonl")
+    return DiarioExecucao(caminho, parametros)
@@ -0,0 +1,248 @@
+"""
+Executor de jobs em segundo plano para a geração de extratos
+Cada execução recebe um ID, roda em uma thread separada e acumula eventos de
+progresso (por fundo e por conta). A interface consulta o estado pelo ID, o
+que permite acompanhar - ou reencontrar após recarregar a página - uma
+execução em andamento ou já finalizada.
+
+A função executada recebe o callback progresso(evento, dados) como argumento
+nomeado; os eventos esperados são os emitidos por buscar_extratos_bancarios.main:
+- inicio:          {'fundos': [...]}
+- fundo_inicio:    {'fundo_id', 'contas_total'}
+- conta_concluida: {'fundo_id', 'agencia', 'conta', 'arquivos', 'artefatos'}
+- fundo_concluido: {'fundo_id', 'status'}
+- fim:             {'resumo': {...}}
+
+Cada job pode ter uma pasta própria (submeter(..., pasta=...)), onde a função
+grava seus arquivos: jobs simultâneos não sobrescrevem nem apagam os arquivos
+uns dos outros, e a pasta é apagada quando o job expira (a menos que
+reter_pasta(pasta) diga o contrário). Um novo job com a pasta de um job ainda
+em andamento não é executado de novo: submeter devolve o ID do job existente.
+"""
+
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Estados de um job
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluido'
+ERRO = 'erro'
+ESTADOS_FINAIS = (CONCLUIDO, ERRO)
+
+MAX_JOBS_SIMULTANEOS = 1      # Execuções simultâneas (as demais ficam na fila)
+MAX_EVENTOS = 500             # Eventos guardados por job (os mais antigos são descartados)
+TEMPO_RETENCAO = 6 * 60 * 60  # Segundos que um job finalizado fica disponível
+
+
+class Job:
+    """Estado de uma execução (acessado sempre sob o lock do gerenciador)"""
+
+    def __init__(self, job_id, descricao, parametros, pasta=None):
+        self.job_id = job_id
+        self.descricao = descricao
+        self.parametros = parametros
+        self.pasta = pasta  # Pasta de saída do job (apagada quando o job expira)
+        self.estado = PENDENTE
+        self.criado_em = datetime.now()
+        self.iniciado_em = None
+        self.finalizado_em = None
+        self.resultado = None
+        self.erro = None
+        self.detalhes_erro = None
+        self.mensagem = "⏳ Aguardando início..."
+        self.eventos = []
+
+        # Progresso: fundos concluídos e contas por fundo em andamento
+        self.fundos_total = 0
+        self.fundos_concluidos = 0
+        self.contas_total = 0
+        self.contas_concluidas = 0
+        self._contas_em_andamento = {}  # fundo_id -> [concluidas, total]
+
+    def registrar_evento(self, evento, dados):
+        """Atualiza contadores e mensagem a partir de um evento de progresso"""
+        self.eventos.append((datetime.now(), evento, dados))
+        if len(self.eventos) > MAX_EVENTOS:
+            del self.eventos[:len(self.eventos) - MAX_EVENTOS]
+
+        fundo_id = dados.get('fundo_id')
+
+        if evento == 'inicio':
+            self.fundos_total = len(dados.get('fundos') or [])
+            self.mensagem = f"🔄 Iniciando busca de extratos para {self.fundos_total} fundo(s)..."
+
+        elif evento == 'fundo_inicio':
+            total = dados.get('contas_total', 0)
+            self.contas_total += total
+            self._contas_em_andamento[fundo_id] = [0, total]
+            self.mensagem = f"📡 {fundo_id}: buscando extratos de {total} conta(s)..."
+
+        elif evento == 'conta_concluida':
+            self.contas_concluidas += 1
+            if fundo_id in self._contas_em_andamento:
+                self._contas_em_andamento[fundo_id][0] += 1
+            self.mensagem = f"📄 {fundo_id}: conta {dados.get('agencia')}.{dados.get('conta')} concluída"
+
+        elif evento == 'fundo_concluido':
+            self.fundos_concluidos += 1
+            self._contas_em_andamento.pop(fundo_id, None)
+            self.mensagem = (f"✅ {fundo_id} concluído "
+                             f"({self.fundos_concluidos}/{self.fundos_total} fundos)")
+
+        elif evento == 'fim':
+            self.mensagem = "📂 Organizando arquivos gerados..."
+
+    @property
+    def progresso(self):
+        """Fração concluída (0.0 a 1.0), ponderando contas dos fundos em andamento"""
+        if self.estado in ESTADOS_FINAIS:
+            return 1.0
+        if not self.fundos_total:
+            return 0.0
+        parcial = sum(concluidas / total for concluidas, total in self._contas_em_andamento.values() if total)
+        return min((self.fundos_concluidos + parcial) / self.fundos_total, 1.0)
+
+    def como_dict(self):
+        return {
+            'job_id': self.job_id,
+            'descricao': self.descricao,
+            'parametros': dict(self.parametros),
+            'pasta': self.pasta,
+            'estado': self.estado,
+            'criado_em': self.criado_em,
+            'iniciado_em': self.iniciado_em,
+            'finalizado_em': self.finalizado_em,
+            'progresso': self.progresso,
+            'mensagem': self.mensagem,
+            'fundos_total': self.fundos_total,
+            'fundos_concluidos': self.fundos_concluidos,
+            'contas_total': self.contas_total,
+            'contas_concluidas': self.contas_concluidas,
+            'eventos': list(self.eventos),
+            'resultado': self.resultado,
+            'erro': self.erro,
+            'detalhes_erro': self.detalhes_erro,
+        }
+
+
+class GerenciadorJobs:
+    """
+    Fila de jobs executados em threads de segundo plano
+
+    Uso:
+        gerenciador = GerenciadorJobs()
+        job_id = gerenciador.submeter(funcao, parametros={'fundos': [...]})
+        estado = gerenciador.obter(job_id)   # dicionário (cópia) ou None
+
+    funcao é chamada como funcao(progresso=callback, **parametros). reter_pasta,
+    se informada, é chamada como reter_pasta(pasta) antes de apagar a pasta de um
+    job expirado; True mantém os arquivos (ex.: uma execução pendente ainda os usa).
+    """
+
+    def __init__(self, max_jobs_simultaneos=MAX_JOBS_SIMULTANEOS, tempo_retencao=TEMPO_RETENCAO,
+                 reter_pasta=None):
+        self.tempo_retencao = tempo_retencao
+        self.reter_pasta = reter_pasta
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_jobs_simultaneos),
+                                            thread_name_prefix="job")
+
+    def submeter(self, funcao, descricao="", parametros=None, pasta=None):
+        """
+        Enfileira uma execução
+
+        Args:
+            funcao: Chamada como funcao(progresso=callback, **parametros)
+            descricao: Texto exibido na interface
+            parametros: Argumentos nomeados de funcao
+            pasta: Pasta de saída do job; é apagada quando o job expira. Se
+                um job com a mesma pasta ainda não terminou, nada é enfileirado
+
+        Returns:
+            ID do job (string) - o do job existente com a mesma pasta, se houver
+        """
+        job = Job(uuid.uuid4().hex[:12], descricao, parametros or {}, pasta)
+        with self._lock:
+            existente = next((j for j in self._jobs.values()
+                              if pasta is not None and j.pasta == pasta and j.estado not in ESTADOS_FINAIS), None)
+            if existente is None:
+                self._jobs[job.job_id] = job  # Antes de remover os expirados: a pasta dele é preservada
+            pastas_expiradas = self._remover_expirados()
+        self._apagar_pastas(pastas_expiradas)
+        if existente is not None:
+            return existente.job_id
+        self._executor.submit(self._executar, job, funcao)
+        return job.job_id
+
+    def _executar(self, job, funcao):
+        with self._lock:
+            job.estado = EXECUTANDO
+            job.iniciado_em = datetime.now()
+            job.mensagem = "🔄 Iniciando..."
+
+        def progresso(evento, dados):
+            with self._lock:
+                job.registrar_evento(evento, dados)
+
+        try:
+            resultado = funcao(progresso=progresso, **job.parametros)
+        except Exception as e:
+            with self._lock:
+                job.estado = ERRO
+                job.erro = str(e)
+                job.detalhes_erro = traceback.format_exc()
+                job.mensagem = "❌ Erro durante processamento"
+                job.finalizado_em = datetime.now()
+            return
+
+        with self._lock:
+            job.estado = CONCLUIDO
+            job.resultado = resultado
+            job.mensagem = "✅ Processamento concluído"
+            job.finalizado_em = datetime.now()
+
+    def obter(self, job_id):
+        """Retorna uma cópia do estado do job (ou None se não existir)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.como_dict() if job else None
+
+    def listar(self):
+        """Retorna o estado de todos os jobs, do mais recente para o mais antigo"""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.criado_em, reverse=True)
+            return [job.como_dict() for job in jobs]
+
+    def _remover_expirados(self):
+        """
+        Descarta jobs finalizados há mais de tempo_retencao segundos (chamar com o lock)
+
+        Returns:
+            Pastas dos jobs descartados que nenhum outro job usa (apagar fora do lock)
+        """
+        limite = time.time() - self.tempo_retencao
+        expirados = [
+            job_id for job_id, job in self._jobs.items()
+            if job.estado in ESTADOS_FINAIS and job.finalizado_em.timestamp() < limite
+        ]
+        pastas = {self._jobs[job_id].pasta for job_id in expirados} - {None}
+        for job_id in expirados:
+            del self._jobs[job_id]
+        return pastas - {job.pasta for job in self._jobs.values()}
+
+    def _apagar_pastas(self, pastas):
+        for pasta in pastas:
+            if self.reter_pasta is not None and self.reter_pasta(pasta):
+                continue
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    def encerrar(self, aguardar=True):
+        """Encerra o executor (jobs em andamento terminam se aguardar=True)"""
+        self._executor.shutdown(wait=aguardar)
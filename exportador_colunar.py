@@ -0,0 +1,160 @@
+"""
+Exportação colunar (Parquet / Arrow IPC) do extrato calculado
+Gravada a partir do mesmo Extrato (motor_extrato) que alimenta o Excel e o
+PDF, com colunas tipadas - sem precisar reabrir o .xlsx com pd.read_excel
+para recuperar números. Um ano de extratos de vários fundos carrega em
+milissegundos com carregar_extratos_colunares (ou pd.read_parquet).
+
+Colunas (uma linha por transação, em ordem cronológica):
+    data (date32), historico, documento, valor (float64, com sinal),
+    saldo (float64, saldo após a transação), fundo, agencia, conta
+
+Metadados do arquivo: saldo_anterior, saldo_atual, data_inicial, data_final.
+
+Requer pyarrow (pip install pyarrow).
+"""
+
+import os
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+FORMATO_PARQUET = 'parquet'
+FORMATO_ARROW = 'arrow'      # Arrow IPC (Feather v2)
+FORMATOS_COLUNARES = (FORMATO_PARQUET, FORMATO_ARROW)
+COMPRESSAO = 'zstd'
+
+if HAS_PYARROW:
+    ESQUEMA = pa.schema([
+        ('data', pa.date32()),
+        ('historico', pa.string()),
+        ('documento', pa.string()),
+        ('valor', pa.float64()),
+        ('saldo', pa.float64()),
+        ('fundo', pa.string()),
+        ('agencia', pa.string()),
+        ('conta', pa.string()),
+    ])
+
+
+def _datas(datas_formatadas):
+    """DD/MM/YYYY (ou YYYY-MM-DD) -> date; inválidas viram None. Cada data distinta é lida uma vez."""
+    cache = {}
+    resultado = []
+    for data in datas_formatadas:
+        valor = cache.get(data, False)
+        if valor is False:
+            valor = None
+            for formato in ('%d/%m/%Y', '%Y-%m-%d'):
+                try:
+                    valor = datetime.strptime((data or '')[:10], formato).date()
+                    break
+                except ValueError:
+                    continue
+            cache[data] = valor
+        resultado.append(valor)
+    return resultado
+
+
+def tabela_extrato(extrato, fundo, agencia, conta, data_inicial=None, data_final=None):
+    """
+    Monta a pyarrow.Table do extrato
+
+    Args:
+        extrato: Extrato calculado (motor_extrato.calcular_extrato)
+        fundo: Nome (ou ID) do fundo
+        agencia, conta: Identificação da conta
+        data_inicial, data_final: Período solicitado (gravado nos metadados)
+
+    Returns:
+        pyarrow.Table no ESQUEMA, com metadados de saldo e período
+    """
+    n = len(extrato)
+    colunas = [
+        pa.array(_datas(extrato.datas_formatadas), type=pa.date32()),
+        pa.array([str(t.get('transactionName', '') or '') for t in extrato.transacoes], type=pa.string()),
+        pa.array([str(t.get('documentNumber', '') or '') for t in extrato.transacoes], type=pa.string()),
+        pa.array(extrato.valores, type=pa.float64()),
+        pa.array(extrato.saldos, type=pa.float64()),
+        pa.array([str(fundo)] * n, type=pa.string()),
+        pa.array([str(agencia)] * n, type=pa.string()),
+        pa.array([str(conta)] * n, type=pa.string()),
+    ]
+    metadados = {
+        'saldo_anterior': repr(float(extrato.saldo_anterior)),
+        'saldo_atual': repr(float(extrato.saldo_atual)),
+        'data_inicial': data_inicial.strftime('%Y-%m-%d') if data_inicial else '',
+        'data_final': data_final.strftime('%Y-%m-%d') if data_final else '',
+    }
+    return pa.Table.from_arrays(colunas, schema=ESQUEMA.with_metadata(metadados))
+
+
+def exportar_extrato_colunar(caminho, extrato, fundo, agencia, conta, formato=FORMATO_PARQUET,
+                             data_inicial=None, data_final=None):
+    """
+    Grava o extrato em Parquet ou Arrow IPC
+
+    A gravação vai para um arquivo temporário e é renomeada no final, então
+    leitores nunca veem um arquivo pela metade.
+
+    Returns:
+        caminho
+
+    Raises:
+        RuntimeError: pyarrow não instalado
+        ValueError: formato desconhecido
+    """
+    if not HAS_PYARROW:
+        raise RuntimeError("pyarrow não instalado (pip install pyarrow)")
+    if formato not in FORMATOS_COLUNARES:
+        raise ValueError(f"Formato colunar desconhecido: {formato!r} (use {', '.join(FORMATOS_COLUNARES)})")
+
+    tabela = tabela_extrato(extrato, fundo, agencia, conta, data_inicial, data_final)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    if formato == FORMATO_PARQUET:
+        pq.write_table(tabela, temporario, compression=COMPRESSAO)
+    else:
+        feather.write_feather(tabela, temporario, compression=COMPRESSAO)
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def carregar_extratos_colunares(caminhos):
+    """
+    Lê e concatena extratos colunares (Parquet e/ou Arrow IPC)
+
+    Args:
+        caminhos: Arquivo, pasta (todos os .parquet/.arrow dentro dela,
+            recursivamente) ou lista de arquivos
+
+    Returns:
+        pyarrow.Table única (to_pandas() para um DataFrame)
+    """
+    if not HAS_PYARROW:
+        raise RuntimeError("pyarrow não instalado (pip install pyarrow)")
+    if isinstance(caminhos, (str, os.PathLike)):
+        caminho = os.fspath(caminhos)
+        if os.path.isdir(caminho):
+            caminhos = sorted(
+                os.path.join(raiz, nome)
+                for raiz, _pastas, nomes in os.walk(caminho)
+                for nome in nomes
+                if nome.endswith(('.' + FORMATO_PARQUET, '.' + FORMATO_ARROW))
+            )
+        else:
+            caminhos = [caminho]
+
+    tabelas = [
+        pq.read_table(c) if os.fspath(c).endswith('.' + FORMATO_PARQUET) else feather.read_table(c)
+        for c in caminhos
+    ]
+    if not tabelas:
+        return ESQUEMA.empty_table()
+    # Metadados de saldo são por arquivo: descartados na tabela combinada
+    return pa.concat_tables([t.replace_schema_metadata(None) for t in tabelas])
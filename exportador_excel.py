@@ -0,0 +1,114 @@
+"""
+Exportador Excel em streaming no layout IBE Santander
+Usa um workbook write-only do openpyxl: cada linha é gravada no XML assim que
+é produzida (o openpyxl a descarrega em um arquivo temporário), com formato
+numérico e fonte aplicados na escrita, sem DataFrame intermediário, sem
+guardar as linhas em memória e sem percorrer as células depois de salvas.
+
+No modo write-only as larguras das colunas precisam ser definidas antes da
+primeira linha: elas são medidas antes, em uma passada barata pelas colunas
+do extrato (medir/medir_coluna), e só então as linhas são adicionadas.
+"""
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+NUM_COLUNAS = 6                 # Data | vazio | Histórico | Documento | Valor (R$) | Saldo (R$)
+COLUNA_VALOR = 4                # Índice (base 0) da coluna Valor (R$)
+COLUNA_SALDO = 5                # Índice (base 0) da coluna Saldo (R$)
+LINHA_INICIO_FORMATACAO = 5     # Primeira linha (base 1) com formato monetário
+FORMATO_MOEDA = '#,##0.00'
+LARGURA_MINIMA = 10
+LARGURA_MAXIMA = 50
+NOME_ABA = 'Sheet1'
+
+
+class PlanilhaIBE:
+    """
+    Grava o extrato em streaming, linha a linha
+
+    Uso:
+        planilha = PlanilhaIBE()
+        planilha.medir(['AGENCIA', '2271', 'CONTA', '130137784', None, None])
+        planilha.medir_coluna(2, historicos)      # ... todas as linhas/colunas
+        planilha.adicionar(['AGENCIA', '2271', 'CONTA', '130137784', None, None])
+        ...
+        planilha.salvar(filepath)
+
+    Tudo deve ser medido antes do primeiro adicionar (as larguras são fixadas
+    quando a primeira linha é gravada).
+    """
+
+    def __init__(self):
+        self.comprimentos = [0] * NUM_COLUNAS
+        self.num_linhas = 0
+        self._workbook = None
+        self._worksheet = None
+        self._fonte_vermelha = None
+
+    def medir(self, linha):
+        """Considera uma linha (lista de 6 valores) no cálculo das larguras"""
+        comprimentos = self.comprimentos
+        for i, valor in enumerate(linha):
+            if valor:
+                n = len(str(valor))
+                if n > comprimentos[i]:
+                    comprimentos[i] = n
+
+    def medir_coluna(self, indice, valores):
+        """Considera todos os valores de uma coluna (lista, np.ndarray ou gerador) nas larguras"""
+        if hasattr(valores, 'tolist'):
+            valores = valores.tolist()
+        n = max((len(str(valor)) for valor in valores if valor), default=0)
+        if n > self.comprimentos[indice]:
+            self.comprimentos[indice] = n
+
+    def larguras(self):
+        """Largura ajustada de cada coluna (mínimo 10, máximo 50)"""
+        return [min(max(n + 2, LARGURA_MINIMA), LARGURA_MAXIMA) for n in self.comprimentos]
+
+    def _abrir(self):
+        self._workbook = Workbook(write_only=True)
+        self._worksheet = self._workbook.create_sheet(NOME_ABA)
+        for i, largura in enumerate(self.larguras(), 1):
+            self._worksheet.column_dimensions[get_column_letter(i)].width = largura
+        # Definir fonte vermelha para valores negativos
+        self._fonte_vermelha = Font(color="FF0000")
+
+    def adicionar(self, linha):
+        """Grava uma linha (lista de 6 valores) no arquivo em construção"""
+        if self._worksheet is None:
+            self._abrir()
+        worksheet = self._worksheet
+        self.num_linhas += 1
+
+        if self.num_linhas >= LINHA_INICIO_FORMATACAO:
+            linha = list(linha)
+
+            # Coluna Valor (R$): formato monetário + vermelho se negativo
+            valor = linha[COLUNA_VALOR]
+            if valor and isinstance(valor, (int, float)):
+                cell = WriteOnlyCell(worksheet, value=valor)
+                cell.number_format = FORMATO_MOEDA
+                if valor < 0:
+                    cell.font = self._fonte_vermelha
+                linha[COLUNA_VALOR] = cell
+
+            # Coluna Saldo (R$): formato monetário (NÃO aplicar fonte vermelha)
+            saldo = linha[COLUNA_SALDO]
+            if saldo and isinstance(saldo, (int, float)):
+                cell = WriteOnlyCell(worksheet, value=saldo)
+                cell.number_format = FORMATO_MOEDA
+                linha[COLUNA_SALDO] = cell
+
+        worksheet.append(linha)
+
+    def salvar(self, filepath):
+        """Fecha e grava o arquivo .xlsx"""
+        if self._workbook is None:
+            self._abrir()
+        self._workbook.save(filepath)
+        self._workbook = self._worksheet = None
+        return filepath
@@ -0,0 +1,63 @@
+"""
+Formatação de valores em reais (1.234,56) e de datas por extenso, sem locale
+O PDF formatava cada valor com f"{abs(v):,.2f}" + três replace + o sinal,
+duas vezes por linha, e os nomes de mês/dia vinham de locale.setlocale
+(pt_BR no nome do Excel, en_US no período do PDF) - lento, dependente dos
+locales instalados na máquina e global ao processo (inseguro com threads).
+
+- formatar_brl_lote: uma coluna inteira (lista ou np.ndarray) em uma única
+  chamada de format + translate, caminho usado na tabela e no quadro de saldo
+- formatar_brl: um valor avulso
+- data_por_extenso: "18 de outubro de 2026" (meses em português, fixos)
+- data_periodo_ibe: "Wed Jan 03 00:00:00 GMT-03:00 2024" (formato do IBE)
+
+O resultado é idêntico ao da formatação anterior, inclusive o sinal de
+valores que arredondam para zero (-0,00) e o zero negativo (0,00).
+"""
+
+# Troca separadores do formato americano (1,234.56) pelos brasileiros (1.234,56)
+_SEPARADORES_BRL = str.maketrans(',.', '.,')
+
+MESES_PT = ('janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
+            'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro')
+
+# Abreviações em inglês usadas pelo IBE no período do extrato
+DIAS_SEMANA_IBE = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+MESES_IBE = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def formatar_brl_lote(valores):
+    """
+    Formata vários valores no padrão brasileiro, com 2 casas e sinal
+
+    Args:
+        valores: Lista de números ou np.ndarray
+
+    Returns:
+        Lista de strings ("1.234,56", "-0,50", ...) na mesma ordem
+    """
+    # + 0.0 transforma -0.0 em 0.0 (o formato anterior só usava o sinal se valor < 0)
+    if hasattr(valores, 'tolist'):
+        valores = (valores + 0.0).tolist()
+    else:
+        valores = [float(v) + 0.0 for v in valores]
+    if not valores:
+        return []
+    texto = ("{:,.2f}\n" * len(valores)).format(*valores)
+    return texto.translate(_SEPARADORES_BRL).split("\n")[:-1]
+
+
+def formatar_brl(valor):
+    """Formata um valor no padrão brasileiro (1.234,56 / -1.234,56)"""
+    return f"{valor + 0.0:,.2f}".translate(_SEPARADORES_BRL)
+
+
+def data_por_extenso(data):
+    """'18 de outubro de 2026' - equivale ao strftime('%d de %B de %Y') com locale pt_BR"""
+    return f"{data.day:02d} de {MESES_PT[data.month - 1]} de {data.year}"
+
+
+def data_periodo_ibe(data, hora):
+    """'Wed Jan 03 00:00:00 GMT-03:00 2024' - equivale ao strftime('%a %b %d ...') com locale en_US"""
+    return (f"{DIAS_SEMANA_IBE[data.weekday()]} {MESES_IBE[data.month - 1]} {data.day:02d} "
+            f"{hora} GMT-03:00 {data.year}")
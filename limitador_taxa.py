@@ -0,0 +1,266 @@
+"""
+Limitador de taxa adaptativo e novas tentativas com backoff para as APIs Santander
+Um balde de fichas (token bucket) por client_id, compartilhado por todas as
+threads e corrotinas do processo: com fundos, contas e páginas em paralelo,
+as requisições de um mesmo client_id respeitam um único limite.
+
+- Taxa adaptativa: cada 429 reduz a taxa (FATOR_REDUCAO) e pausa o
+  client_id pelo Retry-After; respostas bem-sucedidas recuperam a taxa aos
+  poucos (FATOR_RECUPERACAO) até TAXA_MAXIMA
+- Novas tentativas em 429, 5xx, timeouts e falhas de conexão, com espera
+  exponencial e jitter (ou o Retry-After informado pelo banco)
+- Estatísticas por client_id (requisições, 429, 5xx, exceções, novas
+  tentativas, tempo de espera e taxa atual) para calibrar a vazão
+
+Uso:
+    limitador = obter_limitador(client_id)
+    resposta = executar_com_backoff(limitador, lambda: sessao.get(url), "saldo",
+                                    excecoes=(requests.Timeout, requests.ConnectionError))
+    estatisticas_limitadores()   # {client_id: {...}}
+"""
+
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+
+TAXA_MAXIMA = float(os.environ.get("SANTANDER_TAXA_MAXIMA", 50))  # Requisições/s por client_id
+RAJADA = 50               # Requisições liberadas de uma vez com o balde cheio
+TAXA_MINIMA = 0.5         # Piso da taxa após reduções sucessivas (requisições/s)
+FATOR_REDUCAO = 0.7       # Multiplica a taxa a cada resposta 429
+FATOR_RECUPERACAO = 1.05  # Multiplica a taxa a cada resposta bem-sucedida (até TAXA_MAXIMA)
+
+TENTATIVAS = 5            # Tentativas por requisição (a primeira + novas tentativas)
+BACKOFF_BASE = 0.5        # Segundos de espera antes da 2ª tentativa (dobra a cada tentativa)
+BACKOFF_MAXIMO = 30.0     # Teto da espera entre tentativas (segundos)
+STATUS_RETENTAVEIS = frozenset({429, 500, 502, 503, 504})
+
+
+def interpretar_retry_after(valor):
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos; None se ausente/inválido"""
+    if not valor:
+        return None
+    try:
+        return max(float(valor), 0.0)
+    except ValueError:
+        pass
+    try:
+        data = email.utils.parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    return max(data.timestamp() - time.time(), 0.0)
+
+
+def tempo_backoff(tentativa, retry_after=None):
+    """
+    Espera antes da próxima tentativa
+
+    Args:
+        tentativa: Número da tentativa que acabou de falhar (1, 2, ...)
+        retry_after: Segundos pedidos pelo servidor (tem prioridade)
+
+    Returns:
+        Segundos: Retry-After (+ até BACKOFF_BASE de jitter) ou backoff
+        exponencial com jitter entre metade e o valor cheio
+    """
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAXIMO) + random.uniform(0, BACKOFF_BASE)
+    teto = min(BACKOFF_BASE * (2 ** (tentativa - 1)), BACKOFF_MAXIMO)
+    return random.uniform(teto / 2, teto)
+
+
+class LimitadorTaxa:
+    """
+    Balde de fichas com taxa adaptativa (thread-safe, usável também em asyncio)
+
+    Args:
+        taxa_maxima: Requisições por segundo em regime normal
+        rajada: Capacidade do balde (requisições liberadas sem espera)
+        taxa_minima: Menor taxa aceita após reduções por 429
+    """
+
+    def __init__(self, taxa_maxima=TAXA_MAXIMA, rajada=RAJADA, taxa_minima=TAXA_MINIMA):
+        self.taxa_maxima = float(taxa_maxima)
+        self.taxa_minima = min(float(taxa_minima), self.taxa_maxima)
+        self.rajada = max(1, rajada)
+        self.taxa = self.taxa_maxima
+        self._fichas = float(self.rajada)
+        self._ultimo = time.monotonic()
+        self._pausa_ate = 0.0
+        self._lock = threading.Lock()
+        self._estatisticas = {
+            'requisicoes': 0, 'respostas_429': 0, 'respostas_5xx': 0, 'excecoes': 0,
+            'novas_tentativas': 0, 'falhas_definitivas': 0, 'tempo_espera': 0.0,
+        }
+
+    def _reservar(self):
+        """Reserva uma ficha e retorna quantos segundos esperar por ela"""
+        with self._lock:
+            agora = time.monotonic()
+            self._fichas = min(self.rajada, self._fichas + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+            self._fichas -= 1
+            espera = -self._fichas / self.taxa if self._fichas < 0 else 0.0
+            espera = max(espera, self._pausa_ate - agora)
+            self._estatisticas['requisicoes'] += 1
+            self._estatisticas['tempo_espera'] += espera
+            return espera
+
+    def adquirir(self):
+        """Bloqueia até a requisição poder ser enviada"""
+        espera = self._reservar()
+        if espera > 0:
+            time.sleep(espera)
+
+    async def adquirir_async(self):
+        """Versão assíncrona de adquirir (não bloqueia o loop)"""
+        espera = self._reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self.taxa = min(self.taxa_maxima, self.taxa * FATOR_RECUPERACAO)
+
+    def registrar_limite(self, retry_after=None):
+        """Resposta 429: reduz a taxa e pausa o client_id pelo Retry-After"""
+        with self._lock:
+            self._estatisticas['respostas_429'] += 1
+            self.taxa = max(self.taxa_minima, self.taxa * FATOR_REDUCAO)
+            self._fichas = min(self._fichas, 0.0)
+            if retry_after:
+                self._pausa_ate = max(self._pausa_ate, time.monotonic() + retry_after)
+
+    def registrar_falha(self, status=None):
+        """Resposta 5xx (status) ou exceção de rede (status=None)"""
+        with self._lock:
+            self._estatisticas['respostas_5xx' if status else 'excecoes'] += 1
+
+    def registrar_nova_tentativa(self, espera):
+        with self._lock:
+            self._estatisticas['novas_tentativas'] += 1
+            self._estatisticas['tempo_espera'] += espera
+
+    def registrar_falha_definitiva(self):
+        with self._lock:
+            self._estatisticas['falhas_definitivas'] += 1
+
+    def como_dict(self):
+        with self._lock:
+            estatisticas = dict(self._estatisticas)
+            estatisticas['taxa_atual'] = self.taxa
+            estatisticas['taxa_maxima'] = self.taxa_maxima
+            return estatisticas
+
+
+def _avaliar_resposta(limitador, resposta):
+    """Registra a resposta no limitador; retorna (retentável, retry_after)"""
+    status = resposta.status_code
+    if status not in STATUS_RETENTAVEIS:
+        if status < 400:
+            limitador.registrar_sucesso()
+        return False, None
+    retry_after = interpretar_retry_after(resposta.headers.get('Retry-After'))
+    if status == 429:
+        limitador.registrar_limite(retry_after)
+    else:
+        limitador.registrar_falha(status)
+    return True, retry_after
+
+
+def executar_com_backoff(limitador, requisitar, descricao="requisição", tentativas=TENTATIVAS,
+                         excecoes=(), log=None):
+    """
+    Executa requisitar() respeitando o limitador, com novas tentativas em 429/5xx/exceções
+
+    Args:
+        limitador: LimitadorTaxa do client_id
+        requisitar: Função sem argumentos que faz a requisição e retorna a resposta
+            (objeto com status_code e headers)
+        descricao: Texto usado nas mensagens de log
+        tentativas: Número máximo de tentativas
+        excecoes: Exceções de rede que justificam nova tentativa (timeouts, conexão)
+        log: Função opcional para registrar as novas tentativas
+
+    Returns:
+        A resposta final - sucesso, erro não retentável ou o último 429/5xx
+
+    Raises:
+        A última exceção de rede, se todas as tentativas falharem com exceção
+    """
+    for tentativa in range(1, tentativas + 1):
+        limitador.adquirir()
+        try:
+            resposta = requisitar()
+        except excecoes as e:
+            limitador.registrar_falha()
+            if tentativa == tentativas:
+                limitador.registrar_falha_definitiva()
+                raise
+            motivo, retry_after = f"{type(e).__name__}: {e}", None
+        else:
+            retentavel, retry_after = _avaliar_resposta(limitador, resposta)
+            if not retentavel:
+                return resposta
+            if tentativa == tentativas:
+                limitador.registrar_falha_definitiva()
+                return resposta
+            motivo = f"HTTP {resposta.status_code}"
+
+        espera = tempo_backoff(tentativa, retry_after)
+        limitador.registrar_nova_tentativa(espera)
+        if log:
+            log(f"   🔁 {descricao}: {motivo} - nova tentativa em {espera:.1f}s ({tentativa + 1}/{tentativas})")
+        time.sleep(espera)
+
+
+async def executar_com_backoff_async(limitador, requisitar, descricao="requisição", tentativas=TENTATIVAS,
+                                     excecoes=(), log=None):
+    """Versão assíncrona de executar_com_backoff (requisitar é uma função que retorna uma corrotina)"""
+    for tentativa in range(1, tentativas + 1):
+        await limitador.adquirir_async()
+        try:
+            resposta = await requisitar()
+        except excecoes as e:
+            limitador.registrar_falha()
+            if tentativa == tentativas:
+                limitador.registrar_falha_definitiva()
+                raise
+            motivo, retry_after = f"{type(e).__name__}: {e}", None
+        else:
+            retentavel, retry_after = _avaliar_resposta(limitador, resposta)
+            if not retentavel:
+                return resposta
+            if tentativa == tentativas:
+                limitador.registrar_falha_definitiva()
+                return resposta
+            motivo = f"HTTP {resposta.status_code}"
+
+        espera = tempo_backoff(tentativa, retry_after)
+        limitador.registrar_nova_tentativa(espera)
+        if log:
+            log(f"   🔁 {descricao}: {motivo} - nova tentativa em {espera:.1f}s ({tentativa + 1}/{tentativas})")
+        await asyncio.sleep(espera)
+
+
+# Registro global: um limitador por client_id
+_LIMITADORES = {}
+_LOCK_LIMITADORES = threading.Lock()
+
+
+def obter_limitador(client_id):
+    """Limitador compartilhado do client_id (criado com TAXA_MAXIMA/RAJADA na primeira chamada)"""
+    with _LOCK_LIMITADORES:
+        limitador = _LIMITADORES.get(client_id)
+        if limitador is None:
+            limitador = _LIMITADORES[client_id] = LimitadorTaxa(TAXA_MAXIMA, RAJADA)
+        return limitador
+
+
+def estatisticas_limitadores():
+    """Estatísticas de todos os limitadores, por client_id"""
+    with _LOCK_LIMITADORES:
+        limitadores = dict(_LIMITADORES)
+    return {client_id: limitador.como_dict() for client_id, limitador in limitadores.items()}
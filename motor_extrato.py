@@ -0,0 +1,168 @@
+"""
+Motor de cálculo de extratos (colunar, com numpy)
+Centraliza a lógica que antes era repetida linha a linha em cada exportador
+e script de validação:
+- Ordenação cronológica estável pela data da transação
+- Sinal do valor pelo creditDebitType (DEBITO negativo, demais positivos)
+- Saldo anterior = saldo atual - total do período
+- Saldo progressivo após cada transação
+
+As somas usam np.cumsum (acumulação sequencial), então os resultados são
+idênticos, bit a bit, aos do laço "saldo += valor" em Python.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+# Chave de ordenação para datas ausentes ou inválidas (vão para o final)
+CHAVE_DATA_INVALIDA = 99991231
+
+
+def _chave_data(data):
+    """Converte a data da API (DD/MM/YYYY ou YYYY-MM-DD) em inteiro YYYYMMDD"""
+    for formato in ('%d/%m/%Y', '%Y-%m-%d'):
+        try:
+            dt = datetime.strptime(data[:10], formato)
+            return dt.year * 10000 + dt.month * 100 + dt.day
+        except ValueError:
+            continue
+    return CHAVE_DATA_INVALIDA
+
+
+def _data_formatada(data):
+    """Converte YYYY-MM-DD para DD/MM/YYYY; outros formatos são mantidos"""
+    try:
+        return datetime.strptime(data[:10], '%Y-%m-%d').strftime('%d/%m/%Y')
+    except ValueError:
+        return data
+
+
+def _soma_sequencial(valores):
+    """Soma na mesma ordem (e com o mesmo arredondamento) de um laço Python"""
+    if len(valores) == 0:
+        return 0.0
+    return float(np.cumsum(valores)[-1])
+
+
+class Extrato:
+    """
+    Extrato calculado de uma conta, em colunas
+
+    Atributos (todos na ordem cronológica):
+        transacoes: Transações originais (dicionários da API)
+        datas: Datas como vieram da API
+        datas_formatadas: Datas em DD/MM/YYYY (ISO convertido; demais mantidas)
+        valores: np.ndarray com os valores já com sinal
+        saldos: np.ndarray com o saldo após cada transação
+        saldo_atual, saldo_anterior, total, total_creditos, total_debitos
+    """
+
+    def __init__(self, transacoes, datas, datas_formatadas, valores, saldos,
+                 saldo_atual, saldo_anterior, total, total_creditos, total_debitos):
+        self.transacoes = transacoes
+        self.datas = datas
+        self.datas_formatadas = datas_formatadas
+        self.valores = valores
+        self.saldos = saldos
+        self.saldo_atual = saldo_atual
+        self.saldo_anterior = saldo_anterior
+        self.total = total
+        self.total_creditos = total_creditos
+        self.total_debitos = total_debitos
+
+    def __len__(self):
+        return len(self.transacoes)
+
+    @property
+    def saldo_final(self):
+        """Saldo após a última transação (saldo anterior se não houver)"""
+        return float(self.saldos[-1]) if len(self.saldos) else self.saldo_anterior
+
+    def linhas(self):
+        """
+        Itera as linhas do extrato
+
+        Yields:
+            Tuplas (data_formatada, historico, documento, valor, saldo),
+            com valor e saldo como float
+        """
+        for trans, data, valor, saldo in zip(self.transacoes, self.datas_formatadas,
+                                             self.valores.tolist(), self.saldos.tolist()):
+            yield (data, trans.get('transactionName', ''), trans.get('documentNumber', ''), valor, saldo)
+
+
+def calcular_extrato(transacoes, saldo_atual=0):
+    """
+    Ordena as transações e calcula sinais, totais e saldos
+
+    Args:
+        transacoes: Lista de transações da API (pode ser vazia)
+        saldo_atual: Saldo atual da conta (availableAmount), usado para
+            obter o saldo anterior ao período
+
+    Returns:
+        Instância de Extrato
+    """
+    transacoes = list(transacoes or [])
+    n = len(transacoes)
+
+    # Datas: poucas datas distintas por período, então cada uma é
+    # interpretada uma única vez
+    datas_brutas = [trans.get('transactionDate', '') for trans in transacoes]
+    cache_chaves = {}
+    cache_formatadas = {}
+    chaves = np.empty(n, dtype=np.int64)
+    for i, data in enumerate(datas_brutas):
+        if data and len(data) >= 10:
+            chave = cache_chaves.get(data)
+            if chave is None:
+                chave = cache_chaves[data] = _chave_data(data)
+            chaves[i] = chave
+        else:
+            chaves[i] = CHAVE_DATA_INVALIDA
+
+    # Ordenação estável: transações do mesmo dia mantêm a ordem da API
+    ordem = np.argsort(chaves, kind='stable')
+
+    brutos = np.fromiter((float(trans.get('amount', 0)) for trans in transacoes), dtype=np.float64, count=n)
+    debito = np.fromiter((trans.get('creditDebitType', '') == 'DEBITO' for trans in transacoes), dtype=bool, count=n)
+    brutos = brutos[ordem]
+    debito = debito[ordem]
+
+    # Crédito positivo, débito negativo
+    absolutos = np.abs(brutos)
+    valores = np.where(debito, -absolutos, absolutos)
+
+    total = _soma_sequencial(valores) if n else 0
+    saldo_anterior = saldo_atual - total
+
+    # Saldo progressivo: acumulação sequencial a partir do saldo anterior
+    saldos = np.cumsum(np.concatenate(([saldo_anterior], valores)))[1:] if n else np.empty(0)
+
+    ordem_lista = ordem.tolist()
+    transacoes_ordenadas = [transacoes[i] for i in ordem_lista]
+    datas = [datas_brutas[i] for i in ordem_lista]
+
+    datas_formatadas = []
+    for data in datas:
+        if data and len(data) >= 10:
+            formatada = cache_formatadas.get(data)
+            if formatada is None:
+                formatada = cache_formatadas[data] = _data_formatada(data)
+            datas_formatadas.append(formatada)
+        else:
+            datas_formatadas.append(data)
+
+    return Extrato(
+        transacoes=transacoes_ordenadas,
+        datas=datas,
+        datas_formatadas=datas_formatadas,
+        valores=valores,
+        saldos=saldos,
+        saldo_atual=saldo_atual,
+        saldo_anterior=saldo_anterior,
+        total=total,
+        total_creditos=_soma_sequencial(absolutos[~debito]),
+        total_debitos=_soma_sequencial(absolutos[debito]),
+    )
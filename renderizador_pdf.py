@@ -0,0 +1,522 @@
+"""
+Renderização do PDF de extrato no layout IBE Santander
+O layout do ReportLab (quebra da tabela em páginas, estilos) é CPU-bound e,
+rodando na mesma thread das chamadas à API, ocupa um único núcleo. Aqui a
+renderização é uma função de nível de módulo que recebe apenas dados já
+calculados (strings e listas), podendo ser executada em um pool de processos.
+
+Uso:
+    renderizador = obter_renderizador_pdf()       # pool único do processo (criado no 1º PDF grande)
+    futuro = renderizador.submeter(filepath, dados)
+    ...                                           # a thread segue com outras tarefas
+    caminho = renderizador.aguardar(futuro)
+
+O pool é pequeno (MAX_PROCESSOS_PDF, padrão 2), criado só quando um extrato
+com pelo menos LINHAS_MINIMAS_POOL linhas aparece e reaproveitado por todas
+as execuções do processo (ex.: os jobs do dashboard, que rodam dentro do
+servidor Streamlit). Extratos menores são renderizados na própria thread:
+para poucas páginas, o custo de enviar os dados a outro processo não compensa.
+
+O padrão é a tabela única (layout original). Para extratos longos (milhares
+de linhas), o chamador pode optar pelo modo paginado (MODO_PDF_PAGINADO, ou
+MODO_PDF_AUTO acima de LIMITE_TABELA_UNICA linhas): a tabela é emitida
+em blocos de tamanho fixo, um por página, cada um com o cabeçalho repetido e
+as linhas de saldo transportado / a transportar. Cada bloco só cria a Table do
+ReportLab no momento de ser desenhado e a descarta em seguida, então o tempo
+cresce de forma linear com o número de linhas e a memória de layout fica
+limitada ao tamanho do bloco (com uma Table única, o ReportLab re-divide a
+tabela inteira a cada página).
+
+Estilos, TableStyles e os blocos fixos do layout (título, navegação,
+legenda, rótulos do quadro de saldo e rodapé de contatos) são montados uma
+única vez por processo em ModeloIBE; cada PDF só cria os trechos que mudam
+por conta (fundo/agência/conta, período, data/hora, tabela e saldos).
+
+Este módulo não importa buscar_extratos_bancarios (nem as credenciais), para
+que os processos do pool iniciem rápido também com o método spawn (Windows).
+"""
+
+import copy
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable, Flowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_LEFT, TA_RIGHT
+
+# Processos do pool de renderização (0 = renderizar na própria thread)
+MAX_PROCESSOS_PDF = int(os.environ.get("SANTANDER_PROCESSOS_PDF", min(os.cpu_count() or 1, 2)))
+
+# Extratos com menos linhas são renderizados na thread chamadora, sem o pool
+LINHAS_MINIMAS_POOL = 500
+
+# ========== CORES IBE SANTANDER ==========
+# Baseado na análise: RGB(0.933, 0.114, 0.137) = #EE1D23 (vermelho Santander)
+# Texto principal: RGB(0.255, 0.333, 0.369) = #41555E
+COR_VERMELHO_SANTANDER = colors.Color(0.933, 0.114, 0.137)
+COR_TEXTO_PRINCIPAL = colors.Color(0.255, 0.333, 0.369)
+COR_CINZA_CLARO = colors.Color(0.663, 0.663, 0.663)
+
+CABECALHO_TABELA = ['Data', '', 'Histórico', 'Documento', 'Valor (R$)', 'Saldo (R$)']
+
+# Larguras baseadas na análise do PDF (em pts)
+# Análise mostrou: cols muito pequenas no início e fim, maior no meio
+# Largura útil: 538pts (567-29), dividido em: 54, 13, 276, 56, 58, 56 ≈ 513pts
+LARGURAS_COLUNAS = [54, 13, 276, 56, 58, 56]
+
+# Modos da tabela de transações
+MODO_PDF_TABELA_UNICA = 'tabela_unica'   # Uma Table com todas as linhas (layout original, padrão)
+MODO_PDF_PAGINADO = 'paginado'           # Blocos de tamanho fixo, um por página
+MODO_PDF_AUTO = 'auto'                   # Paginado acima de LIMITE_TABELA_UNICA linhas
+LIMITE_TABELA_UNICA = 1000
+
+# Linhas de transação por bloco no modo paginado: cabeçalho 24pt + 20pt por
+# linha (incluindo saldos de transporte) em ~772pt úteis de uma página A4;
+# na 1ª página sobram ~610pt depois do cabeçalho IBE
+LINHAS_PRIMEIRO_BLOCO = 27
+LINHAS_POR_BLOCO = 35
+
+CONTATOS = [
+    "<b>Central de Atendimento Santander Empresarial</b> - Das 8h às 20h, de segunda a sexta-feira",
+    "4004-2125 (Capitais e Regiões Metropolitanas)",
+    "0800 702 2125 (Demais Localidades)",
+    "",
+    "<b>Central de Atendimento Getnet</b> - Atendimento 24h por dia, todos os dias",
+    "4002-4000 (Capitais e Regiões Metropolitanas)",
+    "4003-4000 (Capitais e Regiões Metropolitanas)",
+    "0800 648 8000 (Demais Localidades)",
+    "",
+    "<b>Central de Vendas PJ</b> - Das 8h às 20h, de segunda a sexta-feira, exceto feriados.",
+    "0800 013 7333",
+    "",
+    "<b>SAC</b> - Atendimento 24h por dia, todos os dias.",
+    "Reclamações cancelamentos e informações:",
+    "0800 762 7777",
+    "",
+    "<b>Ouvidoria</b> - Disponível das 9h às 18h, de segunda a sexta-feira, exceto feriados.",
+    "Se não ficar satisfeito com a solução apresentada:",
+    "0800 726 0322",
+    "55 (11) 3012 0322 (No exterior, ligue a cobrar)"
+]
+
+
+# Quadro de saldo: None marca as células preenchidas com os dados da conta
+QUADRO_SALDO = [
+    ['', 'Saldo', 'Valor (R$)', ''],
+    ['', None, '', ''],                                  # Posição em:
+    ['', '', '', ''],
+    ['', 'Saldo', 'Valor (R$)', ''],
+    ['', 'A - Saldo de Conta Corrente', None, ''],
+    ['', 'B - Saldo Bloqueado', None, ''],
+    ['', '    Desbloqueio em 1 dia', '0,00', ''],
+    ['', '    Desbloqueio em 2 dias', '0,00', ''],
+    ['', '    Desbloqueio em mais de 2 dias', '0,00', ''],
+    [None, '', '', ''],                                  # C - Saldo Disponível
+]
+
+# Larguras aproximadas da tabela de saldo
+LARGURAS_QUADRO_SALDO = [10, 370, 80, 10]
+
+LEGENDA = [
+    "<b>a</b> = Bloqueio Dia / ADM    Entenda a composição do seu saldo no quadro abaixo.",
+    "<b>b</b> = Bloqueado",
+    "<b>p</b> = Lançamento Provisionado",
+]
+
+
+def _estilo(styles, nome, **kwargs):
+    kwargs.setdefault('fontName', 'Helvetica')
+    kwargs.setdefault('textColor', COR_TEXTO_PRINCIPAL)
+    kwargs.setdefault('alignment', TA_LEFT)
+    return ParagraphStyle(nome, parent=styles['Normal'], **kwargs)
+
+
+def _comandos_estilo_tabela():
+    """Estilo da tabela IBE (simples, linhas finas)"""
+    return [
+        # Cabeçalho
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 7),
+        ('TEXTCOLOR', (0, 0), (-1, 0), COR_TEXTO_PRINCIPAL),
+        ('ALIGN', (0, 0), (1, 0), 'LEFT'),
+        ('ALIGN', (2, 0), (3, 0), 'LEFT'),
+        ('ALIGN', (4, 0), (5, 0), 'RIGHT'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('TOPPADDING', (0, 0), (-1, 0), 6),
+
+        # Corpo
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 7),
+        ('TEXTCOLOR', (0, 1), (-1, -1), COR_TEXTO_PRINCIPAL),
+        ('ALIGN', (0, 1), (1, -1), 'LEFT'),
+        ('ALIGN', (2, 1), (3, -1), 'LEFT'),
+        ('ALIGN', (4, 1), (5, -1), 'RIGHT'),
+
+        # Bordas externas
+        ('BOX', (0, 0), (-1, -1), 0.5, COR_CINZA_CLARO),
+        # Linhas internas horizontais
+        ('LINEBELOW', (0, 0), (-1, -2), 0.25, COR_CINZA_CLARO),
+        # Linhas internas verticais
+        ('LINEAFTER', (0, 0), (-2, -1), 0.25, COR_CINZA_CLARO),
+
+        # Padding
+        ('TOPPADDING', (0, 1), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 3),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+    ]
+
+
+def _comandos_estilo_saldo():
+    """Estilo do quadro de saldo"""
+    return [
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),
+        ('TEXTCOLOR', (0, 0), (-1, -1), COR_TEXTO_PRINCIPAL),
+        ('FONTNAME', (1, 0), (2, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 3), (2, 3), 'Helvetica-Bold'),
+        ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('BOX', (0, 0), (-1, -1), 0.5, COR_CINZA_CLARO),
+        ('LINEBELOW', (0, 0), (-1, 0), 0.5, COR_CINZA_CLARO),
+        ('LINEBELOW', (0, 3), (-1, 3), 0.5, COR_CINZA_CLARO),
+        ('LINEAFTER', (0, 0), (-2, -1), 0.25, COR_CINZA_CLARO),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+        ('LEFTPADDING', (0, 0), (-1, -1), 4),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+    ]
+
+
+class ModeloIBE:
+    """
+    Partes fixas do PDF IBE, montadas uma vez por processo (_modelo_ibe)
+
+    Estilos e TableStyles são só lidos durante o layout e podem ser
+    compartilhados. Os Paragraphs fixos já chegam com o markup interpretado;
+    como o ReportLab guarda o resultado do wrap no próprio flowable, cada PDF
+    recebe cópias rasas deles (threads renderizando ao mesmo tempo não se
+    atrapalham).
+    """
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        # Título com fonte 18.1pt (análise mostrou LiberationSans, usamos Helvetica como substituto)
+        self.header_style = _estilo(styles, 'IBEHeader', fontSize=18, textColor=COR_VERMELHO_SANTANDER,
+                                    alignment=TA_RIGHT, spaceAfter=20)
+        # Linha com Nome do Fundo, Agência e Conta (fonte 7pt como no exemplo)
+        self.fund_info_style = _estilo(styles, 'FundInfo', fontSize=7, spaceAfter=10)
+        # Navegação (Conta Corrente > Extrato > Consultar) - fonte 8.2pt
+        self.nav_style = _estilo(styles, 'Navigation', fontSize=8.2, spaceAfter=2)
+        # "Consultar" em fonte maior (10.5pt)
+        self.consultar_style = _estilo(styles, 'Consultar', fontSize=10.5, spaceAfter=15)
+        # Opções de pesquisa e período (fonte 7pt)
+        self.info_style = _estilo(styles, 'InfoLine', fontSize=7, leading=10)
+        self.legend_style = _estilo(styles, 'Legend', fontSize=7, leading=10)
+        self.footer_style = _estilo(styles, 'Footer', fontSize=7, leading=9)
+
+        self.estilo_tabela = TableStyle(_comandos_estilo_tabela())
+        self.estilo_saldo = TableStyle(_comandos_estilo_saldo())
+
+        self.titulo = Paragraph("Internet Banking Empresarial", self.header_style)
+        self.navegacao = [
+            Paragraph("Conta Corrente > Extrato >", self.nav_style),
+            Paragraph("Consultar", self.consultar_style),
+            Paragraph("<b>Opção de Pesquisa:</b> Todos", self.info_style),
+        ]
+        self.legenda = [Paragraph(linha, self.legend_style) for linha in LEGENDA]
+        self.rodape = [Paragraph(linha, self.footer_style) for linha in CONTATOS]
+
+    @staticmethod
+    def copias(flowables):
+        return [copy.copy(f) for f in flowables]
+
+    @staticmethod
+    def quadro_saldo(dados):
+        """Linhas do quadro de saldo com os valores da conta"""
+        linhas = [list(linha) for linha in QUADRO_SALDO]
+        linhas[1][1] = f"Posição em:{dados['data_posicao']}"
+        linhas[4][2] = dados['saldo_conta']
+        linhas[5][2] = dados['saldo_bloqueado']
+        linhas[9][0] = 'C - Saldo Disponível em Conta Corrente (A - B) ' + dados['saldo_disponivel']
+        return linhas
+
+
+_modelo = None
+_lock_modelo = threading.Lock()
+
+
+def _modelo_ibe():
+    """ModeloIBE do processo (criado na primeira renderização)"""
+    global _modelo
+    if _modelo is None:
+        with _lock_modelo:
+            if _modelo is None:
+                _modelo = ModeloIBE()
+    return _modelo
+
+
+class BlocoTabela(Flowable):
+    """
+    Bloco de linhas da tabela de transações (modo paginado)
+
+    Guarda só as linhas (strings); a Table do ReportLab é criada em wrap()
+    e descartada logo após ser desenhada. Um bloco que não cabe no espaço
+    restante vai inteiro para a página seguinte.
+    """
+
+    def __init__(self, linhas, estilo, destaques, altura_pagina):
+        Flowable.__init__(self)
+        self.linhas = linhas
+        self.estilo = estilo
+        self.destaques = destaques
+        self.altura_pagina = altura_pagina
+        self._tabela = None
+
+    def _criar_tabela(self):
+        if self._tabela is None:
+            self._tabela = Table([CABECALHO_TABELA] + self.linhas, colWidths=LARGURAS_COLUNAS, repeatRows=1)
+            self._tabela.setStyle(self.estilo)
+            for linha in self.destaques:
+                self._tabela.setStyle([('FONTNAME', (0, linha), (-1, linha), 'Helvetica-Bold')])
+        return self._tabela
+
+    def wrap(self, availWidth, availHeight):
+        self.width, self.height = self._criar_tabela().wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        if self.height <= self.altura_pagina:
+            return []  # Cabe em uma página: começar na próxima
+        return self._criar_tabela().split(availWidth, availHeight)
+
+    def draw(self):
+        self._tabela.drawOn(self.canv, 0, 0)
+        self._tabela = None
+
+
+def _usar_paginado(modo, num_linhas):
+    if modo == MODO_PDF_PAGINADO:
+        return True
+    if modo == MODO_PDF_TABELA_UNICA:
+        return False
+    return num_linhas > LIMITE_TABELA_UNICA
+
+
+def _blocos_paginados(linhas, altura_pagina, estilo):
+    """
+    Divide as linhas em blocos de página com saldos de transporte
+
+    Cada bloco (exceto o primeiro) começa com SALDO TRANSPORTADO e cada
+    bloco (exceto o último) termina com SALDO A TRANSPORTAR, ambos com o
+    saldo após a última linha do bloco anterior.
+    """
+    blocos = []
+    inicio = 0
+    tamanho = LINHAS_PRIMEIRO_BLOCO
+    while inicio < len(linhas):
+        fim = min(inicio + tamanho, len(linhas))
+        bloco = list(linhas[inicio:fim])
+        destaques = []
+        if inicio > 0:
+            bloco.insert(0, ['', '', 'SALDO TRANSPORTADO', '', '', linhas[inicio - 1][5]])
+            destaques.append(1)
+        if fim < len(linhas):
+            bloco.append(['', '', 'SALDO A TRANSPORTAR', '', '', linhas[fim - 1][5]])
+            destaques.append(len(bloco))
+        blocos.append(BlocoTabela(bloco, estilo, destaques, altura_pagina))
+        inicio = fim
+        tamanho = LINHAS_POR_BLOCO
+    return blocos
+
+
+def renderizar_extrato_pdf(filepath, dados, modo=MODO_PDF_TABELA_UNICA):
+    """
+    Gera o arquivo PDF a partir dos dados já calculados do extrato
+
+    Executada tanto na thread chamadora quanto em um processo do pool, por
+    isso recebe apenas tipos simples (serializáveis com pickle).
+
+    Args:
+        filepath: Caminho do arquivo a gerar
+        dados: Dicionário com
+            fundo_nome, agencia, conta: Identificação da conta
+            periodo_inicio, periodo_fim: Textos do período
+            data_hora: Texto "DD/MM/YYYY às HHhMM"
+            data_posicao: Data (DD/MM/YYYY) do quadro de saldo
+            linhas: Linhas da tabela, sem o cabeçalho: [data, '', histórico,
+                documento, valor, saldo] já formatadas (inclui SALDO ANTERIOR)
+            saldo_conta, saldo_bloqueado, saldo_disponivel: Valores formatados
+        modo: MODO_PDF_TABELA_UNICA (padrão), MODO_PDF_PAGINADO ou MODO_PDF_AUTO
+
+    Returns:
+        filepath
+    """
+    # Criar documento PDF com margens exatas do IBE (29pts = 10.23mm)
+    doc = SimpleDocTemplate(filepath, pagesize=A4,
+                            rightMargin=28, leftMargin=29,
+                            topMargin=29, bottomMargin=29)
+
+    modelo = _modelo_ibe()
+    elements = []
+
+    # ========== CABEÇALHO IBE ==========
+    # Título "Internet Banking Empresarial"
+    elements.append(copy.copy(modelo.titulo))
+
+    # Linha separadora (como no exemplo - linha fina cinza)
+    elements.append(HRFlowable(width="100%", thickness=1, color=COR_CINZA_CLARO, spaceAfter=15))
+
+    # Formato exato do IBE: "FUNDO...    Agência: XXXX    Conta: XXXXXXXXX"
+    fund_line = f"{dados['fundo_nome'].upper()}    Agência: {dados['agencia']}    Conta: {dados['conta']}"
+    elements.append(Paragraph(fund_line, modelo.fund_info_style))
+
+    # Linha separadora
+    elements.append(HRFlowable(width="100%", thickness=1, color=COR_CINZA_CLARO, spaceAfter=10))
+
+    # Navegação, "Consultar" e opção de pesquisa (fixos)
+    elements.extend(modelo.copias(modelo.navegacao))
+    elements.append(Paragraph(f"<b>Períodos:</b> {dados['periodo_inicio']} a {dados['periodo_fim']}", modelo.info_style))
+    elements.append(Paragraph(f"<b>Data/Hora:</b> {dados['data_hora']}", modelo.info_style))
+    elements.append(Spacer(1, 10))
+
+    # ========== TABELA DE TRANSAÇÕES ==========
+    # Baseado na análise: tabela com 6 colunas, fonte 7pt (cabeçalho com coluna vazia após Data)
+    if _usar_paginado(modo, len(dados['linhas'])):
+        elements.extend(_blocos_paginados(dados['linhas'], doc.height - 12, modelo.estilo_tabela))  # 12 = padding do frame
+    else:
+        table_data = [CABECALHO_TABELA] + dados['linhas']
+        table = Table(table_data, colWidths=LARGURAS_COLUNAS)
+        table.setStyle(modelo.estilo_tabela)
+        elements.append(table)
+    elements.append(Spacer(1, 10))
+
+    # ========== LEGENDA ==========
+    elements.extend(modelo.copias(modelo.legenda))
+    elements.append(Spacer(1, 8))
+
+    # ========== QUADRO DE SALDO ==========
+    # Baseado na análise: formato exato do IBE
+    saldo_table = Table(modelo.quadro_saldo(dados), colWidths=LARGURAS_QUADRO_SALDO)
+    saldo_table.setStyle(modelo.estilo_saldo)
+
+    elements.append(saldo_table)
+    elements.append(Spacer(1, 15))
+
+    # ========== RODAPÉ COM CONTATOS ==========
+    elements.extend(modelo.copias(modelo.rodape))
+
+    # Gerar PDF
+    doc.build(elements)
+    return filepath
+
+
+class RenderizadorPDF:
+    """
+    Pool de processos para renderizar PDFs de extrato
+
+    O pool só é criado no primeiro extrato com LINHAS_MINIMAS_POOL linhas ou
+    mais; extratos menores são renderizados na thread chamadora. Com
+    processos=0 (ou se o pool não puder ser criado) tudo é renderizado na
+    própria thread, como antes. Se um processo do pool morrer, o PDF afetado
+    é renderizado na thread chamadora e um novo pool é criado no próximo PDF.
+    """
+
+    def __init__(self, processos=MAX_PROCESSOS_PDF, linhas_minimas=LINHAS_MINIMAS_POOL):
+        self.processos = processos
+        self.linhas_minimas = linhas_minimas
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def ativo(self):
+        """True se PDFs grandes são renderizados em processos separados"""
+        return bool(self.processos and self.processos > 0)
+
+    def _obter_pool(self):
+        with self._lock:
+            if self._pool is None and self.ativo:
+                try:
+                    self._pool = ProcessPoolExecutor(max_workers=self.processos)
+                except (OSError, NotImplementedError, ValueError):
+                    self.processos = 0  # Sem suporte a processos: renderizar sempre na thread
+            return self._pool
+
+    def _descartar_pool(self, pool):
+        """Pool quebrado (processo morto): o próximo PDF grande cria outro"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def submeter(self, filepath, dados, modo=MODO_PDF_TABELA_UNICA):
+        """
+        Agenda a renderização
+
+        Returns:
+            Future (no pool) ou o próprio caminho (renderização imediata)
+        """
+        pool = self._obter_pool() if len(dados['linhas']) >= self.linhas_minimas else None
+        if pool is None:
+            return renderizar_extrato_pdf(filepath, dados, modo)
+        try:
+            futuro = pool.submit(renderizar_extrato_pdf, filepath, dados, modo)
+        except (BrokenProcessPool, RuntimeError):
+            self._descartar_pool(pool)
+            return renderizar_extrato_pdf(filepath, dados, modo)
+        futuro.argumentos = (filepath, dados, modo)
+        futuro.pool = pool
+        return futuro
+
+    def aguardar(self, futuro):
+        """Retorna o caminho do PDF (exceções da renderização são propagadas)"""
+        if isinstance(futuro, str):
+            return futuro
+        try:
+            return futuro.result()
+        except BrokenProcessPool:
+            self._descartar_pool(futuro.pool)
+            return renderizar_extrato_pdf(*futuro.argumentos)
+
+    def renderizar(self, filepath, dados, modo=MODO_PDF_TABELA_UNICA):
+        """Renderiza e espera o resultado"""
+        return self.aguardar(self.submeter(filepath, dados, modo))
+
+    def encerrar(self, aguardar=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=aguardar)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.encerrar()
+
+
+# Renderizadores do processo, um por número de processos (ver obter_renderizador_pdf)
+_RENDERIZADORES = {}
+_LOCK_RENDERIZADORES = threading.Lock()
+
+
+def obter_renderizador_pdf(processos=None):
+    """
+    Renderizador compartilhado pelo processo (o pool sobrevive entre execuções de main)
+
+    Args:
+        processos: Tamanho do pool (None = MAX_PROCESSOS_PDF)
+
+    Returns:
+        RenderizadorPDF (o pool só é criado no primeiro PDF grande)
+    """
+    processos = MAX_PROCESSOS_PDF if processos is None else processos
+    with _LOCK_RENDERIZADORES:
+        renderizador = _RENDERIZADORES.get(processos)
+        if renderizador is None:
+            renderizador = _RENDERIZADORES[processos] = RenderizadorPDF(processos)
+        return renderizador
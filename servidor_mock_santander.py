@@ -0,0 +1,643 @@
+"""
+Servidor mock da API Open Banking Santander (extratos e comprovantes)
+Substituto local para medir vazão e testar o fluxo completo sem credenciais
+reais nem acesso à rede do banco.
+
+Endpoints implementados (mesmos caminhos da API real):
+- POST /auth/oauth/v2/token
+- GET  /bank_account_information/v1/banks/{banco}/accounts
+- GET  /bank_account_information/v1/banks/{banco}/balances/{AAAA.CCCCCCCCCCCC}
+- GET  /bank_account_information/v1/banks/{banco}/statements/{AAAA.CCCCCCCCCCCC}
+- GET  /consult_payment_receipts/v1/payment_receipts
+- POST /consult_payment_receipts/v1/payment_receipts/{paymentId}/file_requests
+- GET  /consult_payment_receipts/v1/payment_receipts/{paymentId}/file_requests[/{requestId}]
+- GET  /arquivos/{paymentId}.pdf  (download do comprovante, sem autenticação)
+
+Latência, jitter, tamanho máximo de página, taxas de erro (503 e 429) e o
+volume de dados são configuráveis. Os dados são determinísticos (mesma seed,
+mesmas contas e transações). TLS e mTLS são opcionais.
+
+Uso:
+    python servidor_mock_santander.py --porta 8080 --contas 3 --transacoes 5000
+    SANTANDER_API_BASE_URL=http://127.0.0.1:8080 python buscar_extratos_bancarios.py
+
+    # Em código (ex.: benchmark_extratos.py)
+    with ServidorMockSantander(ConfiguracaoMock(latencia=0.05)) as servidor:
+        print(servidor.url_base)
+"""
+
+import argparse
+import bisect
+import json
+import random
+import re
+import ssl
+import threading
+import time
+import uuid
+import zlib
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PREFIXO_CONTAS = "/bank_account_information/v1/banks/"
+PREFIXO_COMPROVANTES = "/consult_payment_receipts/v1/payment_receipts"
+
+HISTORICOS = (
+    "PIX RECEBIDO", "PIX ENVIADO", "TED RECEBIDA", "TED ENVIADA",
+    "PAGAMENTO DE BOLETO", "LIQUIDACAO DE COBRANCA", "TARIFA BANCARIA",
+    "APLICACAO AUTOMATICA", "RESGATE AUTOMATICO", "PAGFOR FORNECEDOR",
+)
+
+ROTA_STATEMENTS = re.compile(r"^/bank_account_information/v1/banks/[^/]+/statements/([^/]+)$")
+ROTA_BALANCES = re.compile(r"^/bank_account_information/v1/banks/[^/]+/balances/([^/]+)$")
+ROTA_ACCOUNTS = re.compile(r"^/bank_account_information/v1/banks/[^/]+/accounts$")
+ROTA_FILE_REQUESTS = re.compile(r"^/consult_payment_receipts/v1/payment_receipts/([^/]+)/file_requests(?:/([^/]+))?$")
+ROTA_ARQUIVO = re.compile(r"^/arquivos/([^/]+)\.pdf$")
+
+
+class ConfiguracaoMock:
+    """
+    Parâmetros do servidor mock
+
+    Args:
+        latencia: Atraso fixo por requisição (segundos)
+        jitter: Atraso aleatório adicional, de 0 a jitter (segundos)
+        latencia_por_registro: Atraso adicional por transação devolvida (segundos)
+        tamanho_pagina_max: Máximo de transações por página (o _limit é limitado a ele)
+        taxa_erro: Fração das requisições de dados respondidas com 503
+        taxa_429: Fração das requisições de dados respondidas com 429
+        retry_after: Valor do cabeçalho Retry-After nas respostas 429 (segundos)
+        num_contas: Contas por fundo (client_id)
+        transacoes_por_conta: Transações geradas por conta
+        dias: Quantidade de dias (até hoje) em que as transações são distribuídas
+        comprovantes_por_dia: Comprovantes de pagamento por dia consultado
+        tempo_geracao_pdf: Segundos até um comprovante solicitado ficar AVAILABLE
+        expires_in: Validade dos tokens emitidos (segundos)
+        seed: Semente dos dados gerados
+        cert_path, key_path: Certificado do servidor (ativa HTTPS)
+        ca_clientes: CA para validar o certificado do cliente (ativa mTLS)
+    """
+
+    def __init__(self, latencia=0.0, jitter=0.0, latencia_por_registro=0.0, tamanho_pagina_max=1000,
+                 taxa_erro=0.0, taxa_429=0.0, retry_after=1, num_contas=2, transacoes_por_conta=2000,
+                 dias=30, comprovantes_por_dia=5, tempo_geracao_pdf=0.5, expires_in=900, seed=42,
+                 cert_path=None, key_path=None, ca_clientes=None):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.latencia_por_registro = latencia_por_registro
+        self.tamanho_pagina_max = tamanho_pagina_max
+        self.taxa_erro = taxa_erro
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.num_contas = num_contas
+        self.transacoes_por_conta = transacoes_por_conta
+        self.dias = dias
+        self.comprovantes_por_dia = comprovantes_por_dia
+        self.tempo_geracao_pdf = tempo_geracao_pdf
+        self.expires_in = expires_in
+        self.seed = seed
+        self.cert_path = cert_path
+        self.key_path = key_path
+        self.ca_clientes = ca_clientes
+
+
+class DadosMock:
+    """Contas, transações e comprovantes gerados de forma determinística"""
+
+    def __init__(self, config):
+        self.config = config
+        self.hoje = date.today()
+        self._lock = threading.Lock()
+        self._transacoes = {}      # account_id -> (ordinais, transações, saldo)
+        self._comprovantes = {}    # data ISO -> lista de comprovantes
+        self._pagamentos = {}      # paymentId -> comprovante
+        self._solicitacoes = {}    # paymentId -> [(requestId, instante)]
+
+    def contas(self, client_id):
+        """Contas do fundo: números derivados do client_id (fundos diferentes, contas diferentes)"""
+        base = 130000000 + (zlib.crc32(client_id.encode()) % 90000) * 10
+        return [{"branchCode": "2271", "number": str(base + i)} for i in range(self.config.num_contas)]
+
+    def _gerar_conta(self, account_id):
+        rng = random.Random(f"{self.config.seed}:{account_id}")
+        dias = max(1, self.config.dias)
+        registros = []
+        for _ in range(self.config.transacoes_por_conta):
+            dia = self.hoje - timedelta(days=rng.randrange(dias))
+            debito = rng.random() < 0.55
+            registros.append((dia.toordinal(), {
+                "transactionDate": dia.strftime("%d/%m/%Y"),
+                "transactionName": rng.choice(HISTORICOS),
+                "documentNumber": str(rng.randint(100000, 999999)),
+                "amount": f"{rng.uniform(1, 50000):.2f}",
+                "creditDebitType": "DEBITO" if debito else "CREDITO",
+            }))
+        registros.sort(key=lambda r: r[0])
+        saldo = rng.uniform(100000, 10000000)
+        return [r[0] for r in registros], [r[1] for r in registros], saldo
+
+    def _conta(self, account_id):
+        with self._lock:
+            dados = self._transacoes.get(account_id)
+            if dados is None:
+                dados = self._transacoes[account_id] = self._gerar_conta(account_id)
+            return dados
+
+    def saldo(self, account_id):
+        saldo = self._conta(account_id)[2]
+        return {
+            "availableAmount": f"{saldo:.2f}",
+            "blockedAmount": "0.00",
+            "automaticallyInvestedAmount": "0.00",
+        }
+
+    def transacoes(self, account_id, data_inicial, data_final):
+        """Transações do período (datas inclusivas), em ordem cronológica"""
+        ordinais, transacoes, _saldo = self._conta(account_id)
+        inicio = bisect.bisect_left(ordinais, data_inicial.toordinal())
+        fim = bisect.bisect_right(ordinais, data_final.toordinal())
+        return transacoes[inicio:fim]
+
+    def comprovantes(self, data_inicial, data_final):
+        """Comprovantes de pagamento do período (N por dia, gerados sob demanda)"""
+        resultado = []
+        dia = data_inicial
+        while dia <= data_final:
+            chave = dia.isoformat()
+            with self._lock:
+                do_dia = self._comprovantes.get(chave)
+                if do_dia is None:
+                    do_dia = self._comprovantes[chave] = self._gerar_comprovantes(dia)
+                    for comprovante in do_dia:
+                        self._pagamentos[comprovante["payment"]["paymentId"]] = comprovante
+            resultado.extend(do_dia)
+            dia += timedelta(days=1)
+        return resultado
+
+    def _gerar_comprovantes(self, dia):
+        rng = random.Random(f"{self.config.seed}:comprovantes:{dia.isoformat()}")
+        comprovantes = []
+        for i in range(self.config.comprovantes_por_dia):
+            comprovantes.append({"payment": {
+                "paymentId": str(uuid.UUID(int=rng.getrandbits(128))),
+                "requestValueDate": dia.isoformat(),
+                "payer": {"name": "FUNDO MOCK", "person": {"document": {"documentNumber": "00000000000191"}}},
+                "payee": {"name": f"FORNECEDOR {i + 1:03d}",
+                          "person": {"document": {"documentNumber": f"{rng.randint(0, 99999999999999):014d}"}}},
+                "paymentAmountInfo": {"direct": {"amount": f"{rng.uniform(10, 100000):.2f}"}},
+            }})
+        return comprovantes
+
+    def pagamento_existe(self, payment_id):
+        with self._lock:
+            return payment_id in self._pagamentos
+
+    def solicitar_arquivo(self, payment_id):
+        request_id = uuid.uuid4().hex
+        with self._lock:
+            self._solicitacoes.setdefault(payment_id, []).insert(0, (request_id, time.monotonic()))
+        return request_id
+
+    def solicitacoes(self, payment_id):
+        with self._lock:
+            return list(self._solicitacoes.get(payment_id, []))
+
+    def solicitacao(self, payment_id, request_id):
+        for rid, instante in self.solicitacoes(payment_id):
+            if rid == request_id:
+                return rid, instante
+        return None
+
+
+class EstatisticasMock:
+    """Contadores thread-safe de requisições, erros simulados e bytes por rota"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rotas = {}
+
+    def registrar(self, rota, status, tamanho):
+        with self._lock:
+            estat = self._rotas.setdefault(rota, {'requisicoes': 0, 'erros': 0, 'bytes': 0, 'status': {}})
+            estat['requisicoes'] += 1
+            estat['bytes'] += tamanho
+            estat['status'][status] = estat['status'].get(status, 0) + 1
+            if status >= 400:
+                estat['erros'] += 1
+
+    def como_dict(self):
+        with self._lock:
+            return {rota: dict(estat, status=dict(estat['status'])) for rota, estat in self._rotas.items()}
+
+    def requisicoes(self, rota):
+        with self._lock:
+            return self._rotas.get(rota, {}).get('requisicoes', 0)
+
+    def zerar(self):
+        with self._lock:
+            self._rotas.clear()
+
+
+def _pdf_comprovante(payment_id):
+    """PDF mínimo (válido) identificando o pagamento"""
+    texto = f"Comprovante {payment_id}".encode("latin-1", "replace")
+    conteudo = b"BT /F1 12 Tf 72 720 Td (" + texto + b") Tj ET"
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(conteudo)).encode() + b" >>\nstream\n" + conteudo + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    posicoes = []
+    for i, objeto in enumerate(objetos, 1):
+        posicoes.append(len(pdf))
+        pdf += f"{i} 0 obj\n".encode() + objeto + b"\nendobj\n"
+    inicio_xref = len(pdf)
+    pdf += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    for posicao in posicoes:
+        pdf += f"{posicao:010d} 00000 n \n".encode()
+    pdf += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode()
+    return pdf
+
+
+class ManipuladorMock(BaseHTTPRequestHandler):
+    """Trata as requisições; o estado fica no ServidorMockSantander (self.server.mock)"""
+
+    protocol_version = "HTTP/1.1"   # Keep-alive, como a API real
+
+    def log_message(self, formato, *args):
+        pass  # Silencioso: as estatísticas ficam em EstatisticasMock
+
+    # ------------------------------------------------------------------ #
+    # Respostas
+    # ------------------------------------------------------------------ #
+    def _responder(self, rota, status, corpo=None, content_type="application/json", cabecalhos=None):
+        if corpo is None:
+            dados = b""
+        elif isinstance(corpo, bytes):
+            dados = corpo
+        else:
+            dados = json.dumps(corpo).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+        self.server.mock.estatisticas.registrar(rota, status, len(dados))
+
+    def _erro(self, rota, status, mensagem, cabecalhos=None):
+        corpo = {"errors": [{"code": str(status), "message": mensagem}]}
+        self._responder(rota, status, corpo, cabecalhos=cabecalhos)
+
+    def _aguardar(self, registros=0):
+        config = self.server.mock.config
+        atraso = config.latencia + config.latencia_por_registro * registros
+        if config.jitter:
+            atraso += self.server.mock.aleatorio(config.jitter)
+        if atraso > 0:
+            time.sleep(atraso)
+
+    def _falha_simulada(self, rota):
+        """Responde 429/503 conforme as taxas configuradas; True se respondeu"""
+        config = self.server.mock.config
+        sorteio = self.server.mock.aleatorio(1.0)
+        if sorteio < config.taxa_429:
+            self._erro(rota, 429, "Too Many Requests", {"Retry-After": str(config.retry_after)})
+            return True
+        if sorteio < config.taxa_429 + config.taxa_erro:
+            self._erro(rota, 503, "Service Unavailable (simulado)")
+            return True
+        return False
+
+    def _autorizado(self, rota):
+        autorizacao = self.headers.get("Authorization", "")
+        if autorizacao.startswith("Bearer ") and self.server.mock.token_valido(autorizacao[7:]):
+            return True
+        self._erro(rota, 401, "Token ausente, inválido ou expirado")
+        return False
+
+    def _url_base(self):
+        esquema = "https" if self.server.mock.usa_tls else "http"
+        return f"{esquema}://{self.headers.get('Host', '%s:%s' % self.server.server_address[:2])}"
+
+    # ------------------------------------------------------------------ #
+    # Roteamento
+    # ------------------------------------------------------------------ #
+    def do_POST(self):
+        partes = urlsplit(self.path)
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = self.rfile.read(tamanho) if tamanho else b""
+
+        if partes.path == "/auth/oauth/v2/token":
+            return self._token(corpo)
+
+        rota = ROTA_FILE_REQUESTS.match(partes.path)
+        if rota and not rota.group(2):
+            return self._solicitar_arquivo(rota.group(1))
+
+        self._erro("desconhecida", 404, f"Rota não encontrada: POST {partes.path}")
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(partes.query).items()}
+
+        rota = ROTA_STATEMENTS.match(partes.path)
+        if rota:
+            return self._statements(rota.group(1), params)
+        rota = ROTA_BALANCES.match(partes.path)
+        if rota:
+            return self._balances(rota.group(1))
+        if ROTA_ACCOUNTS.match(partes.path):
+            return self._accounts()
+        if partes.path == PREFIXO_COMPROVANTES:
+            return self._listar_comprovantes(params)
+        rota = ROTA_FILE_REQUESTS.match(partes.path)
+        if rota:
+            return self._consultar_arquivo(rota.group(1), rota.group(2))
+        rota = ROTA_ARQUIVO.match(partes.path)
+        if rota:
+            return self._arquivo(rota.group(1))
+
+        self._erro("desconhecida", 404, f"Rota não encontrada: GET {partes.path}")
+
+    # ------------------------------------------------------------------ #
+    # Endpoints
+    # ------------------------------------------------------------------ #
+    def _token(self, corpo):
+        rota = "token"
+        self._aguardar()
+        if not self.headers.get("Authorization", "").startswith("Basic "):
+            return self._erro(rota, 401, "Credenciais do cliente ausentes")
+        form = {k: v[-1] for k, v in parse_qs(corpo.decode()).items()}
+        if form.get("grant_type") != "client_credentials":
+            return self._erro(rota, 400, "grant_type inválido")
+        config = self.server.mock.config
+        self._responder(rota, 200, {
+            "access_token": self.server.mock.emitir_token(),
+            "token_type": "Bearer",
+            "expires_in": config.expires_in,
+            "scope": form.get("scope", ""),
+        })
+
+    def _accounts(self):
+        rota = "accounts"
+        self._aguardar()
+        if not self._autorizado(rota) or self._falha_simulada(rota):
+            return
+        contas = self.server.mock.dados.contas(self.headers.get("X-Application-Key", ""))
+        self._responder(rota, 200, {
+            "_pageable": {"_limit": 50, "_offset": 1, "_pageNumber": 1,
+                          "_pageElements": len(contas), "totalPages": 1, "totalElements": len(contas)},
+            "_content": contas,
+        })
+
+    def _balances(self, account_id):
+        rota = "balances"
+        self._aguardar()
+        if not self._autorizado(rota) or self._falha_simulada(rota):
+            return
+        self._responder(rota, 200, self.server.mock.dados.saldo(account_id))
+
+    def _statements(self, account_id, params):
+        rota = "statements"
+        try:
+            data_inicial = datetime.strptime(params["initialDate"], "%Y-%m-%d").date()
+            data_final = datetime.strptime(params["finalDate"], "%Y-%m-%d").date()
+            pagina = max(1, int(params.get("_offset", 1)))
+            limite = max(1, int(params.get("_limit", 50)))
+        except (KeyError, ValueError) as e:
+            self._aguardar()
+            return self._erro(rota, 400, f"Parâmetros inválidos: {e}")
+
+        limite = min(limite, self.server.mock.config.tamanho_pagina_max)
+        transacoes = self.server.mock.dados.transacoes(account_id, data_inicial, data_final)
+        conteudo = transacoes[(pagina - 1) * limite:pagina * limite]
+
+        self._aguardar(len(conteudo))
+        if not self._autorizado(rota) or self._falha_simulada(rota):
+            return
+
+        total_paginas = (len(transacoes) + limite - 1) // limite
+        links = {"_first": {"href": f"{self.path.split('?')[0]}?_offset=1&_limit={limite}"}}
+        if pagina < total_paginas:
+            links["next"] = {"href": f"{self.path.split('?')[0]}?_offset={pagina + 1}&_limit={limite}"}
+        self._responder(rota, 200, {
+            "_pageable": {
+                "_limit": limite,
+                "_offset": pagina,
+                "_pageNumber": pagina,
+                "_pageElements": len(conteudo),
+                "totalPages": total_paginas,
+                "totalRecords": len(transacoes),
+            },
+            "_content": conteudo,
+            "_links": links,
+        })
+
+    def _listar_comprovantes(self, params):
+        rota = "comprovantes"
+        self._aguardar()
+        if not self._autorizado(rota) or self._falha_simulada(rota):
+            return
+        try:
+            data_inicial = datetime.strptime(params["start_date"], "%Y-%m-%d").date()
+            data_final = datetime.strptime(params["end_date"], "%Y-%m-%d").date()
+        except (KeyError, ValueError) as e:
+            return self._erro(rota, 400, f"Parâmetros inválidos: {e}")
+        self._responder(rota, 200, {"paymentsReceipts": self.server.mock.dados.comprovantes(data_inicial, data_final)})
+
+    def _situacao_arquivo(self, payment_id, request_id, instante):
+        """Corpo de um file_request: REQUESTED até tempo_geracao_pdf, depois AVAILABLE"""
+        disponivel = time.monotonic() - instante >= self.server.mock.config.tempo_geracao_pdf
+        arquivo = {"statusInfo": {"statusCode": "AVAILABLE" if disponivel else "REQUESTED"}}
+        if disponivel:
+            arquivo["fileRepository"] = {"location": f"{self._url_base()}/arquivos/{payment_id}.pdf"}
+        return {"request": {"requestId": request_id}, "file": arquivo}
+
+    def _solicitar_arquivo(self, payment_id):
+        rota = "file_requests_post"
+        self._aguardar()
+        if not self._autorizado(rota) or self._falha_simulada(rota):
+            return
+        if not self.server.mock.dados.pagamento_existe(payment_id):
+            return self._erro(rota, 404, f"Pagamento {payment_id} não encontrado")
+        request_id = self.server.mock.dados.solicitar_arquivo(payment_id)
+        self._responder(rota, 202, {
+            "request": {"requestId": request_id},
+            "file": {"statusInfo": {"statusCode": "REQUESTED"}},
+        })
+
+    def _consultar_arquivo(self, payment_id, request_id):
+        rota = "file_requests_status" if request_id else "file_requests_lista"
+        self._aguardar()
+        if not self._autorizado(rota) or self._falha_simulada(rota):
+            return
+        dados = self.server.mock.dados
+        if request_id:
+            solicitacao = dados.solicitacao(payment_id, request_id)
+            if solicitacao is None:
+                return self._erro(rota, 404, f"Requisição {request_id} não encontrada")
+            return self._responder(rota, 200, self._situacao_arquivo(payment_id, *solicitacao))
+
+        solicitacoes = dados.solicitacoes(payment_id)
+        if not solicitacoes:
+            return self._erro(rota, 404, f"Nenhum file_request para {payment_id}")
+        self._responder(rota, 200, {
+            "requests": [self._situacao_arquivo(payment_id, rid, instante) for rid, instante in solicitacoes]
+        })
+
+    def _arquivo(self, payment_id):
+        rota = "arquivo"
+        self._aguardar()
+        if not self.server.mock.dados.solicitacoes(payment_id):
+            return self._erro(rota, 404, "Arquivo não encontrado")
+        self._responder(rota, 200, _pdf_comprovante(payment_id), content_type="application/pdf")
+
+
+class ServidorMockSantander:
+    """
+    Servidor HTTP(S) com as rotas da API, executado em thread de segundo plano
+
+    Uso:
+        servidor = ServidorMockSantander(ConfiguracaoMock(latencia=0.05), porta=0)
+        url = servidor.iniciar()      # ex.: http://127.0.0.1:54321
+        ...
+        servidor.parar()
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", porta=0):
+        self.config = config or ConfiguracaoMock()
+        self.host = host
+        self.porta = porta
+        self.dados = DadosMock(self.config)
+        self.estatisticas = EstatisticasMock()
+        self.usa_tls = bool(self.config.cert_path)
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._aleatorio = random.Random(self.config.seed)
+        self._http = None
+        self._thread = None
+
+    @property
+    def url_base(self):
+        esquema = "https" if self.usa_tls else "http"
+        host = "localhost" if self.usa_tls and self.host == "127.0.0.1" else self.host
+        return f"{esquema}://{host}:{self.porta}"
+
+    def aleatorio(self, limite):
+        """Número aleatório em [0, limite) (gerador compartilhado entre threads)"""
+        with self._lock:
+            return self._aleatorio.random() * limite
+
+    def emitir_token(self):
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._tokens[token] = time.monotonic() + self.config.expires_in
+        return token
+
+    def token_valido(self, token):
+        with self._lock:
+            expira = self._tokens.get(token)
+        return expira is not None and time.monotonic() < expira
+
+    def _criar_servidor(self):
+        http = ThreadingHTTPServer((self.host, self.porta), ManipuladorMock)
+        http.daemon_threads = True
+        http.mock = self
+        if self.usa_tls:
+            contexto = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            contexto.load_cert_chain(self.config.cert_path, self.config.key_path)
+            if self.config.ca_clientes:
+                contexto.verify_mode = ssl.CERT_REQUIRED
+                contexto.load_verify_locations(cafile=self.config.ca_clientes)
+            http.socket = contexto.wrap_socket(http.socket, server_side=True)
+        self.porta = http.server_address[1]
+        return http
+
+    def iniciar(self):
+        """Sobe o servidor em segundo plano e retorna a URL base"""
+        self._http = self._criar_servidor()
+        self._thread = threading.Thread(target=self._http.serve_forever, name="mock-santander", daemon=True)
+        self._thread.start()
+        return self.url_base
+
+    def parar(self):
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def executar(self):
+        """Atende requisições no processo atual até Ctrl+C"""
+        self._http = self._criar_servidor()
+        try:
+            self._http.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._http.server_close()
+            self._http = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor mock da API Open Banking Santander")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso fixo por requisição (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Atraso aleatório adicional máximo (s)")
+    parser.add_argument("--latencia-por-registro", type=float, default=0.0, help="Atraso por transação (s)")
+    parser.add_argument("--pagina-max", type=int, default=1000, help="Máximo de transações por página")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração de respostas 503")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--contas", type=int, default=2, help="Contas por fundo")
+    parser.add_argument("--transacoes", type=int, default=2000, help="Transações por conta")
+    parser.add_argument("--dias", type=int, default=30, help="Dias (até hoje) cobertos pelas transações")
+    parser.add_argument("--comprovantes-por-dia", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cert", help="Certificado do servidor (ativa HTTPS)")
+    parser.add_argument("--key", help="Chave privada do servidor")
+    parser.add_argument("--ca-clientes", help="CA dos certificados de cliente (ativa mTLS)")
+    args = parser.parse_args()
+
+    config = ConfiguracaoMock(
+        latencia=args.latencia, jitter=args.jitter, latencia_por_registro=args.latencia_por_registro,
+        tamanho_pagina_max=args.pagina_max, taxa_erro=args.taxa_erro, taxa_429=args.taxa_429,
+        num_contas=args.contas, transacoes_por_conta=args.transacoes, dias=args.dias,
+        comprovantes_por_dia=args.comprovantes_por_dia, seed=args.seed,
+        cert_path=args.cert, key_path=args.key, ca_clientes=args.ca_clientes,
+    )
+    servidor = ServidorMockSantander(config, host=args.host, porta=args.porta)
+
+    print("="*80)
+    print("SERVIDOR MOCK - API SANTANDER")
+    print("="*80)
+    print(f"🌐 URL base: {servidor.url_base}")
+    print(f"🏦 {config.num_contas} conta(s) por fundo | {config.transacoes_por_conta} transações por conta "
+          f"em {config.dias} dia(s)")
+    print(f"⏱️  Latência: {config.latencia}s + até {config.jitter}s | página máx.: {config.tamanho_pagina_max}")
+    print(f"⚠️  Erros simulados: {config.taxa_erro:.0%} (503) | {config.taxa_429:.0%} (429)")
+    print(f"\n💡 Para usar: SANTANDER_API_BASE_URL={servidor.url_base}")
+    if config.cert_path:
+        print(f"   e SANTANDER_CA_BUNDLE=<CA que assinou {config.cert_path}>")
+    print("   Ctrl+C para encerrar")
+    servidor.executar()
+
+
+if __name__ == "__main__":
+    main()
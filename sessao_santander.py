@@ -0,0 +1,263 @@
+"""
+Camada de sessão HTTP com mTLS para as APIs Santander
+Mantém um pool de conexões keep-alive compartilhado por par de certificados
+
+Antes, cada chamada usava requests.get/post com cert=(cert_path, key_path):
+- um novo handshake TCP+TLS a cada requisição (inclusive a cada página)
+- os arquivos PEM eram relidos do disco a cada conexão
+
+Aqui o certificado do cliente e a cadeia de CAs são carregados UMA vez em um
+SSLContext reutilizável, e as conexões ficam abertas entre requisições.
+"""
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.ssl_ import create_urllib3_context
+
+# Tamanho padrão do pool (pode ser alterado externamente antes da 1ª sessão)
+POOL_CONEXOES = 4   # Número de hosts distintos mantidos em cache
+POOL_MAXSIZE = 10   # Conexões simultâneas mantidas por host
+
+# Intervalo mínimo (segundos) entre verificações de troca do certificado no disco
+INTERVALO_VERIFICACAO_CERTIFICADO = float(os.environ.get("SANTANDER_VERIFICAR_CERTIFICADO", 30))
+
+# CA adicional confiável (ex.: a CA do servidor_mock_santander.py com TLS)
+CA_BUNDLE_EXTRA = os.environ.get("SANTANDER_CA_BUNDLE")
+
+
+class EstatisticasConexao:
+    """Contadores thread-safe de conexões abertas e reutilizadas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.conexoes_abertas = 0
+        self.requisicoes = 0
+
+    def registrar_conexao(self):
+        with self._lock:
+            self.conexoes_abertas += 1
+
+    def registrar_requisicao(self):
+        with self._lock:
+            self.requisicoes += 1
+
+    @property
+    def conexoes_reutilizadas(self):
+        """Requisições atendidas por uma conexão já aberta"""
+        return max(self.requisicoes - self.conexoes_abertas, 0)
+
+    def como_dict(self):
+        with self._lock:
+            return {
+                "requisicoes": self.requisicoes,
+                "conexoes_abertas": self.conexoes_abertas,
+                "conexoes_reutilizadas": max(self.requisicoes - self.conexoes_abertas, 0),
+            }
+
+
+def _classe_pool_contada(base, estatisticas):
+    """Cria uma subclasse do pool do urllib3 que conta conexões novas"""
+
+    class PoolContado(base):
+        def _new_conn(self):
+            estatisticas.registrar_conexao()
+            return super()._new_conn()
+
+    return PoolContado
+
+
+class AdaptadorMTLS(HTTPAdapter):
+    """HTTPAdapter que usa um SSLContext pré-carregado com o certificado do cliente"""
+
+    def __init__(self, ssl_context, estatisticas, pool_connections=POOL_CONEXOES, pool_maxsize=POOL_MAXSIZE):
+        # Atributos precisam existir antes do super().__init__ (que chama init_poolmanager)
+        self.ssl_context = ssl_context
+        self.estatisticas = estatisticas
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs["ssl_context"] = self.ssl_context
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _classe_pool_contada(HTTPConnectionPool, self.estatisticas),
+            "https": _classe_pool_contada(HTTPSConnectionPool, self.estatisticas),
+        }
+
+    def cert_verify(self, conn, url, verify, cert):
+        # CAs e certificado do cliente já estão no ssl_context: não repassar
+        # caminhos de PEM ao urllib3 (ele os recarregaria a cada conexão)
+        if verify is True and not cert:
+            conn.cert_reqs = "CERT_REQUIRED"
+            return
+        super().cert_verify(conn, url, verify, cert)
+
+    def send(self, request, **kwargs):
+        self.estatisticas.registrar_requisicao()
+        return super().send(request, **kwargs)
+
+
+def criar_contexto_ssl(cert_path, key_path):
+    """
+    SSLContext com as CAs confiáveis e o certificado do cliente já carregados
+
+    Usado pelas sessões requests e pelo cliente assíncrono (httpx aceita o
+    mesmo contexto em verify=).
+    """
+    ssl_context = create_urllib3_context()
+    ssl_context.load_verify_locations(cafile=DEFAULT_CA_BUNDLE_PATH)
+    if CA_BUNDLE_EXTRA:
+        ssl_context.load_verify_locations(cafile=CA_BUNDLE_EXTRA)
+    ssl_context.load_cert_chain(cert_path, key_path)
+    return ssl_context
+
+
+class SessaoMTLS:
+    """
+    Sessão HTTP com pool de conexões e mTLS para um par cert/key
+
+    Expõe get/post/request com a mesma assinatura do requests, sem o
+    parâmetro cert (o certificado já está no contexto SSL).
+    """
+
+    def __init__(self, cert_path, key_path, pool_connections=None, pool_maxsize=None):
+        self.cert_path = cert_path
+        self.key_path = key_path
+        self.versao = None  # Preenchida por obter_sessao (ver _versao_certificado)
+        self.verificada_em = 0.0  # time.monotonic() da última verificação da versão
+        self.estatisticas = EstatisticasConexao()
+
+        # Requisições em andamento: uma sessão aposentada (certificado trocado)
+        # só é fechada quando a última termina
+        self._lock_uso = threading.Lock()
+        self._em_uso = 0
+        self._aposentada = False
+
+        # Contexto SSL carregado uma única vez por certificado
+        self.ssl_context = criar_contexto_ssl(cert_path, key_path)
+
+        self.adaptador = AdaptadorMTLS(
+            self.ssl_context,
+            self.estatisticas,
+            pool_connections=pool_connections or POOL_CONEXOES,
+            pool_maxsize=pool_maxsize or POOL_MAXSIZE
+        )
+
+        self.sessao = requests.Session()
+        self.sessao.mount("https://", self.adaptador)
+        self.sessao.mount("http://", self.adaptador)
+
+    def request(self, method, url, **kwargs):
+        with self._lock_uso:
+            self._em_uso += 1
+        try:
+            return self.sessao.request(method, url, **kwargs)
+        finally:
+            with self._lock_uso:
+                self._em_uso -= 1
+                fechar = self._aposentada and self._em_uso == 0
+            if fechar:
+                self.fechar()
+
+    def aposentar(self):
+        """Substituída por uma sessão nova: fecha agora se ociosa, senão ao fim da última requisição"""
+        with self._lock_uso:
+            self._aposentada = True
+            fechar = self._em_uso == 0
+        if fechar:
+            self.fechar()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def fechar(self):
+        self.sessao.close()
+
+
+# Registro global de sessões: uma por par (cert_path, key_path)
+_SESSOES = {}
+_LOCK_SESSOES = threading.Lock()
+
+
+def _chave_certificado(cert_path, key_path):
+    return (os.path.abspath(cert_path), os.path.abspath(key_path))
+
+
+def _versao_certificado(cert_path, key_path):
+    """
+    Data de modificação (ns) e tamanho dos PEMs
+
+    Um certificado renovado no mesmo caminho muda a versão e ganha uma nova
+    sessão (e um novo SSLContext) em vez de continuar com o par antigo.
+    """
+    versao = []
+    for caminho in (cert_path, key_path):
+        try:
+            estat = os.stat(caminho)
+            versao.append((estat.st_mtime_ns, estat.st_size))
+        except OSError:
+            versao.append(None)  # Arquivo ausente: load_cert_chain informa o erro
+    return tuple(versao)
+
+
+def obter_sessao(cert_path, key_path, pool_maxsize=None):
+    """
+    Retorna a sessão mTLS compartilhada para o certificado informado
+
+    Args:
+        cert_path: Caminho do certificado PEM do cliente
+        key_path: Caminho da chave privada PEM
+        pool_maxsize: Conexões simultâneas por host (padrão POOL_MAXSIZE),
+            usado apenas na criação da sessão
+
+    Returns:
+        Instância de SessaoMTLS (criada na primeira chamada e recriada se o
+        certificado ou a chave forem alterados no disco; a troca é verificada
+        no máximo a cada INTERVALO_VERIFICACAO_CERTIFICADO segundos)
+    """
+    chave = _chave_certificado(cert_path, key_path)
+    agora = time.monotonic()
+    sessao = _SESSOES.get(chave)
+    if sessao is not None and agora - sessao.verificada_em < INTERVALO_VERIFICACAO_CERTIFICADO:
+        return sessao  # Caminho comum: sem os.stat a cada requisição
+
+    antiga = None
+    with _LOCK_SESSOES:
+        sessao = _SESSOES.get(chave)
+        if sessao is not None and agora - sessao.verificada_em < INTERVALO_VERIFICACAO_CERTIFICADO:
+            return sessao  # Outra thread acabou de verificar
+        versao = _versao_certificado(cert_path, key_path)
+        if sessao is None or sessao.versao != versao:
+            antiga = sessao
+            sessao = SessaoMTLS(cert_path, key_path, pool_maxsize=pool_maxsize)
+            sessao.versao = versao
+            _SESSOES[chave] = sessao
+        sessao.verificada_em = agora
+    if antiga is not None:
+        # Certificado trocado no disco: requisições em andamento terminam no par antigo
+        antiga.aposentar()
+    return sessao
+
+
+def estatisticas_sessoes():
+    """Retorna os contadores de todas as sessões abertas, por certificado"""
+    with _LOCK_SESSOES:
+        sessoes = dict(_SESSOES)
+    return {chave: sessao.estatisticas.como_dict() for chave, sessao in sessoes.items()}
+
+
+def fechar_sessoes():
+    """Fecha todas as sessões e libera as conexões abertas"""
+    with _LOCK_SESSOES:
+        sessoes = list(_SESSOES.values())
+        _SESSOES.clear()
+    for sessao in sessoes:
+        sessao.fechar()
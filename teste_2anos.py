@@ -45,7 +45,8 @@ try:
         account,
         data_inicial=data_inicial,
         data_final=data_final,
-        limite=1000
+        limite=1000,
+        janela=buscar_extratos_bancarios.JANELA_MES  # 25 consultas mensais em paralelo
     )
     
     print(f"\n{'='*100}")
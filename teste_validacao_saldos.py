@@ -13,6 +13,7 @@ try:
         from config_credentials import SANTANDER_FUNDOS
     
     from buscar_extratos_bancarios import SantanderExtratosBancarios
+    from motor_extrato import calcular_extrato
     print("✅ Módulos importados\n")
 except ImportError as e:
     print(f"❌ Erro: {e}")
@@ -68,28 +69,17 @@ try:
     print(f"🔒 Saldo Bloqueado (blockedAmount): R$ {saldo_bloqueado:,.2f}")
     print(f"📊 Saldo Total: R$ {saldo_atual + saldo_bloqueado:,.2f}")
     
-    # ========== ORDENAR TRANSAÇÕES ==========
-    def extrair_data_ordenacao(trans):
-        data = trans.get('transactionDate', '')
-        if data and len(data) >= 10:
-            try:
-                dt = datetime.strptime(data[:10], '%d/%m/%Y')
-                return dt
-            except:
-                try:
-                    dt = datetime.strptime(data[:10], '%Y-%m-%d')
-                    return dt
-                except:
-                    return datetime(9999, 12, 31)
-        return datetime(9999, 12, 31)
-    
-    transacoes_ordenadas = sorted(transacoes, key=extrair_data_ordenacao)
+    # ========== ORDENAR TRANSAÇÕES E CALCULAR SALDOS ==========
+    extrato = calcular_extrato(transacoes, saldo_atual)
+    transacoes_ordenadas = extrato.transacoes
     
     # ========== CALCULAR TOTAL DO PERÍODO ==========
     print("\n" + "=" * 100)
     print("2. TOTAL DE TRANSAÇÕES DO PERÍODO:")
     print("=" * 100)
     
+    # Cálculo de referência, independente do motor: valor bruto da API,
+    # CREDITO de um lado e qualquer outro tipo do outro
     total_creditos = 0
     total_debitos = 0
     
@@ -108,6 +98,16 @@ try:
     print(f"❤️  Total Débitos: R$ {total_debitos:,.2f}")
     print(f"📊 Total Líquido: R$ {total_transacoes:,.2f}")
     
+    # Conferência com o motor (abs do valor; DEBITO de um lado, o resto do outro)
+    print(f"\n🔎 Motor de extrato: Créditos R$ {extrato.total_creditos:,.2f} | "
+          f"Débitos R$ {extrato.total_debitos:,.2f} | Líquido R$ {extrato.total:,.2f}")
+    if abs(extrato.total - total_transacoes) < 0.01:
+        print("✅ Total do motor confere com o cálculo de referência")
+    else:
+        print(f"⚠️  Total do motor difere do cálculo de referência em "
+              f"R$ {abs(extrato.total - total_transacoes):,.2f}")
+        print(f"   (valores negativos na API ou tipos diferentes de CREDITO/DEBITO)")
+    
     # ========== CALCULAR SALDO ANTERIOR ==========
     print("\n" + "=" * 100)
     print("3. CÁLCULO DO SALDO ANTERIOR:")
@@ -118,6 +118,7 @@ try:
     print(f"\nFórmula: Saldo Anterior = Saldo Atual - Total Transações")
     print(f"         Saldo Anterior = {saldo_atual:,.2f} - {total_transacoes:,.2f}")
     print(f"         Saldo Anterior = R$ {saldo_anterior:,.2f}")
+    print(f"         Motor de extrato = R$ {extrato.saldo_anterior:,.2f}")
     
     # ========== VALIDAR SALDO PROGRESSIVO ==========
     print("\n" + "=" * 100)
@@ -129,27 +130,16 @@ try:
     print(f"{'Data':<12} | {'Histórico':<40} | {'Valor (R$)':>15} | {'Saldo (R$)':>15}")
     print("-" * 100)
     
-    # Linha de saldo anterior
-    primeira_data = transacoes_ordenadas[0].get('transactionDate', '')
-    print(f"{primeira_data:<12} | {'SALDO ANTERIOR':<40} | {'':<15} | {saldo_anterior:>15,.2f}")
+    # Linha de saldo anterior (do motor, ponto de partida do saldo progressivo abaixo)
+    primeira_data = extrato.datas[0]
+    print(f"{primeira_data:<12} | {'SALDO ANTERIOR':<40} | {'':<15} | {extrato.saldo_anterior:>15,.2f}")
     
-    # Calcular saldo progressivo
-    saldo = saldo_anterior
-    for i, trans in enumerate(transacoes_ordenadas[:10], 1):
-        data = trans.get('transactionDate', '')
-        historico = trans.get('transactionName', '')[:40]
-        valor = float(trans.get('amount', 0))
-        tipo = trans.get('creditDebitType', '')
-        
-        # Aplicar sinal
-        if tipo == 'DEBITO':
-            valor_com_sinal = -abs(valor)
-        else:
-            valor_com_sinal = abs(valor)
-        
-        saldo += valor_com_sinal
-        
-        print(f"{data:<12} | {historico:<40} | {valor_com_sinal:>15,.2f} | {saldo:>15,.2f}")
+    # Saldo progressivo já calculado pelo motor (valor com sinal e saldo após cada transação)
+    linhas = list(extrato.linhas())
+    for i in range(min(10, len(linhas))):
+        historico = linhas[i][1][:40]
+        valor_com_sinal, saldo = linhas[i][3], linhas[i][4]
+        print(f"{extrato.datas[i]:<12} | {historico:<40} | {valor_com_sinal:>15,.2f} | {saldo:>15,.2f}")
     
     if len(transacoes_ordenadas) > 10:
         print(f"\n... ({len(transacoes_ordenadas) - 10} transações omitidas) ...")
@@ -160,39 +150,10 @@ try:
         print(f"{'Data':<12} | {'Histórico':<40} | {'Valor (R$)':>15} | {'Saldo (R$)':>15}")
         print("-" * 100)
         
-        # Recalcular saldo até o final
-        saldo = saldo_anterior
-        for trans in transacoes_ordenadas:
-            valor = float(trans.get('amount', 0))
-            tipo = trans.get('creditDebitType', '')
-            if tipo == 'DEBITO':
-                saldo -= abs(valor)
-            else:
-                saldo += abs(valor)
-        
-        # Mostrar últimas 5
-        saldo_temp = saldo_anterior
-        for trans in transacoes_ordenadas[:-5]:
-            valor = float(trans.get('amount', 0))
-            tipo = trans.get('creditDebitType', '')
-            if tipo == 'DEBITO':
-                saldo_temp -= abs(valor)
-            else:
-                saldo_temp += abs(valor)
-        
-        for trans in transacoes_ordenadas[-5:]:
-            data = trans.get('transactionDate', '')
-            historico = trans.get('transactionName', '')[:40]
-            valor = float(trans.get('amount', 0))
-            tipo = trans.get('creditDebitType', '')
-            
-            if tipo == 'DEBITO':
-                valor_com_sinal = -abs(valor)
-            else:
-                valor_com_sinal = abs(valor)
-            
-            saldo_temp += valor_com_sinal
-            print(f"{data:<12} | {historico:<40} | {valor_com_sinal:>15,.2f} | {saldo_temp:>15,.2f}")
+        for i in range(len(linhas) - 5, len(linhas)):
+            historico = linhas[i][1][:40]
+            valor_com_sinal, saldo = linhas[i][3], linhas[i][4]
+            print(f"{extrato.datas[i]:<12} | {historico:<40} | {valor_com_sinal:>15,.2f} | {saldo:>15,.2f}")
     
     # ========== VALIDAÇÃO FINAL ==========
     print("\n" + "=" * 100)
@@ -204,6 +165,7 @@ try:
     print(f"\n✅ Saldo Anterior: R$ {saldo_anterior:,.2f}")
     print(f"✅ Total do Período: R$ {total_transacoes:,.2f}")
     print(f"✅ Saldo Final (calculado): R$ {saldo_final_calculado:,.2f}")
+    print(f"✅ Saldo Final (motor): R$ {extrato.saldo_final:,.2f}")
     print(f"✅ Saldo Atual (API): R$ {saldo_atual:,.2f}")
     
     diferenca = abs(saldo_final_calculado - saldo_atual)